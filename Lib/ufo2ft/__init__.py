@@ -1,6 +1,7 @@
 import logging
 import os
 from enum import IntEnum
+from io import StringIO
 
 from fontTools import varLib
 from fontTools.designspaceLib import DesignSpaceDocument
@@ -15,12 +16,19 @@ from ufo2ft.featureCompiler import (
     MtiFeatureCompiler,
 )
 from ufo2ft.outlineCompiler import OutlineOTFCompiler, OutlineTTFCompiler
+from ufo2ft.parallel import (
+    canRunInParallel,
+    deserializeFont,
+    parallelMap,
+    serializeFont,
+)
 from ufo2ft.postProcessor import PostProcessor
 from ufo2ft.preProcessor import (
     OTFPreProcessor,
     TTFInterpolatablePreProcessor,
     TTFPreProcessor,
 )
+from ufo2ft.profiling import profiledCompile, stage
 from ufo2ft.util import (
     _getDefaultNotdefGlyph,
     ensure_all_sources_have_names,
@@ -64,10 +72,11 @@ def call_preprocessor(ufo_or_ufos, *, preProcessorClass, **kwargs):
     callables = [preProcessorClass]
     if hasattr(preProcessorClass, "initDefaultFilters"):
         callables.append(preProcessorClass.initDefaultFilters)
-    preProcessor = preProcessorClass(
-        ufo_or_ufos, **prune_unknown_kwargs(kwargs, *callables)
-    )
-    return preProcessor.process()
+    with stage(preProcessorClass.__name__, "preProcessor"):
+        preProcessor = preProcessorClass(
+            ufo_or_ufos, **prune_unknown_kwargs(kwargs, *callables)
+        )
+        return preProcessor.process()
 
 
 def call_outline_compiler(ufo, glyphSet, *, outlineCompilerClass, **kwargs):
@@ -78,12 +87,48 @@ def call_outline_compiler(ufo, glyphSet, *, outlineCompilerClass, **kwargs):
 
 def call_postprocessor(otf, ufo, glyphSet, *, postProcessorClass, **kwargs):
     if postProcessorClass is not None:
-        postProcessor = postProcessorClass(otf, ufo, glyphSet=glyphSet)
-        kwargs = prune_unknown_kwargs(kwargs, postProcessor.process)
-        otf = postProcessor.process(**kwargs)
+        with stage(postProcessorClass.__name__, "postProcessor"):
+            postProcessor = postProcessorClass(
+                otf,
+                ufo,
+                glyphSet=glyphSet,
+                **prune_unknown_kwargs(kwargs, postProcessorClass),
+            )
+            kwargs = prune_unknown_kwargs(kwargs, postProcessor.process)
+            otf = postProcessor.process(**kwargs)
     return otf
 
 
+def call_in_workers(compileFunc, items, *, workers, debugFeatureFile=None):
+    """Call `compileFunc(item, debugFeatureFile=...)` for each item on a pool of
+    worker processes, and return the list of results in the same order.
+
+    `compileFunc` must return a TTFont or a list of TTFonts; these are compiled
+    to binary in the workers and loaded again in the current process. Any text
+    written to the `debugFeatureFile` by each call is collected and written out
+    in order, so that the debug output is the same as for a serial build.
+    """
+
+    def task(item):
+        debugFile = StringIO() if debugFeatureFile else None
+        result = compileFunc(item, debugFeatureFile=debugFile)
+        if isinstance(result, list):
+            data = [serializeFont(font) for font in result]
+        else:
+            data = serializeFont(result)
+        return data, debugFile.getvalue() if debugFile else None
+
+    results = []
+    for data, debugText in parallelMap(task, items, workers):
+        if debugText:
+            debugFeatureFile.write(debugText)
+        if isinstance(data, list):
+            results.append([deserializeFont(d) for d in data])
+        else:
+            results.append(deserializeFont(data))
+    return results
+
+
 base_args = dict(
     postProcessorClass=PostProcessor,
     featureCompilerClass=None,
@@ -100,6 +145,12 @@ base_args = dict(
     notdefGlyph=None,
     colrLayerReuse=True,
     feaIncludeDir=None,
+    compileFeaturesFromAST=False,
+    workers=None,
+    glyphCacheDir=None,
+    reloadFont=False,
+    profile=None,
+    compactGlyphs=False,
 )
 
 compileOTF_args = {
@@ -116,6 +167,7 @@ compileOTF_args = {
 }
 
 
+@profiledCompile
 def compileOTF(ufo, **kwargs):
     """Create FontTools CFF font from a UFO.
 
@@ -174,6 +226,40 @@ def compileOTF(ufo, **kwargs):
       By default "cffsubr" is used for both CFF 1 and CFF 2.
       NOTE: cffsubr is required for subroutinizing CFF2 tables, as compreffor
       currently doesn't support it.
+
+    *compileFeaturesFromAST* (bool) makes the feature compiler build the
+      OpenType layout tables directly from the feature file AST made by the
+      feature writers, instead of stringifying it and parsing it again. This
+      is faster for fonts with many generated rules; if the AST can't be
+      compiled, its text is compiled as usual.
+
+    *workers* (Optional[int]) is the number of processes used to run the
+      glyph-local pre-processing filters (e.g. removing overlaps) and to
+      compile the charstrings in parallel. The default (None) runs everything
+      in the current process; 0 means one process per CPU.
+
+    *glyphCacheDir* (Optional[str]) is the path to a directory where the
+      compiled charstrings are cached between builds, keyed by a fingerprint
+      of the glyph outlines, components, advance width and the relevant
+      compilation options. Unchanged glyphs are then loaded from the cache
+      instead of being compiled again. The cache entries are pickled, so only
+      use a trusted directory.
+
+    *reloadFont* (bool) makes the post-processor compile the font to binary
+      and load it again before processing it, instead of working on the
+      tables in memory. The result is the same; this is only useful for
+      custom post-processors that rely on the tables being freshly loaded.
+
+    *profile* (Optional[ufo2ft.profiling.Profiler]) records the wall time, CPU
+      time and peak memory of each compilation stage (pre-processor, filters,
+      outline table builders, feature writers, feaLib, post-processor) while
+      the font is compiled. See the `ufo2ft.profiling` module.
+
+    *compactGlyphs* (bool) makes the pre-processor copy the glyphs it modifies
+      as `ufo2ft.compactGlyph.CompactGlyph` objects, which store the outlines
+      in flat arrays and use much less memory than the UFO glyph objects. It
+      has no effect if *inplace* is True. Custom filters must then only use
+      the parts of the glyph API implemented by CompactGlyph.
     """
     kwargs = init_kwargs(kwargs, compileOTF_args)
     glyphSet = call_preprocessor(ufo, **kwargs)
@@ -216,6 +302,7 @@ compileTTF_args = {
 }
 
 
+@profiledCompile
 def compileTTF(ufo, **kwargs):
     """Create FontTools TrueType font from a UFO.
 
@@ -236,6 +323,27 @@ def compileTTF(ufo, **kwargs):
     "public.skipExportGlyphs" lib key will be consulted. If it doesn't exist,
     all glyphs are exported. UFO groups and kerning will be pruned of skipped
     glyphs.
+
+    *workers* (Optional[int]) is the number of processes used to run the
+    glyph-local pre-processing filters (e.g. removing overlaps, converting
+    cubic curves to quadratic) and to compile the TrueType glyphs in parallel.
+    The default (None) runs everything in the current process; 0 means one
+    process per CPU.
+
+    *glyphCacheDir* (Optional[str]) is the path to a directory where the
+    compiled TrueType glyphs are cached between builds; see `compileOTF`.
+
+    *reloadFont* (bool) reloads the font before post-processing it; see
+    `compileOTF`.
+
+    *profile* (Optional[ufo2ft.profiling.Profiler]) records the time and memory
+    spent in each compilation stage; see `compileOTF`.
+
+    *compactGlyphs* (bool) stores the glyphs modified by the pre-processor in a
+    compact form; see `compileOTF`.
+
+    *compileFeaturesFromAST* (bool) compiles the generated features without
+    parsing them again; see `compileOTF`.
     """
     kwargs = init_kwargs(kwargs, compileTTF_args)
 
@@ -265,6 +373,7 @@ compileInterpolatableTTFs_args = {
 }
 
 
+@profiledCompile
 def compileInterpolatableTTFs(ufos, **kwargs):
     """Create FontTools TrueType fonts from a list of UFOs with interpolatable
     outlines. Cubic curves are converted compatibly to quadratic curves using
@@ -286,9 +395,15 @@ def compileInterpolatableTTFs(ufos, **kwargs):
     all UFO's "public.skipExportGlyphs" lib keys will be used. If they don't
     exist, all glyphs are exported. UFO groups and kerning will be pruned of
     skipped glyphs.
-    """
-    from ufo2ft.util import _LazyFontName
 
+    *workers* (Optional[int]) is the number of processes used to convert the
+    glyphs compatibly to quadratic (in chunks of glyph names) and then to
+    compile the masters in parallel. The default (None) does everything in the
+    current process; 0 means one process per CPU. The output is the same as
+    for a serial build. Parallel compilation requires the 'fork' start method
+    of multiprocessing; on platforms where that is not available, the masters
+    are compiled serially.
+    """
     kwargs = init_kwargs(kwargs, compileInterpolatableTTFs_args)
 
     if kwargs["layerNames"] is None:
@@ -297,43 +412,66 @@ def compileInterpolatableTTFs(ufos, **kwargs):
 
     glyphSets = call_preprocessor(ufos, **kwargs)
 
-    for ufo, glyphSet, layerName in zip(ufos, glyphSets, kwargs["layerNames"]):
-        fontName = _LazyFontName(ufo)
-        if layerName is not None:
-            logger.info("Building OpenType tables for %s-%s", fontName, layerName)
-        else:
-            logger.info("Building OpenType tables for %s", fontName)
-
-        ttf = call_outline_compiler(
-            ufo,
-            glyphSet,
-            **kwargs,
-            tables=SPARSE_TTF_MASTER_TABLES if layerName else None,
+    masters = zip(ufos, glyphSets, kwargs["layerNames"])
+    workers = kwargs["workers"]
+    if canRunInParallel(workers):
+        # the cubic-to-quadratic conversion above needs all the masters at once
+        # (the preprocessor splits it by glyph instead); the rest is independent
+        # for each master and can run in parallel
+        yield from call_in_workers(
+            lambda master, debugFeatureFile: _compileInterpolatableTTF(
+                master, **{**kwargs, "debugFeatureFile": debugFeatureFile}
+            ),
+            masters,
+            workers=workers,
+            debugFeatureFile=kwargs["debugFeatureFile"],
         )
+    else:
+        for master in masters:
+            yield _compileInterpolatableTTF(master, **kwargs)
+
+
+def _compileInterpolatableTTF(master, **kwargs):
+    from ufo2ft.util import _LazyFontName
 
-        # Only the default layer is likely to have all glyphs used in feature
-        # code.
-        if layerName is None:
-            if kwargs["debugFeatureFile"]:
-                kwargs["debugFeatureFile"].write("\n### %s ###\n" % fontName)
-            compileFeatures(ufo, ttf, glyphSet=glyphSet, **kwargs)
+    ufo, glyphSet, layerName = master
+    fontName = _LazyFontName(ufo)
+    if layerName is not None:
+        logger.info("Building OpenType tables for %s-%s", fontName, layerName)
+    else:
+        logger.info("Building OpenType tables for %s", fontName)
+
+    ttf = call_outline_compiler(
+        ufo,
+        glyphSet,
+        **kwargs,
+        tables=SPARSE_TTF_MASTER_TABLES if layerName else None,
+    )
+
+    # Only the default layer is likely to have all glyphs used in feature
+    # code.
+    if layerName is None:
+        if kwargs["debugFeatureFile"]:
+            kwargs["debugFeatureFile"].write("\n### %s ###\n" % fontName)
+        compileFeatures(ufo, ttf, glyphSet=glyphSet, **kwargs)
 
-        ttf = call_postprocessor(ttf, ufo, glyphSet, **kwargs)
+    ttf = call_postprocessor(ttf, ufo, glyphSet, **kwargs)
 
-        if layerName is not None:
-            # for sparse masters (i.e. containing only a subset of the glyphs), we
-            # need to include the post table in order to store glyph names, so that
-            # fontTools.varLib can interpolate glyphs with same name across masters.
-            # However we want to prevent the underlinePosition/underlineThickness
-            # fields in such sparse masters to be included when computing the deltas
-            # for the MVAR table. Thus, we set them to this unlikely, limit value
-            # (-36768) which is a signal varLib should ignore them when building MVAR.
-            ttf["post"].underlinePosition = -0x8000
-            ttf["post"].underlineThickness = -0x8000
+    if layerName is not None:
+        # for sparse masters (i.e. containing only a subset of the glyphs), we
+        # need to include the post table in order to store glyph names, so that
+        # fontTools.varLib can interpolate glyphs with same name across masters.
+        # However we want to prevent the underlinePosition/underlineThickness
+        # fields in such sparse masters to be included when computing the deltas
+        # for the MVAR table. Thus, we set them to this unlikely, limit value
+        # (-36768) which is a signal varLib should ignore them when building MVAR.
+        ttf["post"].underlinePosition = -0x8000
+        ttf["post"].underlineThickness = -0x8000
 
-        yield ttf
+    return ttf
 
 
+@profiledCompile
 def compileInterpolatableTTFsFromDS(designSpaceDoc, **kwargs):
     """Create FontTools TrueType fonts from the DesignSpaceDocument UFO sources
     with interpolatable outlines. Cubic curves are converted compatibly to
@@ -358,6 +496,8 @@ def compileInterpolatableTTFsFromDS(designSpaceDoc, **kwargs):
     For sources that have the 'layerName' attribute defined, the corresponding TTFont
     object will contain only a minimum set of tables ("head", "hmtx", "glyf", "loca",
     "maxp", "post" and "vmtx"), and no OpenType layout tables.
+
+    *workers* works the same as in `compileInterpolatableTTFs`.
     """
     kwargs = init_kwargs(kwargs, compileInterpolatableTTFs_args)
     ufos, kwargs["layerNames"] = [], []
@@ -400,6 +540,7 @@ compileInterpolatableOTFs_args = {
 }
 
 
+@profiledCompile
 def compileInterpolatableOTFsFromDS(designSpaceDoc, **kwargs):
     """Create FontTools CFF fonts from the DesignSpaceDocument UFO sources
     with interpolatable outlines.
@@ -426,6 +567,13 @@ def compileInterpolatableOTFsFromDS(designSpaceDoc, **kwargs):
     For sources that have the 'layerName' attribute defined, the corresponding TTFont
     object will contain only a minimum set of tables ("head", "hmtx", "CFF ", "maxp",
     "vmtx" and "VORG"), and no OpenType layout tables.
+
+    *workers* (Optional[int]) is the number of processes used to compile the
+    masters in parallel. The default (None) compiles them one after the other
+    in the current process; 0 means one process per CPU. The output is the same
+    as for a serial build. Parallel compilation requires the 'fork' start method
+    of multiprocessing, and is disabled when `inplace` is True since the
+    pre-processing filters must then modify the input UFOs.
     """
     kwargs = init_kwargs(kwargs, compileInterpolatableOTFs_args)
     for source in designSpaceDoc.sources:
@@ -440,24 +588,34 @@ def compileInterpolatableOTFsFromDS(designSpaceDoc, **kwargs):
     if kwargs["notdefGlyph"] is None:
         kwargs["notdefGlyph"] = _getDefaultNotdefGlyph(designSpaceDoc)
 
-    otfs = []
-    for source in designSpaceDoc.sources:
-        otfs.append(
-            compileOTF(
-                ufo=source.font,
-                **{
-                    **kwargs,
-                    **dict(
-                        layerName=source.layerName,
-                        removeOverlaps=False,
-                        overlapsBackend=None,
-                        optimizeCFF=CFFOptimization.NONE,
-                        _tables=SPARSE_OTF_MASTER_TABLES if source.layerName else None,
-                    ),
-                },
-            )
+    workers = kwargs["workers"]
+
+    def compileMaster(source, debugFeatureFile=kwargs["debugFeatureFile"]):
+        return compileOTF(
+            ufo=source.font,
+            **{
+                **kwargs,
+                **dict(
+                    layerName=source.layerName,
+                    removeOverlaps=False,
+                    overlapsBackend=None,
+                    optimizeCFF=CFFOptimization.NONE,
+                    _tables=SPARSE_OTF_MASTER_TABLES if source.layerName else None,
+                    debugFeatureFile=debugFeatureFile,
+                ),
+            },
         )
 
+    if canRunInParallel(workers) and not kwargs["inplace"]:
+        otfs = call_in_workers(
+            compileMaster,
+            designSpaceDoc.sources,
+            workers=workers,
+            debugFeatureFile=kwargs["debugFeatureFile"],
+        )
+    else:
+        otfs = [compileMaster(source) for source in designSpaceDoc.sources]
+
     if kwargs["inplace"]:
         result = designSpaceDoc
     else:
@@ -469,6 +627,7 @@ def compileInterpolatableOTFsFromDS(designSpaceDoc, **kwargs):
     return result
 
 
+@profiledCompile
 def compileFeatures(
     ufo,
     ttFont=None,
@@ -528,6 +687,7 @@ compileVariableTTF_args = {
 }
 
 
+@profiledCompile
 def compileVariableTTF(designSpaceDoc, **kwargs):
     """Create FontTools TrueType variable font from the DesignSpaceDocument UFO sources
     with interpolatable outlines, using fontTools.varLib.build.
@@ -559,6 +719,7 @@ compileVariableTTFs_args = {
 }
 
 
+@profiledCompile
 def compileVariableTTFs(designSpaceDoc: DesignSpaceDocument, **kwargs):
     """Create FontTools TrueType variable fonts for each variable font defined
     in the given DesignSpaceDocument, using their UFO sources
@@ -574,6 +735,11 @@ def compileVariableTTFs(designSpaceDoc: DesignSpaceDocument, **kwargs):
       to build. If not provided, all variable fonts listed in the given
       designspace will by built.
 
+    *workers* (Optional[int]) is the number of processes used to compile the
+      masters in parallel. When the designspace contains more than one
+      interpolable sub-space, these are compiled in parallel instead. The
+      default (None) compiles everything serially; 0 means one process per CPU.
+
     The rest of the arguments works the same as in the other compile functions.
 
     Returns a dictionary that maps each variable font filename to a new variable
@@ -603,13 +769,15 @@ def compileVariableTTFs(designSpaceDoc: DesignSpaceDocument, **kwargs):
 
     logger.info("Building variable TTF fonts: %s", ", ".join(vfNameToBaseUfo))
 
-    vfNameToTTFont = varLib.build_many(
-        designSpaceDoc,
-        exclude=excludeVariationTables,
-        optimize=optimizeGvar,
-        skip_vf=lambda vf_name: variableFontNames and vf_name not in variableFontNames,
-        colr_layer_reuse=colrLayerReuse,
-    )
+    with stage("build_many", "varLib"):
+        vfNameToTTFont = varLib.build_many(
+            designSpaceDoc,
+            exclude=excludeVariationTables,
+            optimize=optimizeGvar,
+            skip_vf=lambda vf_name: variableFontNames
+            and vf_name not in variableFontNames,
+            colr_layer_reuse=colrLayerReuse,
+        )
 
     for vfName, varfont in list(vfNameToTTFont.items()):
         vfNameToTTFont[vfName] = call_postprocessor(
@@ -631,6 +799,7 @@ compileVariableCFF2_args = {
 }
 
 
+@profiledCompile
 def compileVariableCFF2(designSpaceDoc, **kwargs):
     """Create FontTools CFF2 variable font from the DesignSpaceDocument UFO sources
     with interpolatable outlines, using fontTools.varLib.build.
@@ -667,6 +836,7 @@ compileVariableCFF2s_args = {
 }
 
 
+@profiledCompile
 def compileVariableCFF2s(designSpaceDoc, **kwargs):
     """Create FontTools CFF2 variable fonts for each variable font defined
     in the given DesignSpaceDocument, using their UFO sources
@@ -687,6 +857,11 @@ def compileVariableCFF2s(designSpaceDoc, **kwargs):
       to build. If not provided, all variable fonts listed in the given
       designspace will by built.
 
+    *workers* (Optional[int]) is the number of processes used to compile the
+      masters in parallel. When the designspace contains more than one
+      interpolable sub-space, these are compiled in parallel instead. The
+      default (None) compiles everything serially; 0 means one process per CPU.
+
     The rest of the arguments works the same as in the other compile functions.
 
     Returns a dictionary that maps each variable font filename to a new variable
@@ -716,15 +891,17 @@ def compileVariableCFF2s(designSpaceDoc, **kwargs):
 
     logger.info(f"Building variable CFF2 fonts: {', '.join(vfNameToBaseUfo)}")
 
-    vfNameToTTFont = varLib.build_many(
-        designSpaceDoc,
-        exclude=excludeVariationTables,
-        # NOTE optimize=False won't change anything until this PR is merged
-        # https://github.com/fonttools/fonttools/pull/1979
-        optimize=optimizeCFF >= CFFOptimization.SPECIALIZE,
-        skip_vf=lambda vf_name: variableFontNames and vf_name not in variableFontNames,
-        colr_layer_reuse=colrLayerReuse,
-    )
+    with stage("build_many", "varLib"):
+        vfNameToTTFont = varLib.build_many(
+            designSpaceDoc,
+            exclude=excludeVariationTables,
+            # NOTE optimize=False won't change anything until this PR is merged
+            # https://github.com/fonttools/fonttools/pull/1979
+            optimize=optimizeCFF >= CFFOptimization.SPECIALIZE,
+            skip_vf=lambda vf_name: variableFontNames
+            and vf_name not in variableFontNames,
+            colr_layer_reuse=colrLayerReuse,
+        )
 
     for vfName, varfont in list(vfNameToTTFont.items()):
         vfNameToTTFont[vfName] = call_postprocessor(
@@ -769,37 +946,53 @@ def _compileNeededSources(
         if source.name in sourcesToCompile:
             sourcesByName[source.name] = source
 
+    # Only keep the sources that we've identified earlier as need-to-compile
+    for subDoc in interpolableSubDocs:
+        subDoc.sources = [s for s in subDoc.sources if s.name in sourcesToCompile]
+    interpolableSubDocs = [subDoc for subDoc in interpolableSubDocs if subDoc.sources]
+
+    def compileSubDoc(subDoc, debugFeatureFile=kwargs["debugFeatureFile"]):
+        ttfDesignSpace = compileInterpolatableFunc(
+            subDoc,
+            **{
+                **kwargs,
+                **dict(
+                    useProductionNames=False,  # will rename glyphs after varfont is built
+                    # No need to post-process intermediate fonts.
+                    postProcessorClass=None,
+                    debugFeatureFile=debugFeatureFile,
+                ),
+            },
+        )
+        return [ttfSource.font for ttfSource in ttfDesignSpace.sources]
+
     # Compile all needed sources in each interpolable subspace to make sure
     # they're all compatible; that also ensures that sub-vfs within the same
     # interpolable sub-space are compatible too.
-    for subDoc in interpolableSubDocs:
-        # Only keep the sources that we've identified earlier as need-to-compile
-        subDoc.sources = [s for s in subDoc.sources if s.name in sourcesToCompile]
-        if not subDoc.sources:
-            continue
-
-        # FIXME: Hack until we get a fontTools config module. Disable GPOS
-        # compaction while building masters because the compaction will be undone
-        # anyway by varLib merge and then done again on the VF
-        gpos_compact_value = os.environ.pop(GPOS_COMPACT_MODE_ENV_KEY, None)
-        try:
-            ttfDesignSpace = compileInterpolatableFunc(
-                subDoc,
-                **{
-                    **kwargs,
-                    **dict(
-                        useProductionNames=False,  # will rename glyphs after varfont is built
-                        # No need to post-process intermediate fonts.
-                        postProcessorClass=None,
-                    ),
-                },
+    # FIXME: Hack until we get a fontTools config module. Disable GPOS
+    # compaction while building masters because the compaction will be undone
+    # anyway by varLib merge and then done again on the VF
+    gpos_compact_value = os.environ.pop(GPOS_COMPACT_MODE_ENV_KEY, None)
+    try:
+        workers = kwargs["workers"]
+        if len(interpolableSubDocs) > 1 and canRunInParallel(workers):
+            # The sub-spaces are independent from one another, so compile them
+            # in parallel; the masters within each are then compiled serially.
+            subDocFonts = call_in_workers(
+                compileSubDoc,
+                interpolableSubDocs,
+                workers=workers,
+                debugFeatureFile=kwargs["debugFeatureFile"],
             )
-        finally:
-            if gpos_compact_value is not None:
-                os.environ[GPOS_COMPACT_MODE_ENV_KEY] = gpos_compact_value
-
-        # Stick TTFs back into original big DS
-        for ttfSource in ttfDesignSpace.sources:
-            sourcesByName[ttfSource.name].font = ttfSource.font
+        else:
+            subDocFonts = [compileSubDoc(subDoc) for subDoc in interpolableSubDocs]
+    finally:
+        if gpos_compact_value is not None:
+            os.environ[GPOS_COMPACT_MODE_ENV_KEY] = gpos_compact_value
+
+    # Stick TTFs back into original big DS
+    for subDoc, fonts in zip(interpolableSubDocs, subDocFonts):
+        for source, font in zip(subDoc.sources, fonts):
+            sourcesByName[source.name].font = font
 
     return vfNameToBaseUfo
@@ -0,0 +1,506 @@
+"""A glyph type which stores its outline in flat arrays.
+
+The defcon and ufoLib2 glyphs have one Python object per point. A
+CompactGlyph instead stores the points of all its contours in three flat
+arrays, which take an order of magnitude less memory and can be processed
+in bulk:
+
+- `coordinates`, an array of doubles with the x and y of each point;
+- `pointTypes`, a bytearray with the code of the segment type of each point
+  (an index in SEGMENT_TYPES), plus SMOOTH if the point is smooth;
+- `contourEnds`, an array with the index after the last point of each
+  contour.
+
+It implements the parts of the ufoLib2 glyph API used by the filters and
+compilers: the pen and point pen protocols, the contours (as views on the
+arrays), components, anchors, unicodes and lib.
+
+The pre-processors make CompactGlyph copies of the glyphs they modify when
+their ``compactGlyphs`` option is True. A UFO glyph is converted to and from
+a CompactGlyph with ``ufo2ft.util._copyGlyph``.
+"""
+
+from array import array
+
+from fontTools.misc.transform import Identity, Transform
+from fontTools.pens.boundsPen import BoundsPen, ControlBoundsPen
+from fontTools.pens.pointPen import (
+    AbstractPointPen,
+    PointToSegmentPen,
+    SegmentToPointPen,
+)
+
+SEGMENT_TYPES = (None, "move", "line", "curve", "qcurve")
+SMOOTH = 0x80
+
+_SEGMENT_TYPE_CODES = {segmentType: i for i, segmentType in enumerate(SEGMENT_TYPES)}
+_MOVE = _SEGMENT_TYPE_CODES["move"]
+
+VERTICAL_ORIGIN_KEY = "public.verticalOrigin"
+
+
+def _number(value):
+    # the coordinates are stored as floats; give back integers as int
+    return int(value) if value.is_integer() else value
+
+
+class _Outline:
+    # The points of the contours of a glyph. Clearing or removing contours
+    # replaces the outline of the glyph, so that the views on the removed
+    # contours remain valid.
+
+    __slots__ = ("coordinates", "types", "ends", "pointNames", "identifiers")
+
+    def __init__(self):
+        self.coordinates = array("d")
+        self.types = bytearray()
+        self.ends = array("l")
+        # sparse mappings of point index to (name, identifier), and of
+        # contour index to identifier
+        self.pointNames = {}
+        self.identifiers = {}
+
+    def contourRange(self, index):
+        return (self.ends[index - 1] if index else 0), self.ends[index]
+
+
+class CompactPoint:
+    """A view on a point of a CompactGlyph."""
+
+    __slots__ = ("_outline", "_index")
+
+    def __init__(self, outline, index):
+        self._outline = outline
+        self._index = index
+
+    @property
+    def x(self):
+        return _number(self._outline.coordinates[2 * self._index])
+
+    @x.setter
+    def x(self, value):
+        self._outline.coordinates[2 * self._index] = value
+
+    @property
+    def y(self):
+        return _number(self._outline.coordinates[2 * self._index + 1])
+
+    @y.setter
+    def y(self, value):
+        self._outline.coordinates[2 * self._index + 1] = value
+
+    @property
+    def segmentType(self):
+        return SEGMENT_TYPES[self._outline.types[self._index] & ~SMOOTH]
+
+    @segmentType.setter
+    def segmentType(self, value):
+        types = self._outline.types
+        types[self._index] = (types[self._index] & SMOOTH) | _SEGMENT_TYPE_CODES[value]
+
+    type = segmentType
+
+    @property
+    def smooth(self):
+        return bool(self._outline.types[self._index] & SMOOTH)
+
+    @smooth.setter
+    def smooth(self, value):
+        types = self._outline.types
+        if value:
+            types[self._index] |= SMOOTH
+        else:
+            types[self._index] &= ~SMOOTH
+
+    @property
+    def name(self):
+        return self._outline.pointNames.get(self._index, (None, None))[0]
+
+    @name.setter
+    def name(self, value):
+        self._setNameAndIdentifier(value, self.identifier)
+
+    @property
+    def identifier(self):
+        return self._outline.pointNames.get(self._index, (None, None))[1]
+
+    @identifier.setter
+    def identifier(self, value):
+        self._setNameAndIdentifier(self.name, value)
+
+    def _setNameAndIdentifier(self, name, identifier):
+        if name is None and identifier is None:
+            self._outline.pointNames.pop(self._index, None)
+        else:
+            self._outline.pointNames[self._index] = (name, identifier)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(x={self.x!r}, y={self.y!r}, "
+            f"segmentType={self.segmentType!r}, smooth={self.smooth!r})"
+        )
+
+
+class CompactContour:
+    """A view on a contour of a CompactGlyph."""
+
+    __slots__ = ("_outline", "_index")
+
+    def __init__(self, outline, index):
+        self._outline = outline
+        self._index = index
+
+    def __len__(self):
+        start, end = self._outline.contourRange(self._index)
+        return end - start
+
+    def __iter__(self):
+        outline = self._outline
+        start, end = outline.contourRange(self._index)
+        for i in range(start, end):
+            yield CompactPoint(outline, i)
+
+    def __getitem__(self, index):
+        start, end = self._outline.contourRange(self._index)
+        return CompactPoint(self._outline, range(start, end)[index])
+
+    @property
+    def points(self):
+        return list(self)
+
+    @property
+    def open(self):
+        outline = self._outline
+        start, end = outline.contourRange(self._index)
+        return end > start and outline.types[start] & ~SMOOTH == _MOVE
+
+    @property
+    def identifier(self):
+        return self._outline.identifiers.get(self._index)
+
+    def drawPoints(self, pointPen):
+        outline = self._outline
+        coordinates = outline.coordinates
+        types = outline.types
+        pointNames = outline.pointNames
+        start, end = outline.contourRange(self._index)
+        pointPen.beginPath(identifier=outline.identifiers.get(self._index))
+        for i in range(start, end):
+            code = types[i]
+            name, identifier = pointNames.get(i, (None, None))
+            pointPen.addPoint(
+                (_number(coordinates[2 * i]), _number(coordinates[2 * i + 1])),
+                segmentType=SEGMENT_TYPES[code & ~SMOOTH],
+                smooth=bool(code & SMOOTH),
+                name=name,
+                identifier=identifier,
+            )
+        pointPen.endPath()
+
+    def draw(self, pen):
+        self.drawPoints(PointToSegmentPen(pen))
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self._index} ({len(self)} points)>"
+
+
+class CompactComponent:
+    __slots__ = ("baseGlyph", "transformation", "identifier")
+
+    def __init__(self, baseGlyph, transformation=Identity, identifier=None):
+        self.baseGlyph = baseGlyph
+        self.transformation = Transform(*transformation)
+        self.identifier = identifier
+
+    def drawPoints(self, pointPen):
+        pointPen.addComponent(
+            self.baseGlyph, self.transformation, identifier=self.identifier
+        )
+
+    def draw(self, pen):
+        pen.addComponent(self.baseGlyph, self.transformation)
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}({self.baseGlyph!r}, {tuple(self.transformation)})"
+        )
+
+
+class CompactAnchor:
+    __slots__ = ("x", "y", "name", "color", "identifier")
+
+    def __init__(self, x, y, name=None, color=None, identifier=None):
+        self.x = x
+        self.y = y
+        self.name = name
+        self.color = color
+        self.identifier = identifier
+
+    @classmethod
+    def coerce(cls, anchor):
+        """Return a CompactAnchor from a mapping or an anchor object."""
+        if isinstance(anchor, cls):
+            return anchor
+        if not hasattr(anchor, "x"):  # a mapping, or a defcon.Anchor
+            anchor = _AttributeView(anchor)
+        return cls(
+            anchor.x,
+            anchor.y,
+            name=anchor.name,
+            color=anchor.color,
+            identifier=anchor.identifier,
+        )
+
+    # The mapping interface makes dict(anchor) work, as with the ufoLib2 and
+    # defcon anchors.
+
+    def keys(self):
+        return [k for k in self.__slots__ if getattr(self, k) is not None]
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.x!r}, {self.y!r}, name={self.name!r})"
+
+
+class _AttributeView:
+    __slots__ = ("_mapping",)
+
+    def __init__(self, mapping):
+        self._mapping = mapping
+
+    def __getattr__(self, name):
+        return self._mapping.get(name)
+
+
+class CompactPointPen(AbstractPointPen):
+    """A point pen which appends to the contours and components of a
+    CompactGlyph.
+    """
+
+    def __init__(self, glyph):
+        self._glyph = glyph
+        self._outline = None
+        self._identifier = None
+
+    def beginPath(self, identifier=None, **kwargs):
+        self._outline = self._glyph._outline
+        self._identifier = identifier
+
+    def addPoint(
+        self, pt, segmentType=None, smooth=False, name=None, identifier=None, **kwargs
+    ):
+        outline = self._outline
+        index = len(outline.types)
+        x, y = pt
+        outline.coordinates.append(x)
+        outline.coordinates.append(y)
+        code = _SEGMENT_TYPE_CODES[segmentType]
+        outline.types.append(code | SMOOTH if smooth else code)
+        if name is not None or identifier is not None:
+            outline.pointNames[index] = (name, identifier)
+
+    def endPath(self):
+        outline = self._outline
+        if self._identifier is not None:
+            outline.identifiers[len(outline.ends)] = self._identifier
+        outline.ends.append(len(outline.types))
+        self._outline = None
+
+    def addComponent(self, baseGlyphName, transformation, identifier=None, **kwargs):
+        self._glyph.components.append(
+            CompactComponent(baseGlyphName, transformation, identifier)
+        )
+
+
+class CompactGlyph:
+    """A glyph with its outline stored in flat arrays (see module docstring).
+
+    Iterating over a CompactGlyph gives CompactContour views on its contours.
+    The views of the removed contours remain valid, and can be appended to
+    the glyph again: e.g. to sort the contours, take the list of contours,
+    clear them, and append them back in order.
+    """
+
+    def __init__(self, name=None, width=0, height=0, unicodes=None, lib=None):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.unicodes = list(unicodes) if unicodes is not None else []
+        self.lib = lib if lib is not None else {}
+        self.components = []
+        self._anchors = []
+        self._outline = _Outline()
+
+    # the flat arrays of the outline, which can be modified in place (but not
+    # resized)
+
+    @property
+    def coordinates(self):
+        return self._outline.coordinates
+
+    @property
+    def pointTypes(self):
+        return self._outline.types
+
+    @property
+    def contourEnds(self):
+        return self._outline.ends
+
+    @property
+    def lib(self):
+        return self._lib
+
+    @lib.setter
+    def lib(self, value):
+        self._lib = dict(value)
+
+    @property
+    def unicode(self):
+        return self.unicodes[0] if self.unicodes else None
+
+    @unicode.setter
+    def unicode(self, value):
+        if value is None:
+            self.unicodes = []
+        else:
+            self.unicodes = [value] + [u for u in self.unicodes if u != value]
+
+    @property
+    def verticalOrigin(self):
+        return self.lib.get(VERTICAL_ORIGIN_KEY)
+
+    @verticalOrigin.setter
+    def verticalOrigin(self, value):
+        if value is None:
+            self.lib.pop(VERTICAL_ORIGIN_KEY, None)
+        else:
+            self.lib[VERTICAL_ORIGIN_KEY] = value
+
+    @property
+    def anchors(self):
+        return self._anchors
+
+    @anchors.setter
+    def anchors(self, value):
+        self._anchors = [CompactAnchor.coerce(anchor) for anchor in value]
+
+    def appendAnchor(self, anchor):
+        self._anchors.append(CompactAnchor.coerce(anchor))
+
+    def clearAnchors(self):
+        self._anchors.clear()
+
+    @property
+    def contours(self):
+        return list(self)
+
+    def __len__(self):
+        return len(self._outline.ends)
+
+    def __iter__(self):
+        outline = self._outline
+        for i in range(len(outline.ends)):
+            yield CompactContour(outline, i)
+
+    def __getitem__(self, index):
+        outline = self._outline
+        return CompactContour(outline, range(len(outline.ends))[index])
+
+    def appendContour(self, contour):
+        """Append a copy of the contour (any object with a drawPoints method)."""
+        contour.drawPoints(self.getPointPen())
+
+    def removeContour(self, contour):
+        outline = self._outline
+        if not (
+            isinstance(contour, CompactContour)
+            and contour._outline is outline
+            and contour._index < len(outline.ends)
+        ):
+            raise ValueError("contour not in glyph")
+        contours = list(self)
+        del contours[contour._index]
+        self._outline = _Outline()
+        pen = self.getPointPen()
+        for c in contours:
+            c.drawPoints(pen)
+
+    def clearContours(self):
+        self._outline = _Outline()
+
+    def reorderContours(self, order):
+        """Reorder the contours: `order` lists the current indices of the
+        contours in their new order.
+        """
+        outline = self._outline
+        if sorted(order) != list(range(len(outline.ends))):
+            raise ValueError(f"not a permutation of the contour indices: {order}")
+        new = _Outline()
+        for newIndex, index in enumerate(order):
+            start, end = outline.contourRange(index)
+            offset = len(new.types) - start
+            new.coordinates.extend(outline.coordinates[2 * start : 2 * end])
+            new.types.extend(outline.types[start:end])
+            new.ends.append(end + offset)
+            if index in outline.identifiers:
+                new.identifiers[newIndex] = outline.identifiers[index]
+        if outline.pointNames:
+            # remap the point indices
+            newIndices = {}
+            for index in order:
+                start, end = outline.contourRange(index)
+                for i in range(start, end):
+                    newIndices[i] = len(newIndices)
+            new.pointNames = {newIndices[i]: v for i, v in outline.pointNames.items()}
+        self._outline = new
+
+    def removeComponent(self, component):
+        self.components.remove(component)
+
+    def clearComponents(self):
+        self.components.clear()
+
+    def getPointPen(self):
+        return CompactPointPen(self)
+
+    def getPen(self):
+        return SegmentToPointPen(self.getPointPen())
+
+    def drawPoints(self, pointPen):
+        for contour in self:
+            contour.drawPoints(pointPen)
+        for component in self.components:
+            component.drawPoints(pointPen)
+
+    def draw(self, pen):
+        self.drawPoints(PointToSegmentPen(pen))
+
+    def getBounds(self, layer=None):
+        pen = BoundsPen(layer)
+        self.draw(pen)
+        return pen.bounds
+
+    def getControlBounds(self, layer=None):
+        pen = ControlBoundsPen(layer)
+        self.draw(pen)
+        return pen.bounds
+
+    def move(self, delta):
+        dx, dy = delta
+        coordinates = self._outline.coordinates
+        for i in range(0, len(coordinates), 2):
+            coordinates[i] += dx
+            coordinates[i + 1] += dy
+        for component in self.components:
+            xx, xy, yx, yy, x, y = component.transformation
+            component.transformation = Transform(xx, xy, yx, yy, x + dx, y + dy)
+        for anchor in self._anchors:
+            anchor.x += dx
+            anchor.y += dy
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r} at {hex(id(self))}>"
@@ -6,7 +6,10 @@ from io import StringIO
 from tempfile import NamedTemporaryFile
 
 from fontTools import mtiLib
-from fontTools.feaLib.builder import addOpenTypeFeaturesFromString
+from fontTools.feaLib.builder import (
+    addOpenTypeFeatures,
+    addOpenTypeFeaturesFromString,
+)
 from fontTools.feaLib.error import FeatureLibError, IncludedFeaNotFound
 from fontTools.feaLib.parser import Parser
 
@@ -20,6 +23,7 @@ from ufo2ft.featureWriters import (
     isValidFeatureWriter,
     loadFeatureWriters,
 )
+from ufo2ft.profiling import stage
 
 logger = logging.getLogger(__name__)
 
@@ -124,17 +128,19 @@ class BaseFeatureCompiler:
         self.buildTables()
 
     def compile(self):
-        if "setupFile_features" in self.__class__.__dict__:
-            _deprecateMethod("setupFile_features", "setupFeatures")
-            self.setupFile_features()
-        else:
-            self.setupFeatures()
+        with stage("setupFeatures", "featureCompiler"):
+            if "setupFile_features" in self.__class__.__dict__:
+                _deprecateMethod("setupFile_features", "setupFeatures")
+                self.setupFile_features()
+            else:
+                self.setupFeatures()
 
-        if "setupFile_featureTables" in self.__class__.__dict__:
-            _deprecateMethod("setupFile_featureTables", "buildTables")
-            self.setupFile_featureTables()
-        else:
-            self.buildTables()
+        with stage("buildTables", "featureCompiler"):
+            if "setupFile_featureTables" in self.__class__.__dict__:
+                _deprecateMethod("setupFile_featureTables", "buildTables")
+                self.setupFile_featureTables()
+            else:
+                self.buildTables()
 
         return self.ttFont
 
@@ -168,6 +174,7 @@ class FeatureCompiler(BaseFeatureCompiler):
         glyphSet=None,
         featureWriters=None,
         feaIncludeDir=None,
+        compileFeaturesFromAST=False,
         **kwargs,
     ):
         """
@@ -192,10 +199,16 @@ class FeatureCompiler(BaseFeatureCompiler):
           feaIncludeDir: a directory to be used as the include directory for
             the feature file. If None, the include directory is set to the
             parent directory of the UFO, provided the UFO has a path.
+          compileFeaturesFromAST: if True, the feature file AST made by the
+            featureWriters is compiled directly, instead of being stringified
+            and parsed again. If the AST can't be compiled, e.g. because a
+            writer made statements the feaLib builder doesn't support, its
+            text is compiled instead.
         """
         BaseFeatureCompiler.__init__(self, ufo, ttFont, glyphSet)
 
         self.feaIncludeDir = feaIncludeDir
+        self.compileFeaturesFromAST = compileFeaturesFromAST
 
         self.initFeatureWriters(featureWriters)
 
@@ -279,14 +292,37 @@ class FeatureCompiler(BaseFeatureCompiler):
             featureFile = parseLayoutFeatures(self.ufo, self.feaIncludeDir)
 
             for writer in self.featureWriters:
-                writer.write(self.ufo, featureFile, compiler=self)
+                with stage(type(writer).__name__, "featureWriter"):
+                    writer.write(self.ufo, featureFile, compiler=self)
 
-            # stringify AST to get correct line numbers in error messages
-            self.features = featureFile.asFea()
+            # the AST is only stringified on demand: it may be compiled as is
+            self._features = None
+            self.featureFile = featureFile
         else:
             # no featureWriters, simply read existing features' text
             self.features = self.ufo.features.text or ""
 
+    @property
+    def features(self):
+        """The text of the features source, made from the feature file AST
+        the first time it is requested.
+        """
+        if self._features is None:
+            if self.featureFile is None:
+                raise AttributeError("features")
+            self._features = self.featureFile.asFea()
+        return self._features
+
+    @features.setter
+    def features(self, value):
+        # a features text set explicitly, e.g. by a subclass, takes
+        # precedence over the AST
+        self._features = value
+        self.featureFile = None
+
+    _features = None
+    featureFile = None
+
     def writeFeatures(self, outfile):
         if hasattr(self, "features"):
             outfile.write(self.features)
@@ -301,6 +337,23 @@ class FeatureCompiler(BaseFeatureCompiler):
         in a different way if desired.
         """
 
+        astError = None
+        if self.featureFile is not None and self.compileFeaturesFromAST:
+            if not self.featureFile.statements:
+                return
+            try:
+                with stage("addOpenTypeFeatures", "feaLib"):
+                    addOpenTypeFeatures(self.ttFont, self.featureFile)
+                return
+            except Exception as e:
+                # the locations of the generated statements are unknown, and
+                # the writers may make statements that only work once parsed
+                # (e.g. classes of ast.GlyphName): compile the stringified AST
+                # instead, so that any error points to a line of the temporary
+                # file
+                logger.warning("Compiling the features AST failed: %s", e)
+                astError = e
+
         if not self.features:
             return
 
@@ -309,7 +362,8 @@ class FeatureCompiler(BaseFeatureCompiler):
         # resolved, and we work from a string which does't exist on disk
         path = self.ufo.path if not self.featureWriters else None
         try:
-            addOpenTypeFeaturesFromString(self.ttFont, self.features, filename=path)
+            with stage("addOpenTypeFeaturesFromString", "feaLib"):
+                addOpenTypeFeaturesFromString(self.ttFont, self.features, filename=path)
         except FeatureLibError:
             if path is None:
                 # if compilation fails, create temporary file for inspection
@@ -318,6 +372,9 @@ class FeatureCompiler(BaseFeatureCompiler):
                     tmp.write(data)
                 logger.error("Compilation failed! Inspect temporary file: %r", tmp.name)
             raise
+        if isinstance(astError, FeatureLibError):
+            # the features text compiles, but the AST has an error of its own
+            raise astError
 
 
 class MtiFeatureCompiler(BaseFeatureCompiler):
@@ -140,8 +140,9 @@ def makeGlyphClassDefinitions(groups, feaFile=None, stripPrefix=""):
 
 
 def makeGlyphClassDefinition(className, members):
-    glyphNames = [ast.GlyphName(g) for g in members]
-    glyphClass = ast.GlyphClass(glyphNames)
+    # like the feaLib parser, keep the glyph names of classes as plain str,
+    # so that the AST can be compiled as is
+    glyphClass = ast.GlyphClass(list(members))
     classDef = ast.GlyphClassDefinition(className, glyphClass)
     return classDef
 
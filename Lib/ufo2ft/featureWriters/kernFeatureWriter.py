@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 
 from fontTools import unicodedata
 from fontTools.feaLib import ast
+from fontTools.feaLib.error import FeatureLibError
 
 from ufo2ft.constants import COMMON_SCRIPT, INDIC_SCRIPTS, USE_SCRIPTS
 from ufo2ft.featureWriters import BaseFeatureWriter
@@ -16,7 +17,13 @@ from ufo2ft.featureWriters.ast import (
     makeGlyphClassDefinitions,
     makeLookupFlag,
 )
-from ufo2ft.util import DFLT_SCRIPTS, classifyGlyphs, quantize, unicodeScriptDirection
+from ufo2ft.util import (
+    DFLT_SCRIPTS,
+    classifyGlyphs,
+    getUnicodeProperties,
+    quantize,
+    unicodeScriptDirection,
+)
 
 if TYPE_CHECKING:
     from typing import Iterator, Literal
@@ -41,8 +48,7 @@ def unicodeBidiType(uv: int) -> Literal["R"] | Literal["L"] | None:
     """Return "R" for characters with RTL direction, or "L" for LTR (whether
     'strong' or 'weak'), or None for neutral direction.
     """
-    char = chr(uv)
-    bidiType = unicodedata.bidirectional(char)
+    bidiType = getUnicodeProperties(uv).bidiType
     if bidiType in RTL_BIDI_TYPES:
         return "R"
     elif bidiType in LTR_BIDI_TYPES:
@@ -50,9 +56,112 @@ def unicodeBidiType(uv: int) -> Literal["R"] | Literal["L"] | None:
     return None
 
 
+def _classGlyphSet(
+    classDef: ast.GlyphClassDefinition,
+    classGlyphSets: dict[ast.GlyphClassDefinition, frozenset[str]] | None = None,
+) -> frozenset[str]:
+    """Return the glyph set of a kerning class, cached in the optional
+    classGlyphSets dict to be shared by all the pairs of the class."""
+    if classGlyphSets is None:
+        return frozenset(classDef.glyphSet())
+    glyphs = classGlyphSets.get(classDef)
+    if glyphs is None:
+        glyphs = classGlyphSets[classDef] = frozenset(classDef.glyphSet())
+    return glyphs
+
+
+def _makeSide(side, classGlyphSets=None):
+    """Return the compact form of a kerning pair side and its glyph set.
+
+    A single glyph is kept as its name (with no glyph set), a kerning class
+    as its definition and any other group of glyphs as a sorted tuple.
+    """
+    if isinstance(side, str):
+        return side, None
+    elif isinstance(side, ast.GlyphClassDefinition):
+        return side, _classGlyphSet(side, classGlyphSets)
+    elif isinstance(side, (list, set, frozenset, tuple)):
+        if len(side) == 1:
+            return next(iter(side)), None
+        return tuple(sorted(side)), frozenset(side)
+    elif isinstance(side, ast.GlyphName):
+        return side.glyph, None
+    elif isinstance(side, ast.GlyphClassName):
+        return _makeSide(side.glyphclass, classGlyphSets)
+    elif isinstance(side, ast.GlyphClass):
+        return _makeSide(side.glyphSet())
+    raise AssertionError(side)
+
+
+def _makeSideAST(side):
+    if isinstance(side, str):
+        return ast.GlyphName(side)
+    elif isinstance(side, ast.GlyphClassDefinition):
+        return ast.GlyphClassName(side)
+    return ast.GlyphClass(list(side))
+
+
+class _ReadOnlySide:
+    """Mixin for the AST of the sides of a KerningPair, which are made anew on
+    each access: they can't be changed once made."""
+
+    _frozen = False
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise AttributeError(
+                "KerningPair sides are read-only; assign a new side1 or side2"
+            )
+        super().__setattr__(name, value)
+
+
+class _ReadOnlyGlyphName(_ReadOnlySide, ast.GlyphName):
+    pass
+
+
+class _ReadOnlyGlyphClassName(_ReadOnlySide, ast.GlyphClassName):
+    pass
+
+
+class _ReadOnlyGlyphClass(_ReadOnlySide, ast.GlyphClass):
+    pass
+
+
+def _makeReadOnlySideAST(side):
+    if isinstance(side, str):
+        node = _ReadOnlyGlyphName(side)
+    elif isinstance(side, ast.GlyphClassDefinition):
+        node = _ReadOnlyGlyphClassName(side)
+    else:
+        # the glyphs are kept in the tuple, so they can't be added to either
+        node = _ReadOnlyGlyphClass(side)
+    node._frozen = True
+    return node
+
+
 class KerningPair:
+    """A kerning pair between two glyphs or classes of glyphs.
+
+    The sides are kept in a compact form: a glyph name, a kerning class
+    definition or a sorted tuple of glyph names. The glyph sets of the classes
+    are cached in the optional classGlyphSets dict, to be shared by all the
+    pairs of a class.
 
-    __slots__ = ("side1", "side2", "value", "scripts", "directions", "bidiTypes")
+    The AST of the sides is only made when side1 or side2 are accessed, and it
+    is read-only: changing it would not change the pair, so a new side must be
+    assigned instead.
+    """
+
+    __slots__ = (
+        "_side1",
+        "_side2",
+        "_firstGlyphs",
+        "_secondGlyphs",
+        "value",
+        "scripts",
+        "directions",
+        "bidiTypes",
+    )
 
     def __init__(
         self,
@@ -62,56 +171,54 @@ class KerningPair:
         scripts: set[str] | None = None,
         directions: set[str] | None = None,
         bidiTypes: set[str] | None = None,
+        classGlyphSets: dict[ast.GlyphClassDefinition, frozenset[str]] | None = None,
     ):
-        self.side1: ast.GlyphName | ast.GlyphClassName | ast.GlyphClass
-        if isinstance(side1, str):
-            self.side1 = ast.GlyphName(side1)
-        elif isinstance(side1, ast.GlyphClassDefinition):
-            self.side1 = ast.GlyphClassName(side1)
-        elif isinstance(side1, (list, set)):
-            if len(side1) == 1:
-                self.side1 = ast.GlyphName(list(side1)[0])
-            else:
-                self.side1 = ast.GlyphClass([ast.GlyphName(g) for g in sorted(side1)])
-        else:
-            raise AssertionError(side1)
-
-        self.side2: ast.GlyphName | ast.GlyphClassName | ast.GlyphClass
-        if isinstance(side2, str):
-            self.side2 = ast.GlyphName(side2)
-        elif isinstance(side2, ast.GlyphClassDefinition):
-            self.side2 = ast.GlyphClassName(side2)
-        elif isinstance(side2, (list, set)):
-            if len(side2) == 1:
-                self.side2 = ast.GlyphName(list(side2)[0])
-            else:
-                self.side2 = ast.GlyphClass([ast.GlyphName(g) for g in sorted(side2)])
-        else:
-            raise AssertionError(side2)
-
+        self._side1, self._firstGlyphs = _makeSide(side1, classGlyphSets)
+        self._side2, self._secondGlyphs = _makeSide(side2, classGlyphSets)
         self.value: float = value
         self.scripts: set[str] = scripts or set()
         self.directions: set[str] = directions or set()
         self.bidiTypes: set[str] = bidiTypes or set()
 
+    @property
+    def side1(self) -> ast.GlyphName | ast.GlyphClassName | ast.GlyphClass:
+        return _makeReadOnlySideAST(self._side1)
+
+    @side1.setter
+    def side1(self, side1):
+        self._side1, self._firstGlyphs = _makeSide(side1)
+
+    @property
+    def side2(self) -> ast.GlyphName | ast.GlyphClassName | ast.GlyphClass:
+        return _makeReadOnlySideAST(self._side2)
+
+    @side2.setter
+    def side2(self, side2):
+        self._side2, self._secondGlyphs = _makeSide(side2)
+
     # pyright: basic
     def partitionByScript(
-        self, glyphScripts: dict[str, set[str]]
+        self,
+        glyphScripts: dict[str, set[str]],
+        sideScripts: dict[frozenset[str], dict[tuple[str, ...], list[str]]]
+        | None = None,
     ) -> Iterator[tuple[str, KerningPair]]:
         """Split a potentially mixed-script pair into pairs that make sense based
-        on the dominant script, and yield each combination with its dominant script."""
+        on the dominant script, and yield each combination with its dominant script.
+
+        The glyphs of each class side are partitioned by their scripts once, and
+        cached in the optional sideScripts dict to be reused by the other pairs
+        of the same class."""
 
         # First, partition the pair by their assigned scripts
-        allFirstScripts: dict[tuple[str, ...], list[str]] = {}
-        allSecondScripts: dict[tuple[str, ...], list[str]] = {}
-        for glyph in self.firstGlyphs:
-            if glyph not in glyphScripts:
-                glyphScripts[glyph] = {COMMON_SCRIPT}
-            allFirstScripts.setdefault(tuple(glyphScripts[glyph]), []).append(glyph)
-        for glyph in self.secondGlyphs:
-            if glyph not in glyphScripts:
-                glyphScripts[glyph] = {COMMON_SCRIPT}
-            allSecondScripts.setdefault(tuple(glyphScripts[glyph]), []).append(glyph)
+        if sideScripts is None:
+            sideScripts = {}
+        allFirstScripts = self._partitionSide(
+            self._side1, self._firstGlyphs, glyphScripts, sideScripts
+        )
+        allSecondScripts = self._partitionSide(
+            self._side2, self._secondGlyphs, glyphScripts, sideScripts
+        )
 
         # Super common case: both sides are of the same, one script. Nothing to do, emit
         # self as is.
@@ -187,40 +294,61 @@ class KerningPair:
                     )
                     yield common, localPair
 
+    @staticmethod
+    def _partitionSide(
+        side: str | ast.GlyphClassDefinition | tuple[str, ...],
+        glyphs: frozenset[str] | None,
+        glyphScripts: dict[str, set[str]],
+        sideScripts: dict[frozenset[str], dict[tuple[str, ...], list[str]]],
+    ) -> dict[tuple[str, ...], list[str]]:
+        if glyphs is None:
+            if side not in glyphScripts:
+                glyphScripts[side] = {COMMON_SCRIPT}
+            return {tuple(glyphScripts[side]): [side]}
+        allScripts = sideScripts.get(glyphs)
+        if allScripts is None:
+            allScripts = sideScripts[glyphs] = {}
+            for glyph in glyphs:
+                if glyph not in glyphScripts:
+                    glyphScripts[glyph] = {COMMON_SCRIPT}
+                allScripts.setdefault(tuple(glyphScripts[glyph]), []).append(glyph)
+        return allScripts
+
     @property
     def firstIsClass(self) -> bool:
-        return isinstance(self.side1, (ast.GlyphClassName, ast.GlyphClass))
+        return self._firstGlyphs is not None
 
     @property
     def secondIsClass(self) -> bool:
-        return isinstance(self.side2, (ast.GlyphClassName, ast.GlyphClass))
+        return self._secondGlyphs is not None
 
     @property
-    def firstGlyphs(self) -> set[str]:
-        if self.firstIsClass:
-            if isinstance(self.side1, ast.GlyphClassName):
-                classDef1 = self.side1.glyphclass
-            else:
-                classDef1 = self.side1
-            return {g.asFea() for g in classDef1.glyphSet()}
-        else:
-            return {self.side1.asFea()}
+    def firstGlyphs(self) -> frozenset[str]:
+        if self._firstGlyphs is None:
+            return frozenset((self._side1,))
+        return self._firstGlyphs
 
     @property
-    def secondGlyphs(self) -> set[str]:
-        if self.secondIsClass:
-            if isinstance(self.side2, ast.GlyphClassName):
-                classDef2 = self.side2.glyphclass
-            else:
-                classDef2 = self.side2
-            return {g.asFea() for g in classDef2.glyphSet()}
-        else:
-            return {self.side2.asFea()}
+    def secondGlyphs(self) -> frozenset[str]:
+        if self._secondGlyphs is None:
+            return frozenset((self._side2,))
+        return self._secondGlyphs
 
     @property
-    def glyphs(self) -> set[str]:
+    def glyphs(self) -> frozenset[str]:
         return self.firstGlyphs | self.secondGlyphs
 
+    def intersects(self, glyphs: set[str] | frozenset[str]) -> bool:
+        """Return whether any glyph of the pair is in glyphs."""
+        if self._firstGlyphs is None:
+            if self._side1 in glyphs:
+                return True
+        elif not self._firstGlyphs.isdisjoint(glyphs):
+            return True
+        if self._secondGlyphs is None:
+            return self._side2 in glyphs
+        return not self._secondGlyphs.isdisjoint(glyphs)
+
     def __repr__(self) -> str:
         return "<{} {} {} {}{}{}{}>".format(
             self.__class__.__name__,
@@ -233,6 +361,94 @@ class KerningPair:
         )
 
 
+class PairPosRules(ast.Statement):
+    """A sequence of kerning pair positioning rules, to be compiled by the
+    feaLib builder like one ast.PairPosStatement per pair.
+
+    The rules are fed directly to the builder without making their AST: each
+    is only kept as a (side1, side2, valuerecord) tuple of the compact sides
+    of the KerningPair, and the value records are shared by all the rules
+    with the same value. The text of the rules is only made when asFea is
+    called.
+    """
+
+    def __init__(self, quantization=1, location=None):
+        super().__init__(location)
+        self.quantization = quantization
+        self.rules = []
+        self._valueRecords = {}
+
+    def append(self, pair, rtl=False):
+        value = quantize(pair.value, self.quantization)
+        if rtl and "L" in pair.bidiTypes:
+            # numbers are always shaped LTR even in RTL scripts
+            rtl = False
+        valuerecord = self._valueRecords.get((value, rtl))
+        if valuerecord is None:
+            valuerecord = self._valueRecords[value, rtl] = ast.ValueRecord(
+                xPlacement=value if rtl else None,
+                yPlacement=0 if rtl else None,
+                xAdvance=value,
+                yAdvance=0 if rtl else None,
+            )
+        self.rules.append((pair._side1, pair._side2, valuerecord))
+
+    @staticmethod
+    def _isEnumerated(side1, side2):
+        return isinstance(side1, str) ^ isinstance(side2, str)
+
+    def build(self, builder):
+        # call the builder like ast.PairPosStatement.build does for each rule
+        location = self.location
+        # the glyphs of the kerning classes, in the order of their definitions
+        # like in the AST: the order of the classes in the subtables depends
+        # on it
+        classGlyphs = {}
+
+        def sideGlyphs(side):
+            if isinstance(side, str):
+                return (side,)
+            elif isinstance(side, ast.GlyphClassDefinition):
+                glyphs = classGlyphs.get(side)
+                if glyphs is None:
+                    glyphs = classGlyphs[side] = side.glyphSet()
+                return glyphs
+            return side
+
+        for side1, side2, valuerecord in self.rules:
+            if isinstance(side1, str) and isinstance(side2, str):
+                builder.add_specific_pair_pos(location, side1, valuerecord, side2, None)
+            elif self._isEnumerated(side1, side2):
+                seenPair = False
+                for glyph1, glyph2 in itertools.product(
+                    sideGlyphs(side1), sideGlyphs(side2)
+                ):
+                    seenPair = True
+                    builder.add_specific_pair_pos(
+                        location, glyph1, valuerecord, glyph2, None
+                    )
+                if not seenPair:
+                    raise FeatureLibError(
+                        "Empty glyph class in positioning rule", location
+                    )
+            else:
+                builder.add_class_pair_pos(
+                    location, sideGlyphs(side1), valuerecord, sideGlyphs(side2), None
+                )
+
+    def asFea(self, indent=""):
+        return ("\n" + indent).join(
+            ast.PairPosStatement(
+                _makeSideAST(side1),
+                valuerecord,
+                _makeSideAST(side2),
+                None,
+                enumerated=self._isEnumerated(side1, side2),
+            ).asFea(indent=indent)
+            for side1, side2, valuerecord in self.rules
+        )
+
+
 class KernFeatureWriter(BaseFeatureWriter):
     """Generates a kerning feature based on groups and rules contained
     in an UFO's kerning data.
@@ -244,11 +460,17 @@ class KernFeatureWriter(BaseFeatureWriter):
 
     If the `quantization` argument is given in the filter options, the resulting
     anchors are rounded to the nearest multiple of the quantization value.
+
+    If the `compactRules` option is True, the pairs of each kerning lookup
+    are kept in a single PairPosRules statement, which passes them directly
+    to the feaLib builder, instead of one PairPosStatement per pair. The
+    compiled GPOS table and the features text are the same, but the lookups
+    take much less memory for fonts with many kerning pairs.
     """
 
     tableTag = "GPOS"
     features = frozenset(["kern", "dist"])
-    options = dict(ignoreMarks=True, quantization=1)
+    options = dict(ignoreMarks=True, quantization=1, compactRules=False)
 
     def setContext(self, font, feaFile, compiler=None):
         ctx = super().setContext(font, feaFile, compiler=compiler)
@@ -310,9 +532,16 @@ class KernFeatureWriter(BaseFeatureWriter):
     @classmethod
     def getKerningData(cls, font, feaFile=None, glyphSet=None):
         side1Classes, side2Classes = cls.getKerningClasses(font, feaFile, glyphSet)
-        pairs = cls.getKerningPairs(font, side1Classes, side2Classes, glyphSet)
+        # the glyph sets of the kerning classes, shared by all their pairs
+        classGlyphSets = {}
+        pairs = cls.getKerningPairs(
+            font, side1Classes, side2Classes, glyphSet, classGlyphSets=classGlyphSets
+        )
         return SimpleNamespace(
-            side1Classes=side1Classes, side2Classes=side2Classes, pairs=pairs
+            side1Classes=side1Classes,
+            side2Classes=side2Classes,
+            pairs=pairs,
+            classGlyphSets=classGlyphSets,
         )
 
     @staticmethod
@@ -348,7 +577,11 @@ class KernFeatureWriter(BaseFeatureWriter):
         return side1Classes, side2Classes
 
     @staticmethod
-    def getKerningPairs(font, side1Classes, side2Classes, glyphSet=None):
+    def getKerningPairs(
+        font, side1Classes, side2Classes, glyphSet=None, classGlyphSets=None
+    ):
+        if classGlyphSets is None:
+            classGlyphSets = {}
         if glyphSet:
             allGlyphs = set(glyphSet.keys())
         else:
@@ -377,16 +610,47 @@ class KernFeatureWriter(BaseFeatureWriter):
                     side1 = side1Classes[side1]
                 if secondIsClass:
                     side2 = side2Classes[side2]
-                result.append(KerningPair(side1, side2, value))
+                result.append(
+                    KerningPair(side1, side2, value, classGlyphSets=classGlyphSets)
+                )
         return result
 
     def _intersectPairs(self, attribute, glyphSets):
+        # Index the keys of each glyph, then resolve the keys of each side
+        # once: the glyph sets of a class are shared by all its pairs.
+        glyphKeys = {}
+        for key, glyphs in glyphSets.items():
+            for glyph in glyphs:
+                glyphKeys.setdefault(glyph, set()).add(key)
+        sideKeys = {}
         allKeys = set()
+
+        def resolveKeys(side, glyphs):
+            if glyphs is None:
+                keys = sideKeys[side] = glyphKeys.get(side, frozenset())
+            else:
+                keys = sideKeys[glyphs] = set()
+                for glyph in glyphs:
+                    if glyph in glyphKeys:
+                        keys |= glyphKeys[glyph]
+            allKeys.update(keys)
+            return keys
+
         for pair in self.context.kerning.pairs:
-            for key, glyphs in glyphSets.items():
-                if not pair.glyphs.isdisjoint(glyphs):
-                    getattr(pair, attribute).add(key)
-                    allKeys.add(key)
+            side1 = pair._firstGlyphs
+            if side1 is None:
+                side1 = pair._side1
+            keys1 = sideKeys.get(side1)
+            if keys1 is None:
+                keys1 = resolveKeys(pair._side1, pair._firstGlyphs)
+            side2 = pair._secondGlyphs
+            if side2 is None:
+                side2 = pair._side2
+            keys2 = sideKeys.get(side2)
+            if keys2 is None:
+                keys2 = resolveKeys(pair._side2, pair._secondGlyphs)
+            if keys1 or keys2:
+                getattr(pair, attribute).update(keys1, keys2)
         return allKeys
 
     @staticmethod
@@ -424,9 +688,9 @@ class KernFeatureWriter(BaseFeatureWriter):
             yAdvance=0 if rtl else None,
         )
         return ast.PairPosStatement(
-            glyphs1=pair.side1,
+            glyphs1=_makeSideAST(pair._side1),
             valuerecord1=valuerecord,
-            glyphs2=pair.side2,
+            glyphs2=_makeSideAST(pair._side2),
             valuerecord2=None,
             enumerated=enumerated,
         )
@@ -435,9 +699,14 @@ class KernFeatureWriter(BaseFeatureWriter):
         lookup = ast.LookupBlock(name)
         if ignoreMarks and self.options.ignoreMarks:
             lookup.statements.append(makeLookupFlag("IgnoreMarks"))
+        if self.options.compactRules:
+            lookup.statements.append(PairPosRules(self.options.quantization))
         return lookup
 
     def _addPairToLookup(self, lookup, pair, rtl=False):
+        if self.options.compactRules:
+            lookup.statements[-1].append(pair, rtl=rtl)
+            return
         lookup.statements.append(
             self._makePairPosRule(pair, rtl=rtl, quantization=self.options.quantization)
         )
@@ -449,7 +718,7 @@ class KernFeatureWriter(BaseFeatureWriter):
             return COMMON_SCRIPT
         return [
             x
-            for x in unicodedata.script_extension(chr(uv))
+            for x in getUnicodeProperties(uv).scriptExtensions
             if x in self.context.knownScripts or x in DFLT_SCRIPTS
         ]
 
@@ -490,7 +759,7 @@ class KernFeatureWriter(BaseFeatureWriter):
         basePairs, markPairs = [], []
         if marks:
             for pair in pairs:
-                if any(glyph in marks for glyph in pair.glyphs):
+                if pair.intersects(marks):
                     markPairs.append(pair)
                 else:
                     basePairs.append(pair)
@@ -501,8 +770,9 @@ class KernFeatureWriter(BaseFeatureWriter):
     def _makeSplitScriptKernLookups(
         self, lookups, pairs, glyphScripts, ignoreMarks=True, suffix=""
     ):
+        sideScripts = {}
         for pair in pairs:
-            for script, splitpair in pair.partitionByScript(glyphScripts):
+            for script, splitpair in pair.partitionByScript(glyphScripts, sideScripts):
                 key = "kern_" + script + suffix
                 script_lookups = lookups.setdefault(script, {})
                 lookup = script_lookups.get(key)
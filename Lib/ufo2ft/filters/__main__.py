@@ -25,6 +25,13 @@ include_group.add_argument(
 include_group.add_argument(
     "--exclude", metavar="GLYPHS", help="comma-separated list of glyphs to not filter"
 )
+parser.add_argument(
+    "--workers",
+    "-j",
+    type=int,
+    metavar="N",
+    help="number of processes for running glyph-local filters (0: one per CPU)",
+)
 parser.add_argument("ufo", metavar="UFO", help="UFO file")
 parser.add_argument("filters", metavar="FILTER", nargs="+", help="filter name")
 
@@ -53,6 +60,8 @@ for filtername in args.filters:
     f = loadFilterFromString(filtername)
     if include is not None:
         f.include = include
+    if args.workers is not None:
+        f.workers = args.workers
     f(ufo)
 
 logger.info("Written on %s" % args.output)
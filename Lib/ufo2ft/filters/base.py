@@ -1,9 +1,13 @@
+import itertools
 import logging
 from types import SimpleNamespace
 
 from fontTools.misc.loggingTools import Timer
+from fontTools.pens.recordingPen import RecordingPointPen
 
-from ufo2ft.util import _GlyphSet, _LazyFontName, getMaxComponentDepth
+from ufo2ft.parallel import canRunInParallel, parallelMap, splitInChunks
+from ufo2ft.profiling import stage
+from ufo2ft.util import ComponentGraph, _GlyphSet, _LazyFontName
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +26,25 @@ class BaseFilter:
     # filters
     _pre = False
 
+    # True if the filter is glyph-local: filtering a glyph only reads and modifies
+    # the outline (contours and components) of that same glyph, and doesn't
+    # depend on the outcome of filtering any other glyph. Glyph-local filters
+    # can be run on multiple worker processes (see the 'workers' argument).
+    _glyphLocal = False
+
+    # number of glyphs per task sent to the worker processes
+    _chunkSize = 64
+
+    # True if the filter only modifies the glyphs through their methods,
+    # attributes and containers (e.g. with a pen, clearContours, appendAnchor or
+    # removeComponent), and never modifies their contours, points, components
+    # or anchors in place. The pre-processors then pass it glyphs that are only
+    # copied from the source font when first modified; other filters are given
+    # private copies of all the glyphs. It is only read from the filter's own
+    # class, so that subclasses which may modify the glyphs differently must
+    # set it again.
+    _copyOnWrite = False
+
     def __init__(self, *args, **kwargs):
         self.options = options = SimpleNamespace()
 
@@ -71,6 +94,10 @@ class BaseFilter:
         # process special pre argument
         self.pre = kwargs.pop("pre", self._pre)
 
+        # process special workers argument: the number of processes used to run
+        # glyph-local filters in parallel (None means serial, 0 one per CPU)
+        self.workers = kwargs.pop("workers", None)
+
         # process special include/exclude arguments
         include = kwargs.pop("include", None)
         exclude = kwargs.pop("exclude", None)
@@ -143,7 +170,9 @@ class BaseFilter:
 
         The default implementation simply sets the current font and glyphSet,
         and initializes an empty set that keeps track of the names of the
-        glyphs that were modified.
+        glyphs that were modified. When filtering, the context also has a
+        `componentGraph` attribute (`ufo2ft.util.ComponentGraph`), set after
+        this method returns.
 
         Returns the namespace instance.
         """
@@ -158,6 +187,23 @@ class BaseFilter:
         """
         raise NotImplementedError
 
+    def get_worker_state(self):
+        """Return picklable data collected in `self.context` while filtering
+        glyphs in a worker process, to be passed on to `merge_worker_state`
+        in the main process. Only used when running in parallel.
+
+        The default implementation returns None.
+        """
+        return None
+
+    def merge_worker_state(self, state):
+        """Merge the `state` returned by `get_worker_state` from a worker
+        process into the current `self.context`.
+
+        The default implementation does nothing.
+        """
+        pass
+
     @property
     def name(self):
         return self.__class__.__name__
@@ -182,6 +228,15 @@ class BaseFilter:
 
         context = self.set_context(font, glyphSet)
 
+        # the pre-processors share one component graph between all the filters
+        # they run on a glyph set; otherwise a new one is built
+        componentGraph = getattr(glyphSet, "componentGraph", None)
+        if componentGraph is None:
+            componentGraph = ComponentGraph(glyphSet)
+        else:
+            componentGraph.update(())
+        context.componentGraph = componentGraph
+
         filter_ = self.filter
         include = self.include
         modified = context.modified
@@ -190,17 +245,19 @@ class BaseFilter:
         # with more deeply nested components before shallower ones) to avoid
         # order-dependent interferences while filtering glyphs with nested components
         # https://github.com/googlefonts/ufo2ft/issues/621
-        orderedGlyphs = sorted(
-            glyphSet.keys(), key=lambda g: -getMaxComponentDepth(glyphSet[g], glyphSet)
-        )
-
-        with Timer() as t:
-            for glyphName in orderedGlyphs:
-                if glyphName in modified:
-                    continue
-                glyph = glyphSet[glyphName]
-                if include(glyph) and filter_(glyph):
-                    modified.add(glyphName)
+        levels = componentGraph.levels()
+
+        with Timer() as t, stage(self.name, "filter", font=fontName):
+            if self._glyphLocal and canRunInParallel(self.workers):
+                self._runInWorkers(levels)
+            else:
+                for glyphName in itertools.chain.from_iterable(levels):
+                    if glyphName in modified:
+                        continue
+                    glyph = glyphSet[glyphName]
+                    if include(glyph) and filter_(glyph):
+                        modified.add(glyphName)
+        componentGraph.update(modified)
 
         num = len(modified)
         if num > 0:
@@ -212,3 +269,45 @@ class BaseFilter:
                 "" if num == 1 else "s",
             )
         return modified
+
+    def _runInWorkers(self, levels):
+        # Glyph-local filters don't read the glyphs they are not filtering, so
+        # the levels of equal component depth don't have to wait for each other:
+        # all the glyphs are split in chunks, in the same deepest-first order as
+        # the serial loop, and filtered on a single pool of worker processes. The
+        # workers send back the modified outlines as recordings, which are
+        # replayed onto the glyphs in that order.
+        glyphSet = self.context.glyphSet
+        modified = self.context.modified
+        glyphNames = [
+            g for g in itertools.chain.from_iterable(levels) if g not in modified
+        ]
+        chunks = splitInChunks(glyphNames, self.workers, self._chunkSize)
+        for outlines, state in parallelMap(
+            self._filterChunk, chunks, workers=self.workers
+        ):
+            for glyphName, recording in outlines:
+                glyph = glyphSet[glyphName]
+                glyph.clearContours()
+                glyph.clearComponents()
+                recording.replay(glyph.getPointPen())
+                modified.add(glyphName)
+            self.merge_worker_state(state)
+
+    def _filterChunk(self, glyphNames):
+        # called in a worker process: filter the glyphs and return the new
+        # outlines of those that were modified, plus any filter-specific state.
+        # The context is reset so that state isn't counted twice when the same
+        # worker process runs more than one chunk.
+        componentGraph = self.context.componentGraph
+        context = self.set_context(self.context.font, self.context.glyphSet)
+        context.componentGraph = componentGraph
+        glyphSet = context.glyphSet
+        outlines = []
+        for glyphName in glyphNames:
+            glyph = glyphSet[glyphName]
+            if self.include(glyph) and self.filter(glyph):
+                recording = RecordingPointPen()
+                glyph.drawPoints(recording)
+                outlines.append((glyphName, recording))
+        return outlines, self.get_worker_state()
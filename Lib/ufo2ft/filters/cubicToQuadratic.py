@@ -17,6 +17,10 @@ class CubicToQuadraticFilter(BaseFilter):
         "rememberCurveType": False,
     }
 
+    _glyphLocal = True
+
+    _copyOnWrite = True
+
     def set_context(self, font, glyphSet):
         ctx = super().set_context(font, glyphSet)
 
@@ -27,6 +31,13 @@ class CubicToQuadraticFilter(BaseFilter):
 
         return ctx
 
+    def get_worker_state(self):
+        return self.context.stats
+
+    def merge_worker_state(self, stats):
+        for length, count in stats.items():
+            self.context.stats[length] = self.context.stats.get(length, 0) + count
+
     def __call__(self, font, glyphSet=None):
         if self.options.rememberCurveType:
             # check first in the global font lib, then in layer lib
@@ -60,14 +71,14 @@ class CubicToQuadraticFilter(BaseFilter):
         if not len(glyph):
             return False
 
+        contours = list(glyph)
+        glyph.clearContours()
         pen = Cu2QuPointPen(
             glyph.getPointPen(),
             self.context.absoluteError,
             reverse_direction=self.options.reverseDirection,
             stats=self.context.stats,
         )
-        contours = list(glyph)
-        glyph.clearContours()
         for contour in contours:
             contour.drawPoints(pen)
         return True
@@ -5,6 +5,16 @@ from ufo2ft.filters import BaseFilter
 
 
 class DecomposeTransformedComponentsFilter(BaseFilter):
+
+    _copyOnWrite = True
+
+    def set_context(self, font, glyphSet):
+        context = super().set_context(font, glyphSet)
+        # the contours of the base glyphs, recorded once and replayed into all
+        # the composites that use them
+        context.contoursCache = {}
+        return context
+
     def filter(self, glyph):
         if not glyph.components:
             return False
@@ -15,6 +25,15 @@ class DecomposeTransformedComponentsFilter(BaseFilter):
                 break
         if not needs_decomposition:
             return False
-        ufo2ft.util.deepCopyContours(self.context.glyphSet, glyph, glyph, Transform())
+        contoursCache = self.context.contoursCache
+        ufo2ft.util.deepCopyContours(
+            self.context.glyphSet,
+            glyph,
+            glyph,
+            Transform(),
+            contoursCache=contoursCache,
+        )
         glyph.clearComponents()
+        # the glyph's contours changed, in case it's a component of another glyph
+        ufo2ft.util.discardCachedContours(contoursCache, glyph.name)
         return True
@@ -98,6 +98,8 @@ class DottedCircleFilter(BaseFilter):
 
     _kwargs = {"margin": 80, "sidebearing": 160, "dots": 12}
 
+    _copyOnWrite = True
+
     def __call__(self, font, glyphSet=None):
         fontName = _LazyFontName(font)
         if glyphSet is not None and getattr(glyphSet, "name", None):
@@ -10,6 +10,8 @@ class ExplodeColorLayerGlyphsFilter(BaseFilter):
     in the COLR table.
     """
 
+    _copyOnWrite = True
+
     def set_context(self, font, glyphSet):
         context = super().set_context(font, glyphSet)
         context.globalColorLayerMapping = font.lib.get(COLOR_LAYER_MAPPING_KEY)
@@ -8,6 +8,9 @@ logger = logging.getLogger(__name__)
 
 
 class FlattenComponentsFilter(BaseFilter):
+
+    _copyOnWrite = True
+
     def __call__(self, font, glyphSet=None):
         if super().__call__(font, glyphSet):
             modified = self.context.modified
@@ -15,13 +18,22 @@ class FlattenComponentsFilter(BaseFilter):
                 logger.info("Flattened composite glyphs: %i" % len(modified))
             return modified
 
+    def set_context(self, font, glyphSet):
+        context = super().set_context(font, glyphSet)
+        # the flattened components of the composite glyphs used as components,
+        # computed once for all the glyphs that use them
+        context.flattenedGlyphs = {}
+        return context
+
     def filter(self, glyph):
         flattened = False
         if not glyph.components:
             return flattened
         pen = glyph.getPen()
         for comp in list(glyph.components):
-            flattened_tuples = _flattenComponent(self.context.glyphSet, comp)
+            flattened_tuples = _flattenComponent(
+                self.context.glyphSet, comp, self.context.flattenedGlyphs
+            )
             if flattened_tuples[0] != (comp.baseGlyph, comp.transformation):
                 flattened = True
             glyph.removeComponent(comp)
@@ -32,8 +44,12 @@ class FlattenComponentsFilter(BaseFilter):
         return flattened
 
 
-def _flattenComponent(glyphSet, component):
-    """Returns a list of tuples (baseGlyph, transform) of nested component."""
+def _flattenComponent(glyphSet, component, flattenedGlyphs=None):
+    """Returns a list of tuples (baseGlyph, transform) of nested component.
+
+    If a `flattenedGlyphs` dict is passed, the flattened components of the
+    nested composite glyphs are cached there, keyed by glyph name.
+    """
 
     glyph = glyphSet[component.baseGlyph]
     # Any contour will cause components to be decomposed
@@ -41,13 +57,23 @@ def _flattenComponent(glyphSet, component):
         transformation = Transform(*component.transformation)
         return [(component.baseGlyph, transformation)]
 
+    if flattenedGlyphs is None:
+        flattenedGlyphs = {}
+    try:
+        nested_flattened_components = flattenedGlyphs[component.baseGlyph]
+    except KeyError:
+        nested_flattened_components = flattenedGlyphs[component.baseGlyph] = [
+            flattened_component
+            for nested in glyph.components
+            for flattened_component in _flattenComponent(
+                glyphSet, nested, flattenedGlyphs
+            )
+        ]
+
+    transformation = Transform(*component.transformation)
     all_flattened_components = []
-    for nested in glyph.components:
-        flattened_components = _flattenComponent(glyphSet, nested)
-        for i, (name, tr) in enumerate(flattened_components):
-            flat_tr = Transform(*component.transformation)
-            flat_tr = flat_tr.translate(tr.dx, tr.dy)
-            flat_tr = flat_tr.transform((tr.xx, tr.xy, tr.yx, tr.yy, 0, 0))
-            flattened_components[i] = (name, flat_tr)
-        all_flattened_components.extend(flattened_components)
+    for name, tr in nested_flattened_components:
+        flat_tr = transformation.translate(tr.dx, tr.dy)
+        flat_tr = flat_tr.transform((tr.xx, tr.xy, tr.yx, tr.yy, 0, 0))
+        all_flattened_components.append((name, flat_tr))
     return all_flattened_components
@@ -23,6 +23,9 @@ logger = logging.getLogger(__name__)
 
 
 class PropagateAnchorsFilter(BaseFilter):
+
+    _copyOnWrite = True
+
     def set_context(self, font, glyphSet):
         ctx = super().set_context(font, glyphSet)
         ctx.processed = set()
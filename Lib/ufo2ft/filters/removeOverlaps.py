@@ -14,6 +14,10 @@ class RemoveOverlapsFilter(BaseFilter):
     # use booleanOperations by default, unless pathops specified as backend
     _kwargs = {"backend": Backend.BOOLEAN_OPERATIONS}
 
+    _glyphLocal = True
+
+    _copyOnWrite = True
+
     def start(self):
         self.options.backend = self.Backend(self.options.backend)
 
@@ -3,6 +3,8 @@ import logging
 import fontTools.pens.boundsPen
 
 from ufo2ft.filters import BaseFilter
+from ufo2ft.geometry import contourControlBounds
+from ufo2ft.util import _getCompactGlyph
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,10 @@ class SortContoursFilter(BaseFilter):
     or U+2591 LIGHT SHADE).
     """
 
+    _glyphLocal = True
+
+    _copyOnWrite = True
+
     def filter(self, glyph):
         if len(glyph) == 0:  # As in, no contours.
             return False
@@ -30,6 +36,16 @@ class SortContoursFilter(BaseFilter):
                 glyph.name,
             )
 
+        compactGlyph = _getCompactGlyph(glyph)
+        if compactGlyph is not None:
+            # compute the bounds of all the contours in bulk
+            bounds = contourControlBounds(
+                compactGlyph.coordinates, compactGlyph.contourEnds
+            )
+            order = sorted(range(len(bounds)), key=bounds.__getitem__)
+            compactGlyph.reorderContours(order)
+            return True
+
         contours = sorted(
             (c for c in glyph), key=lambda contour: _control_bounding_box(contour)
         )
@@ -9,6 +9,8 @@ from fontTools.pens.transformPen import TransformPointPen as _TransformPointPen
 
 from ufo2ft.filters import BaseFilter
 from ufo2ft.fontInfoData import getAttrWithFallback
+from ufo2ft.geometry import transformCoordinates
+from ufo2ft.util import _getCompactGlyph
 
 log = logging.getLogger(__name__)
 
@@ -46,6 +48,8 @@ class TransformationsFilter(BaseFilter):
         "Origin": 4,  # BASELINE
     }
 
+    _copyOnWrite = True
+
     def start(self):
         self.options.Origin = self.Origin(self.options.Origin)
 
@@ -111,14 +115,24 @@ class TransformationsFilter(BaseFilter):
                 # transformed, or there are no more components
                 modified.add(base_name)
 
-        rec = RecordingPointPen()
-        glyph.drawPoints(rec)
-        glyph.clearContours()
-        glyph.clearComponents()
-
-        outpen = glyph.getPointPen()
-        filterpen = TransformPointPen(outpen, matrix, modified)
-        rec.replay(filterpen)
+        compactGlyph = _getCompactGlyph(glyph)
+        if compactGlyph is not None:
+            # transform the points in bulk, and the components through the pen
+            transformCoordinates(compactGlyph.coordinates, matrix)
+            components = list(compactGlyph.components)
+            compactGlyph.clearComponents()
+            filterpen = TransformPointPen(compactGlyph.getPointPen(), matrix, modified)
+            for component in components:
+                component.drawPoints(filterpen)
+        else:
+            rec = RecordingPointPen()
+            glyph.drawPoints(rec)
+            glyph.clearContours()
+            glyph.clearComponents()
+
+            outpen = glyph.getPointPen()
+            filterpen = TransformPointPen(outpen, matrix, modified)
+            rec.replay(filterpen)
 
         # anchors are not drawn through the pen API,
         # must be transformed separately
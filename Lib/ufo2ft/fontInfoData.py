@@ -6,6 +6,9 @@ functions that are important:
 * :func:`~getAttrWithFallback`
 * :func:`~preflightInfo`
 
+:class:`~ResolvedInfo` gives the values of :func:`~getAttrWithFallback`
+for all the attributes of an info object, computed once.
+
 There are a set of other functions that are used internally
 for synthesizing values for specific attributes. These can be
 used externally as well.
@@ -518,6 +521,35 @@ def getAttrWithFallback(info, attr):
     return value
 
 
+# the fallbacks which don't only depend on the info attributes
+_volatileFallbacks = {"openTypeHeadCreated"}
+
+
+class ResolvedInfo:
+    """
+    The attributes of the *info* object, with the fallbacks of
+    :func:`~getAttrWithFallback` applied: ``resolved.attr`` is the
+    same as ``getAttrWithFallback(info, "attr")``, but each value
+    is only computed once.
+
+    The values are not updated when the info object changes: make
+    a new instance for each compilation.
+    """
+
+    def __init__(self, info):
+        self._info = info
+
+    def __getattr__(self, attr):
+        # only called for the values not computed yet
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        info = self._info
+        value = getAttrWithFallback(info, attr)
+        if attr not in _volatileFallbacks or getattr(info, attr, None) is not None:
+            setattr(self, attr, value)
+        return value
+
+
 def preflightInfo(info):
     """
     Returns a dict containing two items. The value for each
@@ -0,0 +1,131 @@
+"""Bulk geometry operations on flat coordinate arrays.
+
+The coordinates are a flat sequence with the x and y of each point, as in
+the `coordinates` array of a `ufo2ft.compactGlyph.CompactGlyph`, and the
+contours are given by the index after their last point, as in its
+`contourEnds` array.
+
+The functions work in plain Python. If NumPy is installed, they use it for
+the arrays with at least NUMPY_MIN_COORDINATES coordinates, below which its
+per-call overhead makes it slower. The results are the same either way: the
+same floating point operations are done in the same order as
+`fontTools.misc.transform.Transform` and the bounds pens.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_MIN_COORDINATES = 64
+
+
+def _useNumpy(coordinates):
+    return np is not None and len(coordinates) >= NUMPY_MIN_COORDINATES
+
+
+def transformCoordinates(coordinates, transformation):
+    """Apply the affine `transformation` (a Transform or 6-tuple) in place to
+    the points of `coordinates`, a writable array of doubles ("d").
+    """
+    xx, xy, yx, yy, dx, dy = transformation
+    if _useNumpy(coordinates):
+        points = np.frombuffer(coordinates, dtype=np.float64).reshape(-1, 2)
+        x = points[:, 0].copy()
+        y = points[:, 1].copy()
+        points[:, 0] = xx * x + yx * y + dx
+        points[:, 1] = xy * x + yy * y + dy
+        return
+    for i in range(0, len(coordinates), 2):
+        x = coordinates[i]
+        y = coordinates[i + 1]
+        coordinates[i] = xx * x + yx * y + dx
+        coordinates[i + 1] = xy * x + yy * y + dy
+
+
+def contourControlBounds(coordinates, contourEnds):
+    """Return a list with the control bounds (xMin, yMin, xMax, yMax) of the
+    points of each contour, or None for the contours without points.
+    """
+    if _useNumpy(coordinates):
+        points = np.frombuffer(coordinates, dtype=np.float64)
+        ends = np.asarray(contourEnds, dtype=np.intp)
+        starts = np.concatenate(([0], ends[:-1]))
+        nonEmpty = starts < ends
+        if not nonEmpty.all():
+            starts = starts[nonEmpty]
+        if not len(starts):
+            return [None] * len(contourEnds)
+        xs = points[0::2]
+        ys = points[1::2]
+        boundsArray = np.stack(
+            [
+                np.minimum.reduceat(xs, starts),
+                np.minimum.reduceat(ys, starts),
+                np.maximum.reduceat(xs, starts),
+                np.maximum.reduceat(ys, starts),
+            ],
+            axis=1,
+        ).tolist()
+        if len(boundsArray) == len(contourEnds):
+            return [tuple(b) for b in boundsArray]
+        boundsIter = iter(boundsArray)
+        return [tuple(next(boundsIter)) if ok else None for ok in nonEmpty.tolist()]
+    bounds = []
+    start = 0
+    for end in contourEnds:
+        if start == end:
+            bounds.append(None)
+            continue
+        xs = coordinates[2 * start : 2 * end : 2]
+        ys = coordinates[2 * start + 1 : 2 * end : 2]
+        bounds.append((min(xs), min(ys), max(xs), max(ys)))
+        start = end
+    return bounds
+
+
+def controlBounds(coordinates):
+    """Return the control bounds (xMin, yMin, xMax, yMax) of all the points
+    of `coordinates`, or None if there are no points.
+    """
+    if not coordinates:
+        return None
+    if _useNumpy(coordinates):
+        points = np.frombuffer(coordinates, dtype=np.float64).reshape(-1, 2)
+        xMin, yMin = points.min(axis=0).tolist()
+        xMax, yMax = points.max(axis=0).tolist()
+        return xMin, yMin, xMax, yMax
+    xs = coordinates[0::2]
+    ys = coordinates[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def sideBearingExtrema(advances, sideBearings, mins, maxs):
+    """Return the minimum first and second side bearings and the maximum
+    extent of glyphs, as needed by the hhea and vhea tables.
+
+    The four sequences of integers give for each glyph its advance, its first
+    side bearing (left or top) and the minimum and maximum of its bounds along
+    the same direction. The extent is the first side bearing plus the bounds
+    size, and the second side bearing is what remains of the advance. All
+    three are zero if there are no glyphs.
+    """
+    if not advances:
+        return 0, 0, 0
+    if np is not None and len(advances) >= NUMPY_MIN_COORDINATES:
+        sideBearings = np.asarray(sideBearings, dtype=np.int64)
+        extents = sideBearings + (
+            np.asarray(maxs, dtype=np.int64) - np.asarray(mins, dtype=np.int64)
+        )
+        secondSideBearings = np.asarray(advances, dtype=np.int64) - extents
+        return (
+            int(sideBearings.min()),
+            int(secondSideBearings.min()),
+            int(extents.max()),
+        )
+    extents = [sb + (hi - lo) for sb, lo, hi in zip(sideBearings, mins, maxs)]
+    return (
+        min(sideBearings),
+        min(advance - extent for advance, extent in zip(advances, extents)),
+        max(extents),
+    )
@@ -0,0 +1,117 @@
+"""On-disk cache of compiled glyphs, shared between builds.
+
+Each compiled glyph (a TrueType ``Glyph``, or for CFF a tuple of the
+``T2CharString`` and its bounds) is stored in its own file, named after a
+fingerprint of everything that determines the result: the pre-processed
+outline, the components (recursively including the outlines of their base
+glyphs), the advance width, and the compiler options that affect the glyph
+compilation. The versions of ufo2ft and fontTools are also part of the
+fingerprint, so upgrading either invalidates the cache.
+
+The entries are pickled: only point the cache to a directory you trust.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+import fontTools
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledGlyphCache:
+    """Store compiled glyphs in *directory*, which is created if needed.
+
+    *options* is a tuple of the compiler options affecting the glyph
+    compilation; it is included in all the fingerprints.
+    """
+
+    def __init__(self, directory, options=()):
+        from ufo2ft import __version__
+
+        self.directory = os.fspath(directory)
+        self.options = (__version__, fontTools.version) + tuple(options)
+        self._fingerprints = {}
+
+    def fingerprint(self, glyphName, glyphSet):
+        """Return the hex digest identifying the compiled *glyphName* from
+        *glyphSet*, given the cache options.
+        """
+        if glyphName not in self._fingerprints:
+            # guard against cyclical component references
+            self._fingerprints[glyphName] = None
+            data = self._glyphData(glyphName, glyphSet)
+            digest = hashlib.sha256(repr((self.options, data)).encode()).hexdigest()
+            self._fingerprints[glyphName] = digest
+        return self._fingerprints[glyphName]
+
+    def _glyphData(self, glyphName, glyphSet):
+        glyph = glyphSet.get(glyphName)
+        if glyph is None:
+            return None
+        pen = _FingerprintPointPen(lambda name: self.fingerprint(name, glyphSet))
+        glyph.drawPoints(pen)
+        return (glyph.width, getattr(glyph, "height", None), pen.value)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        """Return the compiled glyph stored under *key*, or None."""
+        try:
+            with open(self._path(key), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring invalid compiled glyph cache entry %s: %s", key, e)
+            return None
+
+    def set(self, key, compiledGlyph):
+        """Store *compiledGlyph* under *key*."""
+        path = self._path(key)
+        dirname = os.path.dirname(path)
+        os.makedirs(dirname, exist_ok=True)
+        # write to a temporary file first so that concurrent builds sharing the
+        # same cache never read a partially written entry
+        fd, tmp = tempfile.mkstemp(dir=dirname)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(compiledGlyph, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+
+class _FingerprintPointPen:
+    # Collect the point pen calls, leaving out the point names and identifiers
+    # which don't end up in the compiled glyph, and replacing the components'
+    # base glyph names with the fingerprint of the base glyphs.
+
+    def __init__(self, getBaseFingerprint):
+        self.getBaseFingerprint = getBaseFingerprint
+        self.value = []
+
+    def beginPath(self, identifier=None, **kwargs):
+        self.value.append("beginPath")
+
+    def endPath(self):
+        self.value.append("endPath")
+
+    def addPoint(
+        self, pt, segmentType=None, smooth=False, name=None, identifier=None, **kwargs
+    ):
+        self.value.append((tuple(pt), segmentType, smooth))
+
+    def addComponent(self, baseGlyphName, transformation, identifier=None, **kwargs):
+        self.value.append(
+            (
+                baseGlyphName,
+                self.getBaseFingerprint(baseGlyphName),
+                tuple(transformation),
+            )
+        )
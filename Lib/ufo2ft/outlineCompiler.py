@@ -1,7 +1,9 @@
 import logging
 import math
+from array import array
 from collections import Counter, namedtuple
 from io import BytesIO
+from itertools import compress
 from types import SimpleNamespace
 
 from fontTools.cffLib import (
@@ -13,17 +15,21 @@ from fontTools.cffLib import (
     TopDict,
     TopDictIndex,
 )
-from fontTools.misc.arrayTools import unionRect
+from fontTools.misc.arrayTools import offsetRect, unionRect
 from fontTools.misc.fixedTools import otRound
-from fontTools.pens.boundsPen import ControlBoundsPen
+from fontTools.misc.roundTools import roundFunc
+from fontTools.pens.basePen import BasePen
+from fontTools.pens.boundsPen import BoundsPen, ControlBoundsPen
 from fontTools.pens.pointPen import SegmentToPointPen
 from fontTools.pens.reverseContourPen import ReverseContourPen
+from fontTools.pens.roundingPen import RoundingPen
 from fontTools.pens.t2CharStringPen import T2CharStringPen
+from fontTools.pens.teePen import TeePen
 from fontTools.pens.ttGlyphPen import TTGlyphPointPen
 from fontTools.ttLib import TTFont, newTable
 from fontTools.ttLib.tables._g_l_y_f import USE_MY_METRICS, Glyph
 from fontTools.ttLib.tables._h_e_a_d import mac_epoch_diff
-from fontTools.ttLib.tables.O_S_2f_2 import Panose
+from fontTools.ttLib.tables.O_S_2f_2 import Panose, intersectUnicodeRanges
 
 from ufo2ft.constants import (
     COLOR_LAYERS_KEY,
@@ -34,12 +40,17 @@ from ufo2ft.constants import (
 )
 from ufo2ft.errors import InvalidFontData
 from ufo2ft.fontInfoData import (
+    ResolvedInfo,
     dateStringForNow,
     dateStringToTimeValue,
     getAttrWithFallback,
     intListToNum,
     normalizeStringForPostscript,
 )
+from ufo2ft.geometry import controlBounds, sideBearingExtrema
+from ufo2ft.glyphCache import CompiledGlyphCache
+from ufo2ft.parallel import canRunInParallel, parallelMap, splitInChunks
+from ufo2ft.profiling import stage
 from ufo2ft.util import (
     _copyGlyph,
     calcCodePageRanges,
@@ -71,6 +82,51 @@ def _getVerticalOrigin(font, glyph):
     return otRound(verticalOrigin)
 
 
+def _isOffsetOnly(component):
+    return hasattr(component, "x") and getattr(component, "transform", None) in (
+        None,
+        [[1, 0], [0, 1]],
+        ((1, 0), (0, 1)),
+    )
+
+
+def _calcTTGlyphsBounds(ttGlyphs):
+    """Return a dictionary of the control bounds (xMin, yMin, xMax, yMax) of
+    the TrueType glyphs, not rounded, or None for the empty glyphs.
+
+    The bounds of the composite glyphs whose components are only offset are
+    the union of the offset bounds of their base glyphs, which are computed
+    once for all the composites using them. The other composite glyphs are
+    fully expanded with ``Glyph.getCoordinates``.
+    """
+    glyphBounds = {}
+
+    def calcBounds(glyphName):
+        if glyphName in glyphBounds:
+            return glyphBounds[glyphName]
+        glyph = ttGlyphs[glyphName]
+        if glyph.isComposite() and all(
+            _isOffsetOnly(component) and component.glyphName in ttGlyphs
+            for component in glyph.components
+        ):
+            bounds = None
+            for component in glyph.components:
+                baseBounds = calcBounds(component.glyphName)
+                if baseBounds is None:
+                    continue
+                baseBounds = offsetRect(baseBounds, component.x, component.y)
+                bounds = baseBounds if bounds is None else unionRect(bounds, baseBounds)
+        else:
+            coordinates, _, _ = glyph.getCoordinates(ttGlyphs)
+            bounds = controlBounds(coordinates.array)
+        glyphBounds[glyphName] = bounds
+        return bounds
+
+    for glyphName in ttGlyphs.keys():
+        calcBounds(glyphName)
+    return glyphBounds
+
+
 class BaseOutlineCompiler:
     """Create a feature-less outline binary."""
 
@@ -101,6 +157,8 @@ class BaseOutlineCompiler:
         tables=None,
         notdefGlyph=None,
         colrLayerReuse=True,
+        workers=None,
+        glyphCacheDir=None,
     ):
         self.ufo = font
         # use the previously filtered glyphSet, if any
@@ -117,16 +175,30 @@ class BaseOutlineCompiler:
         if tables is not None:
             self.tables = tables
         self.colrLayerReuse = colrLayerReuse
+        self.workers = workers
+        self.glyphCacheDir = glyphCacheDir
         # cached values defined later on
         self._glyphBoundingBoxes = None
+        self._glyphMetrics = None
         self._fontBoundingBox = None
         self._compiledGlyphs = None
+        self._resolvedInfo = None
+
+    @property
+    def resolvedInfo(self):
+        """The font info with the fallbacks applied, as a ResolvedInfo shared
+        by all the table setup methods of a compilation."""
+        if self._resolvedInfo is None:
+            self._resolvedInfo = ResolvedInfo(self.ufo.info)
+        return self._resolvedInfo
 
     def compile(self):
         """
         Compile the OpenType binary.
         """
         self.otf = TTFont(sfntVersion=self.sfntVersion)
+        # resolve the font info again for each compilation
+        self._resolvedInfo = None
 
         # only compile vertical metrics tables if vhea metrics are defined
         vertical_metrics = [
@@ -134,9 +206,9 @@ class BaseOutlineCompiler:
             "openTypeVheaVertTypoDescender",
             "openTypeVheaVertTypoLineGap",
         ]
+        info = self.resolvedInfo
         self.vertical = all(
-            getAttrWithFallback(self.ufo.info, metric) is not None
-            for metric in vertical_metrics
+            getattr(info, metric) is not None for metric in vertical_metrics
         )
         self.colorLayers = (
             COLOR_LAYERS_KEY in self.ufo.lib and COLOR_PALETTES_KEY in self.ufo.lib
@@ -147,24 +219,26 @@ class BaseOutlineCompiler:
         self.otf.setGlyphOrder(self.glyphOrder)
 
         # populate basic tables
-        self.setupTable_head()
-        self.setupTable_hmtx()
-        self.setupTable_hhea()
-        self.setupTable_name()
-        self.setupTable_maxp()
-        self.setupTable_cmap()
-        self.setupTable_OS2()
-        self.setupTable_post()
+        setupTables = [
+            self.setupTable_head,
+            self.setupTable_hmtx,
+            self.setupTable_hhea,
+            self.setupTable_name,
+            self.setupTable_maxp,
+            self.setupTable_cmap,
+            self.setupTable_OS2,
+            self.setupTable_post,
+        ]
         if self.vertical:
-            self.setupTable_vmtx()
-            self.setupTable_vhea()
+            setupTables += [self.setupTable_vmtx, self.setupTable_vhea]
         if self.colorLayers:
-            self.setupTable_COLR()
-            self.setupTable_CPAL()
+            setupTables += [self.setupTable_COLR, self.setupTable_CPAL]
         if self.meta:
-            self.setupTable_meta()
-        self.setupOtherTables()
-        self.importTTX()
+            setupTables.append(self.setupTable_meta)
+        setupTables += [self.setupOtherTables, self.importTTX]
+        for setupTable in setupTables:
+            with stage(setupTable.__name__, "outlineCompiler"):
+                setupTable()
 
         return self.otf
 
@@ -176,9 +250,76 @@ class BaseOutlineCompiler:
         """
         raise NotImplementedError
 
+    def getGlyphCacheOptions(self):
+        """Return a tuple of the options that affect the compiled glyphs, to be
+        included in the fingerprints of the compiled glyph cache.
+
+        **This should not be called externally.** Subclasses should extend
+        the tuple with their own options.
+        """
+        cls = type(self)
+        return (f"{cls.__module__}.{cls.__qualname__}",)
+
+    def compileAllGlyphs(self, compileGlyph):
+        """Call *compileGlyph* for each glyph name in the glyph order, and
+        return a dict of the results keyed by glyph name.
+
+        If a *glyphCacheDir* was given, the compiled glyphs are looked up in
+        the cache first, and the newly compiled ones are added to it. If
+        *workers* allows it, the remaining glyphs are compiled on a pool of
+        worker processes. In both cases the results must be picklable.
+        *compileGlyph* may return None for a glyph that could not be compiled:
+        it is not added to the cache, so that the glyph is compiled (and its
+        error reported) again on the next build.
+
+        **This should not be called externally.**
+        Subclasses should use this to implement ``compileGlyphs``.
+        """
+        glyphOrder = self.glyphOrder
+        compiledGlyphs = {}
+        cache = None
+        if self.glyphCacheDir is not None:
+            cache = CompiledGlyphCache(
+                self.glyphCacheDir, options=self.getGlyphCacheOptions()
+            )
+            keys = {
+                name: cache.fingerprint(name, self.allGlyphs) for name in glyphOrder
+            }
+            for name in glyphOrder:
+                compiled = cache.get(keys[name])
+                if compiled is not None:
+                    compiledGlyphs[name] = compiled
+            logger.info(
+                "Found %d of %d compiled glyphs in the cache",
+                len(compiledGlyphs),
+                len(glyphOrder),
+            )
+
+        missing = [name for name in glyphOrder if name not in compiledGlyphs]
+        if canRunInParallel(self.workers):
+            chunks = splitInChunks(missing, self.workers)
+            results = parallelMap(
+                lambda glyphNames: [compileGlyph(name) for name in glyphNames],
+                chunks,
+                workers=self.workers,
+            )
+            for glyphNames, compiled in zip(chunks, results):
+                compiledGlyphs.update(zip(glyphNames, compiled))
+        else:
+            for name in missing:
+                compiledGlyphs[name] = compileGlyph(name)
+
+        if cache is not None:
+            for name in missing:
+                if compiledGlyphs[name] is not None:
+                    cache.set(keys[name], compiledGlyphs[name])
+
+        return {name: compiledGlyphs[name] for name in glyphOrder}
+
     def getCompiledGlyphs(self):
         if self._compiledGlyphs is None:
-            self._compiledGlyphs = self.compileGlyphs()
+            with stage("compileGlyphs", "outlineCompiler"):
+                self._compiledGlyphs = self.compileGlyphs()
         return self._compiledGlyphs
 
     def makeGlyphsBoundingBoxes(self):
@@ -201,6 +342,41 @@ class BaseOutlineCompiler:
             self._glyphBoundingBoxes = self.makeGlyphsBoundingBoxes()
         return self._glyphBoundingBoxes
 
+    def makeGlyphsMetrics(self):
+        """
+        Gather the advance widths and the bounding boxes of all the glyphs
+        into columns of integers, in the order of ``allGlyphs``, and return
+        them in a namespace with the attributes ``glyphNames``,
+        ``advanceWidths``, ``hasBounds`` and ``xMins``, ``yMins``, ``xMaxs``,
+        ``yMaxs``. The bounds of empty glyphs are 0 and their ``hasBounds``
+        entry is False.
+
+        **This should not be called externally.** The metrics tables are
+        made from these columns instead of looping over the glyphs again.
+        """
+        glyphNames = list(self.allGlyphs)
+        glyphBoxes = list(map(self.glyphBoundingBoxes.__getitem__, glyphNames))
+        hasBounds = [box is not None for box in glyphBoxes]
+        bounds = [box or EMPTY_BOUNDING_BOX for box in glyphBoxes]
+        xMins, yMins, xMaxs, yMaxs = zip(*bounds) if bounds else ((),) * 4
+        return SimpleNamespace(
+            glyphNames=glyphNames,
+            advanceWidths=array(
+                "l", [otRound(glyph.width) for glyph in self.allGlyphs.values()]
+            ),
+            hasBounds=hasBounds,
+            xMins=array("l", xMins),
+            yMins=array("l", yMins),
+            xMaxs=array("l", xMaxs),
+            yMaxs=array("l", yMaxs),
+        )
+
+    @property
+    def glyphMetrics(self):
+        if self._glyphMetrics is None:
+            self._glyphMetrics = self.makeGlyphsMetrics()
+        return self._glyphMetrics
+
     def makeFontBoundingBox(self):
         """
         Make a bounding box for the font.
@@ -209,17 +385,16 @@ class BaseOutlineCompiler:
         may override this method to handle the bounds creation
         in a different way if desired.
         """
-        fontBox = None
-        for glyphBox in self.glyphBoundingBoxes.values():
-            if glyphBox is None:
-                continue
-            if fontBox is None:
-                fontBox = glyphBox
-            else:
-                fontBox = unionRect(fontBox, glyphBox)
-        if fontBox is None:  # unlikely
-            fontBox = EMPTY_BOUNDING_BOX
-        return fontBox
+        metrics = self.glyphMetrics
+        if not any(metrics.hasBounds):  # unlikely
+            return EMPTY_BOUNDING_BOX
+        hasBounds = metrics.hasBounds
+        return BoundingBox(
+            min(compress(metrics.xMins, hasBounds)),
+            min(compress(metrics.yMins, hasBounds)),
+            max(compress(metrics.xMaxs, hasBounds)),
+            max(compress(metrics.yMaxs, hasBounds)),
+        )
 
     @property
     def fontBoundingBox(self):
@@ -307,7 +482,7 @@ class BaseOutlineCompiler:
             return
 
         self.otf["head"] = head = newTable("head")
-        font = self.ufo
+        info = self.resolvedInfo
         head.checkSumAdjustment = 0
         head.tableVersion = 1.0
         head.magicNumber = 0x5F0F3CF5
@@ -315,8 +490,8 @@ class BaseOutlineCompiler:
         # version numbers
         # limit minor version to 3 digits as recommended in OpenType spec:
         # https://www.microsoft.com/typography/otspec/recom.htm
-        versionMajor = getAttrWithFallback(font.info, "versionMajor")
-        versionMinor = getAttrWithFallback(font.info, "versionMinor")
+        versionMajor = info.versionMajor
+        versionMinor = info.versionMinor
         fullFontRevision = float("%d.%03d" % (versionMajor, versionMinor))
         head.fontRevision = round(fullFontRevision, 3)
         if head.fontRevision != fullFontRevision:
@@ -328,13 +503,10 @@ class BaseOutlineCompiler:
             )
 
         # upm
-        head.unitsPerEm = otRound(getAttrWithFallback(font.info, "unitsPerEm"))
+        head.unitsPerEm = otRound(info.unitsPerEm)
 
         # times
-        head.created = (
-            dateStringToTimeValue(getAttrWithFallback(font.info, "openTypeHeadCreated"))
-            - mac_epoch_diff
-        )
+        head.created = dateStringToTimeValue(info.openTypeHeadCreated) - mac_epoch_diff
         head.modified = dateStringToTimeValue(dateStringForNow()) - mac_epoch_diff
 
         # bounding box
@@ -345,7 +517,7 @@ class BaseOutlineCompiler:
         head.yMax = otRound(yMax)
 
         # style mapping
-        styleMapStyleName = getAttrWithFallback(font.info, "styleMapStyleName")
+        styleMapStyleName = info.styleMapStyleName
         macStyle = []
         if styleMapStyleName == "bold":
             macStyle = [0]
@@ -356,12 +528,8 @@ class BaseOutlineCompiler:
         head.macStyle = intListToNum(macStyle, 0, 16)
 
         # misc
-        head.flags = intListToNum(
-            getAttrWithFallback(font.info, "openTypeHeadFlags"), 0, 16
-        )
-        head.lowestRecPPEM = otRound(
-            getAttrWithFallback(font.info, "openTypeHeadLowestRecPPEM")
-        )
+        head.flags = intListToNum(info.openTypeHeadFlags, 0, 16)
+        head.lowestRecPPEM = otRound(info.openTypeHeadLowestRecPPEM)
         head.fontDirectionHint = 2
         head.indexToLocFormat = 0
         head.glyphDataFormat = 0
@@ -377,12 +545,12 @@ class BaseOutlineCompiler:
         if "name" not in self.tables:
             return
 
-        font = self.ufo
+        info = self.resolvedInfo
         self.otf["name"] = name = newTable("name")
         name.names = []
 
         # Set name records from font.info.openTypeNameRecords
-        for nameRecord in getAttrWithFallback(font.info, "openTypeNameRecords"):
+        for nameRecord in info.openTypeNameRecords:
             nameId = nameRecord["nameID"]
             platformId = nameRecord["platformID"]
             platEncId = nameRecord["encodingID"]
@@ -396,38 +564,34 @@ class BaseOutlineCompiler:
             name.setName(nameVal, nameId, platformId, platEncId, langId)
 
         # Build name records
-        familyName = getAttrWithFallback(font.info, "styleMapFamilyName")
-        styleName = getAttrWithFallback(font.info, "styleMapStyleName").title()
-        preferredFamilyName = getAttrWithFallback(
-            font.info, "openTypeNamePreferredFamilyName"
-        )
-        preferredSubfamilyName = getAttrWithFallback(
-            font.info, "openTypeNamePreferredSubfamilyName"
-        )
+        familyName = info.styleMapFamilyName
+        styleName = info.styleMapStyleName.title()
+        preferredFamilyName = info.openTypeNamePreferredFamilyName
+        preferredSubfamilyName = info.openTypeNamePreferredSubfamilyName
         fullName = f"{preferredFamilyName} {preferredSubfamilyName}"
 
         nameVals = {
-            0: getAttrWithFallback(font.info, "copyright"),
+            0: info.copyright,
             1: familyName,
             2: styleName,
-            3: getAttrWithFallback(font.info, "openTypeNameUniqueID"),
+            3: info.openTypeNameUniqueID,
             4: fullName,
-            5: getAttrWithFallback(font.info, "openTypeNameVersion"),
-            6: getAttrWithFallback(font.info, "postscriptFontName"),
-            7: getAttrWithFallback(font.info, "trademark"),
-            8: getAttrWithFallback(font.info, "openTypeNameManufacturer"),
-            9: getAttrWithFallback(font.info, "openTypeNameDesigner"),
-            10: getAttrWithFallback(font.info, "openTypeNameDescription"),
-            11: getAttrWithFallback(font.info, "openTypeNameManufacturerURL"),
-            12: getAttrWithFallback(font.info, "openTypeNameDesignerURL"),
-            13: getAttrWithFallback(font.info, "openTypeNameLicense"),
-            14: getAttrWithFallback(font.info, "openTypeNameLicenseURL"),
+            5: info.openTypeNameVersion,
+            6: info.postscriptFontName,
+            7: info.trademark,
+            8: info.openTypeNameManufacturer,
+            9: info.openTypeNameDesigner,
+            10: info.openTypeNameDescription,
+            11: info.openTypeNameManufacturerURL,
+            12: info.openTypeNameDesignerURL,
+            13: info.openTypeNameLicense,
+            14: info.openTypeNameLicenseURL,
             16: preferredFamilyName,
             17: preferredSubfamilyName,
-            18: getAttrWithFallback(font.info, "openTypeNameCompatibleFullName"),
-            19: getAttrWithFallback(font.info, "openTypeNameSampleText"),
-            21: getAttrWithFallback(font.info, "openTypeNameWWSFamilyName"),
-            22: getAttrWithFallback(font.info, "openTypeNameWWSSubfamilyName"),
+            18: info.openTypeNameCompatibleFullName,
+            19: info.openTypeNameSampleText,
+            21: info.openTypeNameWWSFamilyName,
+            22: info.openTypeNameWWSSubfamilyName,
         }
 
         # don't add typographic names if they are the same as the legacy ones
@@ -557,83 +721,80 @@ class BaseOutlineCompiler:
             return
 
         self.otf["OS/2"] = os2 = newTable("OS/2")
-        font = self.ufo
+        info = self.resolvedInfo
         os2.version = 0x0004
         # average glyph width
         os2.xAvgCharWidth = 0
         hmtx = self.otf.get("hmtx")
         if hmtx is not None:
-            widths = [width for width, _ in hmtx.metrics.values() if width > 0]
+            advances = self.glyphMetrics.advanceWidths
+            widths = [width for width in advances if width > 0]
             if widths:
                 os2.xAvgCharWidth = otRound(sum(widths) / len(widths))
         # weight and width classes
-        os2.usWeightClass = getAttrWithFallback(font.info, "openTypeOS2WeightClass")
-        os2.usWidthClass = getAttrWithFallback(font.info, "openTypeOS2WidthClass")
+        os2.usWeightClass = info.openTypeOS2WeightClass
+        os2.usWidthClass = info.openTypeOS2WidthClass
         # embedding
-        os2.fsType = intListToNum(
-            getAttrWithFallback(font.info, "openTypeOS2Type"), 0, 16
-        )
+        os2.fsType = intListToNum(info.openTypeOS2Type, 0, 16)
 
         # subscript, superscript, strikeout values, taken from AFDKO:
         # FDK/Tools/Programs/makeotf/makeotf_lib/source/hotconv/hot.c
-        unitsPerEm = getAttrWithFallback(font.info, "unitsPerEm")
-        italicAngle = float(getAttrWithFallback(font.info, "italicAngle"))
-        xHeight = getAttrWithFallback(font.info, "xHeight")
+        unitsPerEm = info.unitsPerEm
+        italicAngle = float(info.italicAngle)
+        xHeight = info.xHeight
 
         def adjustOffset(offset, angle):
             """Adjust Y offset based on italic angle, to get X offset."""
             return offset * math.tan(math.radians(-angle)) if angle else 0
 
-        v = getAttrWithFallback(font.info, "openTypeOS2SubscriptXSize")
+        v = info.openTypeOS2SubscriptXSize
         if v is None:
             v = unitsPerEm * 0.65
         os2.ySubscriptXSize = otRound(v)
-        v = getAttrWithFallback(font.info, "openTypeOS2SubscriptYSize")
+        v = info.openTypeOS2SubscriptYSize
         if v is None:
             v = unitsPerEm * 0.6
         os2.ySubscriptYSize = otRound(v)
-        v = getAttrWithFallback(font.info, "openTypeOS2SubscriptYOffset")
+        v = info.openTypeOS2SubscriptYOffset
         if v is None:
             v = unitsPerEm * 0.075
         os2.ySubscriptYOffset = otRound(v)
-        v = getAttrWithFallback(font.info, "openTypeOS2SubscriptXOffset")
+        v = info.openTypeOS2SubscriptXOffset
         if v is None:
             v = adjustOffset(-os2.ySubscriptYOffset, italicAngle)
         os2.ySubscriptXOffset = otRound(v)
 
-        v = getAttrWithFallback(font.info, "openTypeOS2SuperscriptXSize")
+        v = info.openTypeOS2SuperscriptXSize
         if v is None:
             v = os2.ySubscriptXSize
         os2.ySuperscriptXSize = otRound(v)
-        v = getAttrWithFallback(font.info, "openTypeOS2SuperscriptYSize")
+        v = info.openTypeOS2SuperscriptYSize
         if v is None:
             v = os2.ySubscriptYSize
         os2.ySuperscriptYSize = otRound(v)
-        v = getAttrWithFallback(font.info, "openTypeOS2SuperscriptYOffset")
+        v = info.openTypeOS2SuperscriptYOffset
         if v is None:
             v = unitsPerEm * 0.35
         os2.ySuperscriptYOffset = otRound(v)
-        v = getAttrWithFallback(font.info, "openTypeOS2SuperscriptXOffset")
+        v = info.openTypeOS2SuperscriptXOffset
         if v is None:
             v = adjustOffset(os2.ySuperscriptYOffset, italicAngle)
         os2.ySuperscriptXOffset = otRound(v)
 
-        v = getAttrWithFallback(font.info, "openTypeOS2StrikeoutSize")
+        v = info.openTypeOS2StrikeoutSize
         if v is None:
-            v = getAttrWithFallback(font.info, "postscriptUnderlineThickness")
+            v = info.postscriptUnderlineThickness
         os2.yStrikeoutSize = otRound(v)
-        v = getAttrWithFallback(font.info, "openTypeOS2StrikeoutPosition")
+        v = info.openTypeOS2StrikeoutPosition
         if v is None:
             v = xHeight * 0.6 if xHeight else unitsPerEm * 0.22
         os2.yStrikeoutPosition = otRound(v)
 
         # family class
-        ibmFontClass, ibmFontSubclass = getAttrWithFallback(
-            font.info, "openTypeOS2FamilyClass"
-        )
+        ibmFontClass, ibmFontSubclass = info.openTypeOS2FamilyClass
         os2.sFamilyClass = (ibmFontClass << 8) + ibmFontSubclass
         # panose
-        data = getAttrWithFallback(font.info, "openTypeOS2Panose")
+        data = info.openTypeOS2Panose
         panose = Panose()
         panose.bFamilyType = data[0]
         panose.bSerifStyle = data[1]
@@ -647,47 +808,39 @@ class BaseOutlineCompiler:
         panose.bXHeight = data[9]
         os2.panose = panose
         # Unicode ranges
-        uniRanges = getAttrWithFallback(font.info, "openTypeOS2UnicodeRanges")
+        unicodes = set(self.unicodeToGlyphNameMapping)
+        uniRanges = info.openTypeOS2UnicodeRanges
         if uniRanges is not None:
             os2.ulUnicodeRange1 = intListToNum(uniRanges, 0, 32)
             os2.ulUnicodeRange2 = intListToNum(uniRanges, 32, 32)
             os2.ulUnicodeRange3 = intListToNum(uniRanges, 64, 32)
             os2.ulUnicodeRange4 = intListToNum(uniRanges, 96, 32)
         else:
-            os2.recalcUnicodeRanges(self.otf)
+            # same as os2.recalcUnicodeRanges(self.otf), but from the
+            # codepoints we already have instead of re-reading the cmap
+            os2.setUnicodeRanges(intersectUnicodeRanges(unicodes))
 
         # codepage ranges
-        codepageRanges = getAttrWithFallback(font.info, "openTypeOS2CodePageRanges")
+        codepageRanges = info.openTypeOS2CodePageRanges
         if codepageRanges is None:
-            unicodes = self.unicodeToGlyphNameMapping.keys()
             codepageRanges = calcCodePageRanges(unicodes)
         os2.ulCodePageRange1 = intListToNum(codepageRanges, 0, 32)
         os2.ulCodePageRange2 = intListToNum(codepageRanges, 32, 32)
 
         # vendor id
-        os2.achVendID = getAttrWithFallback(font.info, "openTypeOS2VendorID")
+        os2.achVendID = info.openTypeOS2VendorID
 
         # vertical metrics
-        os2.sxHeight = otRound(getAttrWithFallback(font.info, "xHeight"))
-        os2.sCapHeight = otRound(getAttrWithFallback(font.info, "capHeight"))
-        os2.sTypoAscender = otRound(
-            getAttrWithFallback(font.info, "openTypeOS2TypoAscender")
-        )
-        os2.sTypoDescender = otRound(
-            getAttrWithFallback(font.info, "openTypeOS2TypoDescender")
-        )
-        os2.sTypoLineGap = otRound(
-            getAttrWithFallback(font.info, "openTypeOS2TypoLineGap")
-        )
-        os2.usWinAscent = otRound(
-            getAttrWithFallback(font.info, "openTypeOS2WinAscent")
-        )
-        os2.usWinDescent = otRound(
-            getAttrWithFallback(font.info, "openTypeOS2WinDescent")
-        )
+        os2.sxHeight = otRound(info.xHeight)
+        os2.sCapHeight = otRound(info.capHeight)
+        os2.sTypoAscender = otRound(info.openTypeOS2TypoAscender)
+        os2.sTypoDescender = otRound(info.openTypeOS2TypoDescender)
+        os2.sTypoLineGap = otRound(info.openTypeOS2TypoLineGap)
+        os2.usWinAscent = otRound(info.openTypeOS2WinAscent)
+        os2.usWinDescent = otRound(info.openTypeOS2WinDescent)
         # style mapping
-        selection = list(getAttrWithFallback(font.info, "openTypeOS2Selection"))
-        styleMapStyleName = getAttrWithFallback(font.info, "styleMapStyleName")
+        selection = list(info.openTypeOS2Selection)
+        styleMapStyleName = info.styleMapStyleName
         if styleMapStyleName == "regular":
             selection.append(6)
         elif styleMapStyleName == "bold":
@@ -731,14 +884,14 @@ class BaseOutlineCompiler:
             return
 
         self.otf["hmtx"] = hmtx = newTable("hmtx")
-        hmtx.metrics = {}
-        for glyphName, glyph in self.allGlyphs.items():
-            width = otRound(glyph.width)
-            if width < 0:
-                raise ValueError("The width should not be negative: '%s'" % (glyphName))
-            bounds = self.glyphBoundingBoxes[glyphName]
-            left = bounds.xMin if bounds else 0
-            hmtx[glyphName] = (width, left)
+        metrics = self.glyphMetrics
+        widths = metrics.advanceWidths
+        if widths and min(widths) < 0:
+            glyphName = next(
+                name for name, width in zip(metrics.glyphNames, widths) if width < 0
+            )
+            raise ValueError("The width should not be negative: '%s'" % (glyphName))
+        hmtx.metrics = dict(zip(metrics.glyphNames, zip(widths, metrics.xMins)))
 
     def _setupTable_hhea_or_vhea(self, tag):
         """
@@ -754,7 +907,7 @@ class BaseOutlineCompiler:
             isHhea = False
         self.otf[tag] = table = newTable(tag)
         mtxTable = self.otf.get(tag[0] + "mtx")
-        font = self.ufo
+        info = self.resolvedInfo
         if isHhea:
             table.tableVersion = 0x00010000
         else:
@@ -780,54 +933,52 @@ class BaseOutlineCompiler:
             "caretOffset": "%sCaretOffset" % commonPrefix,
         }
         for otfName, ufoName in metricsDict.items():
-            setattr(table, otfName, otRound(getAttrWithFallback(font.info, ufoName)))
+            setattr(table, otfName, otRound(getattr(info, ufoName)))
         # Horizontal metrics in hhea, vertical metrics in vhea
-        advances = []  # width in hhea, height in vhea
-        firstSideBearings = []  # left in hhea, top in vhea
-        secondSideBearings = []  # right in hhea, bottom in vhea
-        extents = []
-        if mtxTable is not None:
-            for glyphName in self.allGlyphs:
-                advance, firstSideBearing = mtxTable[glyphName]
-                advances.append(advance)
-                bounds = self.glyphBoundingBoxes[glyphName]
-                if bounds is None:
-                    continue
-                if isHhea:
-                    boundsAdvance = bounds.xMax - bounds.xMin
-                    # equation from the hhea spec for calculating xMaxExtent:
-                    #   Max(lsb + (xMax - xMin))
-                    extent = firstSideBearing + boundsAdvance
-                else:
-                    boundsAdvance = bounds.yMax - bounds.yMin
-                    # equation from the vhea spec for calculating yMaxExtent:
-                    #   Max(tsb + (yMax - yMin)).
-                    extent = firstSideBearing + boundsAdvance
-                secondSideBearing = advance - firstSideBearing - boundsAdvance
-
-                firstSideBearings.append(firstSideBearing)
-                secondSideBearings.append(secondSideBearing)
-                extents.append(extent)
+        advanceMax = minFirstSideBearing = minSecondSideBearing = maxExtent = 0
+        if mtxTable is not None and self.allGlyphs:
+            glyphMetrics = self.glyphMetrics
+            # width and left side bearing in hhea, height and top in vhea
+            allAdvances, allSideBearings = zip(
+                *map(mtxTable.__getitem__, glyphMetrics.glyphNames)
+            )
+            advanceMax = max(allAdvances)
+            # the side bearings and extents only count the glyphs with bounds
+            hasBounds = glyphMetrics.hasBounds
+            advances = list(compress(allAdvances, hasBounds))
+            firstSideBearings = list(compress(allSideBearings, hasBounds))
+            if isHhea:
+                mins = list(compress(glyphMetrics.xMins, hasBounds))
+                maxs = list(compress(glyphMetrics.xMaxs, hasBounds))
+            else:
+                mins = list(compress(glyphMetrics.yMins, hasBounds))
+                maxs = list(compress(glyphMetrics.yMaxs, hasBounds))
+            # The extents follow the equations from the hhea and vhea specs:
+            #   xMaxExtent = Max(lsb + (xMax - xMin))
+            #   yMaxExtent = Max(tsb + (yMax - yMin))
+            # and the right or bottom side bearings are what remains of the
+            # advance.
+            (
+                minFirstSideBearing,
+                minSecondSideBearing,
+                maxExtent,
+            ) = sideBearingExtrema(advances, firstSideBearings, mins, maxs)
         setattr(
             table,
             "advance%sMax" % ("Width" if isHhea else "Height"),
-            max(advances) if advances else 0,
+            advanceMax,
         )
         setattr(
             table,
             "min%sSideBearing" % ("Left" if isHhea else "Top"),
-            min(firstSideBearings) if firstSideBearings else 0,
+            minFirstSideBearing,
         )
         setattr(
             table,
             "min%sSideBearing" % ("Right" if isHhea else "Bottom"),
-            min(secondSideBearings) if secondSideBearings else 0,
-        )
-        setattr(
-            table,
-            "%sMaxExtent" % ("x" if isHhea else "y"),
-            max(extents) if extents else 0,
+            minSecondSideBearing,
         )
+        setattr(table, "%sMaxExtent" % ("x" if isHhea else "y"), maxExtent)
         if isHhea:
             reserved = range(4)
         else:
@@ -836,10 +987,17 @@ class BaseOutlineCompiler:
         for i in reserved:
             setattr(table, "reserved%i" % i, 0)
         table.metricDataFormat = 0
-        # glyph count
-        setattr(
-            table, "numberOf%sMetrics" % ("H" if isHhea else "V"), len(self.allGlyphs)
-        )
+        # number of long metrics: the trailing glyphs having the same advance
+        # as the last one only store their side bearing
+        numberOfMetrics = len(self.glyphOrder)
+        if mtxTable is not None and numberOfMetrics:
+            lastAdvance = mtxTable[self.glyphOrder[-1]][0]
+            while (
+                numberOfMetrics > 1
+                and mtxTable[self.glyphOrder[numberOfMetrics - 2]][0] == lastAdvance
+            ):
+                numberOfMetrics -= 1
+        setattr(table, "numberOf%sMetrics" % ("H" if isHhea else "V"), numberOfMetrics)
 
     def setupTable_hhea(self):
         """
@@ -863,17 +1021,19 @@ class BaseOutlineCompiler:
             return
 
         self.otf["vmtx"] = vmtx = newTable("vmtx")
-        vmtx.metrics = {}
-        for glyphName, glyph in self.allGlyphs.items():
-            height = otRound(glyph.height)
-            if height < 0:
-                raise ValueError(
-                    "The height should not be negative: '%s'" % (glyphName)
-                )
-            verticalOrigin = _getVerticalOrigin(self.otf, glyph)
-            bounds = self.glyphBoundingBoxes[glyphName]
-            top = bounds.yMax if bounds else 0
-            vmtx[glyphName] = (height, verticalOrigin - top)
+        metrics = self.glyphMetrics
+        glyphs = self.allGlyphs.values()
+        heights = array("l", [otRound(glyph.height) for glyph in glyphs])
+        if heights and min(heights) < 0:
+            glyphName = next(
+                name for name, height in zip(metrics.glyphNames, heights) if height < 0
+            )
+            raise ValueError("The height should not be negative: '%s'" % (glyphName))
+        topSideBearings = [
+            _getVerticalOrigin(self.otf, glyph) - top
+            for glyph, top in zip(glyphs, metrics.yMaxs)
+        ]
+        vmtx.metrics = dict(zip(metrics.glyphNames, zip(heights, topSideBearings)))
 
     def setupTable_VORG(self):
         """
@@ -926,23 +1086,17 @@ class BaseOutlineCompiler:
             return
 
         self.otf["post"] = post = newTable("post")
-        font = self.ufo
+        info = self.resolvedInfo
         post.formatType = 3.0
         # italic angle
-        italicAngle = float(getAttrWithFallback(font.info, "italicAngle"))
+        italicAngle = float(info.italicAngle)
         post.italicAngle = italicAngle
         # underline
-        underlinePosition = getAttrWithFallback(
-            font.info, "postscriptUnderlinePosition"
-        )
+        underlinePosition = info.postscriptUnderlinePosition
         post.underlinePosition = otRound(underlinePosition)
-        underlineThickness = getAttrWithFallback(
-            font.info, "postscriptUnderlineThickness"
-        )
+        underlineThickness = info.postscriptUnderlineThickness
         post.underlineThickness = otRound(underlineThickness)
-        post.isFixedPitch = int(
-            getAttrWithFallback(font.info, "postscriptIsFixedPitch")
-        )
+        post.isFixedPitch = int(info.postscriptIsFixedPitch)
         # misc
         post.minMemType42 = 0
         post.maxMemType42 = 0
@@ -1076,6 +1230,54 @@ class BaseOutlineCompiler:
                     self.otf.sfntVersion = sfntVersion
 
 
+class _CharStringBoundsPen(BasePen):
+    """Pen computing the bounds of the charstring that a T2CharStringPen with
+    the same *roundTolerance* makes from the same drawing.
+
+    Like T2CharStringPen, it decomposes the components and converts the
+    quadratic curves to cubic ones, then it rounds the coordinates with a
+    RoundingPen and passes them on to a BoundsPen.
+
+    If *mergeMoves* is True (for charstrings made with ``optimize=True``), the
+    moves that are followed by another move are left out, as they are merged
+    into it in the charstring.
+    """
+
+    def __init__(self, glyphSet, roundTolerance=0.5, mergeMoves=True):
+        super().__init__(glyphSet)
+        self._boundsPen = BoundsPen(None, ignoreSinglePoints=mergeMoves)
+        self._pen = RoundingPen(self._boundsPen, roundFunc=roundFunc(roundTolerance))
+        self._mergeMoves = mergeMoves
+        self._lastMove = None
+
+    def _moveTo(self, pt):
+        self._pen.moveTo(pt)
+        self._lastMove = pt
+
+    def _lineTo(self, pt):
+        self._pen.lineTo(pt)
+        self._lastMove = None
+
+    def _curveToOne(self, pt1, pt2, pt3):
+        self._pen.curveTo(pt1, pt2, pt3)
+        self._lastMove = None
+
+    def _closePath(self):
+        self._pen.closePath()
+
+    def _endPath(self):
+        self._pen.endPath()
+
+    def getBounds(self):
+        """Return the bounds of the charstring, or None if it is empty."""
+        if self._mergeMoves and self._lastMove is not None:
+            # the last move is kept in the charstring, even if nothing is drawn
+            # from it
+            self._pen.lineTo(self._lastMove)
+            self._lastMove = None
+        return self._boundsPen.bounds
+
+
 class OutlineOTFCompiler(BaseOutlineCompiler):
     """Compile a .otf font with CFF outlines."""
 
@@ -1091,6 +1293,8 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         notdefGlyph=None,
         roundTolerance=None,
         optimizeCFF=True,
+        workers=None,
+        glyphCacheDir=None,
     ):
         if roundTolerance is not None:
             self.roundTolerance = float(roundTolerance)
@@ -1103,9 +1307,12 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
             glyphOrder=glyphOrder,
             tables=tables,
             notdefGlyph=notdefGlyph,
+            workers=workers,
+            glyphCacheDir=glyphCacheDir,
         )
         self.optimizeCFF = optimizeCFF
         self._defaultAndNominalWidths = None
+        self._charStringBounds = {}
 
     def getDefaultAndNominalWidths(self):
         """Return (defaultWidthX, nominalWidthX).
@@ -1144,13 +1351,35 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         private = SimpleNamespace(
             defaultWidthX=defaultWidth, nominalWidthX=nominalWidth
         )
+        # the bounds computed while drawing the charstrings, keyed by glyph name
+        self._charStringBounds = charStringBounds = {}
+
+        def compileGlyph(name):
+            charString = self.getCharStringForGlyph(self.allGlyphs[name], private)
+            # also send back the bounds, unless a subclass didn't compute them
+            return charString, name in charStringBounds, charStringBounds.get(name)
+
         compiledGlyphs = {}
-        for glyphName in self.glyphOrder:
-            glyph = self.allGlyphs[glyphName]
-            cs = self.getCharStringForGlyph(glyph, private)
-            compiledGlyphs[glyphName] = cs
+        for name, (charString, hasBounds, bounds) in self.compileAllGlyphs(
+            compileGlyph
+        ).items():
+            # charstrings compiled in worker processes or loaded from the cache
+            # come with a copy of the private namespace
+            charString.private = private
+            compiledGlyphs[name] = charString
+            if hasBounds:
+                charStringBounds[name] = bounds
         return compiledGlyphs
 
+    def getGlyphCacheOptions(self):
+        return super().getGlyphCacheOptions() + (
+            # the cached values are (charString, hasBounds, bounds) tuples
+            "bounds",
+            self.roundTolerance,
+            self.optimizeCFF,
+            *self.getDefaultAndNominalWidths(),
+        )
+
     def makeGlyphsBoundingBoxes(self):
         """
         Make bounding boxes for all the glyphs, and return a dictionary of
@@ -1174,8 +1403,12 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         tolerance = self.roundTolerance
         glyphBoxes = {}
         charStrings = self.getCompiledGlyphs()
+        charStringBounds = self._charStringBounds
         for name, cs in charStrings.items():
-            bounds = cs.calcBounds(charStrings)
+            if name in charStringBounds:
+                bounds = charStringBounds[name]
+            else:
+                bounds = cs.calcBounds(charStrings)
             if bounds is not None:
                 rounded = []
                 for value in bounds[:2]:
@@ -1192,6 +1425,10 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         """
         Get a Type2CharString for the *glyph*
 
+        The bounds of the charstring are computed while drawing it, and
+        recorded for ``makeGlyphsBoundingBoxes``, which otherwise has to
+        interpret the charstring again.
+
         **This should not be called externally.** Subclasses
         may override this method to handle the charstring creation
         in a different way if desired.
@@ -1208,8 +1445,14 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         if width is not None:
             width = otRound(width)
         pen = T2CharStringPen(width, self.allGlyphs, roundTolerance=self.roundTolerance)
-        glyph.draw(pen)
+        boundsPen = _CharStringBoundsPen(
+            self.allGlyphs,
+            roundTolerance=self.roundTolerance,
+            mergeMoves=self.optimizeCFF,
+        )
+        glyph.draw(TeePen(pen, boundsPen))
         charString = pen.getCharString(private, globalSubrs, optimize=self.optimizeCFF)
+        self._charStringBounds[glyph.name] = boundsPen.getBounds()
         return charString
 
     def setupTable_maxp(self):
@@ -1267,15 +1510,15 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         topDictIndex.strings = strings
         cff.GlobalSubrs = globalSubrs
         # populate naming data
-        info = self.ufo.info
-        psName = getAttrWithFallback(info, "postscriptFontName")
+        info = self.resolvedInfo
+        psName = info.postscriptFontName
         cff.fontNames.append(psName)
         topDict = cff.topDictIndex[0]
         topDict.version = "%d.%d" % (
-            getAttrWithFallback(info, "versionMajor"),
-            getAttrWithFallback(info, "versionMinor"),
+            info.versionMajor,
+            info.versionMinor,
         )
-        trademark = getAttrWithFallback(info, "trademark")
+        trademark = info.trademark
         if trademark:
             trademark = normalizeStringForPostscript(
                 trademark.replace("\u00A9", "Copyright")
@@ -1290,7 +1533,7 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         if trademark is None:
             trademark = ""
         topDict.Notice = trademark
-        copyright = getAttrWithFallback(info, "copyright")
+        copyright = info.copyright
         if copyright:
             copyright = normalizeStringForPostscript(
                 copyright.replace("\u00A9", "Copyright")
@@ -1305,20 +1548,18 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         if copyright is None:
             copyright = ""
         topDict.Copyright = copyright
-        topDict.FullName = getAttrWithFallback(info, "postscriptFullName")
-        topDict.FamilyName = getAttrWithFallback(
-            info, "openTypeNamePreferredFamilyName"
-        )
-        topDict.Weight = getAttrWithFallback(info, "postscriptWeightName")
+        topDict.FullName = info.postscriptFullName
+        topDict.FamilyName = info.openTypeNamePreferredFamilyName
+        topDict.Weight = info.postscriptWeightName
         # populate various numbers
-        topDict.isFixedPitch = int(getAttrWithFallback(info, "postscriptIsFixedPitch"))
-        topDict.ItalicAngle = float(getAttrWithFallback(info, "italicAngle"))
-        underlinePosition = getAttrWithFallback(info, "postscriptUnderlinePosition")
+        topDict.isFixedPitch = int(info.postscriptIsFixedPitch)
+        topDict.ItalicAngle = float(info.italicAngle)
+        underlinePosition = info.postscriptUnderlinePosition
         topDict.UnderlinePosition = otRound(underlinePosition)
-        underlineThickness = getAttrWithFallback(info, "postscriptUnderlineThickness")
+        underlineThickness = info.postscriptUnderlineThickness
         topDict.UnderlineThickness = otRound(underlineThickness)
         # populate font matrix
-        unitsPerEm = otRound(getAttrWithFallback(info, "unitsPerEm"))
+        unitsPerEm = otRound(info.unitsPerEm)
         topDict.FontMatrix = [1.0 / unitsPerEm, 0, 0, 1.0 / unitsPerEm, 0, 0]
         # populate the width values
         defaultWidthX, nominalWidthX = self.getDefaultAndNominalWidths()
@@ -1327,26 +1568,26 @@ class OutlineOTFCompiler(BaseOutlineCompiler):
         if nominalWidthX:
             private.rawDict["nominalWidthX"] = nominalWidthX
         # populate hint data
-        blueFuzz = otRound(getAttrWithFallback(info, "postscriptBlueFuzz"))
-        blueShift = otRound(getAttrWithFallback(info, "postscriptBlueShift"))
-        blueScale = getAttrWithFallback(info, "postscriptBlueScale")
-        forceBold = getAttrWithFallback(info, "postscriptForceBold")
-        blueValues = getAttrWithFallback(info, "postscriptBlueValues")
+        blueFuzz = otRound(info.postscriptBlueFuzz)
+        blueShift = otRound(info.postscriptBlueShift)
+        blueScale = info.postscriptBlueScale
+        forceBold = info.postscriptForceBold
+        blueValues = info.postscriptBlueValues
         if isinstance(blueValues, list):
             blueValues = [otRound(i) for i in blueValues]
-        otherBlues = getAttrWithFallback(info, "postscriptOtherBlues")
+        otherBlues = info.postscriptOtherBlues
         if isinstance(otherBlues, list):
             otherBlues = [otRound(i) for i in otherBlues]
-        familyBlues = getAttrWithFallback(info, "postscriptFamilyBlues")
+        familyBlues = info.postscriptFamilyBlues
         if isinstance(familyBlues, list):
             familyBlues = [otRound(i) for i in familyBlues]
-        familyOtherBlues = getAttrWithFallback(info, "postscriptFamilyOtherBlues")
+        familyOtherBlues = info.postscriptFamilyOtherBlues
         if isinstance(familyOtherBlues, list):
             familyOtherBlues = [otRound(i) for i in familyOtherBlues]
-        stemSnapH = getAttrWithFallback(info, "postscriptStemSnapH")
+        stemSnapH = info.postscriptStemSnapH
         if isinstance(stemSnapH, list):
             stemSnapH = [otRound(i) for i in stemSnapH]
-        stemSnapV = getAttrWithFallback(info, "postscriptStemSnapV")
+        stemSnapV = info.postscriptStemSnapV
         if isinstance(stemSnapV, list):
             stemSnapV = [otRound(i) for i in stemSnapV]
         # only write the blues data if some blues are defined.
@@ -1397,19 +1638,22 @@ class OutlineTTFCompiler(BaseOutlineCompiler):
     def compileGlyphs(self):
         """Compile and return the TrueType glyphs for this font."""
         allGlyphs = self.allGlyphs
-        ttGlyphs = {}
-        for name in self.glyphOrder:
+
+        def compileGlyph(name):
             glyph = allGlyphs[name]
             pen = TTGlyphPointPen(allGlyphs)
             try:
                 glyph.drawPoints(pen)
             except NotImplementedError:
                 logger.error("%r has invalid curve format; skipped", name)
-                ttGlyph = Glyph()
-            else:
-                ttGlyph = pen.glyph()
-            ttGlyphs[name] = ttGlyph
-        return ttGlyphs
+                # not cached, so the error is logged again on the next build
+                return None
+            return pen.glyph()
+
+        return {
+            name: Glyph() if glyph is None else glyph
+            for name, glyph in self.compileAllGlyphs(compileGlyph).items()
+        }
 
     def makeGlyphsBoundingBoxes(self):
         """Make bounding boxes for all the glyphs.
@@ -1421,9 +1665,16 @@ class OutlineTTFCompiler(BaseOutlineCompiler):
         """
         glyphBoxes = {}
         ttGlyphs = self.getCompiledGlyphs()
+        # like glyph.recalcBounds(ttGlyphs) for each glyph, without expanding
+        # the composite glyphs that only offset their components
+        glyphBounds = _calcTTGlyphsBounds(ttGlyphs)
         for glyphName, glyph in ttGlyphs.items():
-            glyph.recalcBounds(ttGlyphs)
-            bounds = BoundingBox(glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax)
+            bounds = glyphBounds[glyphName]
+            if bounds is None:
+                bounds = EMPTY_BOUNDING_BOX
+            else:
+                bounds = BoundingBox(*(otRound(v) for v in bounds))
+            glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax = bounds
             if bounds == EMPTY_BOUNDING_BOX:
                 bounds = None
             glyphBoxes[glyphName] = bounds
@@ -1464,6 +1715,10 @@ class OutlineTTFCompiler(BaseOutlineCompiler):
         self.setupTable_glyf()
         if self.ufo.info.openTypeGaspRangeRecords:
             self.setupTable_gasp()
+        if "maxp" in self.otf and "glyf" in self.otf:
+            # compute the maxp values (and the head bbox and flags) that fontTools
+            # would otherwise only calculate when saving the font
+            self.otf["maxp"].recalc(self.otf)
 
     def setupTable_glyf(self):
         """Make the glyf table."""
@@ -0,0 +1,131 @@
+"""Helpers to run independent pieces of compilation work on a process pool.
+
+Font objects (defcon, ufoLib2) and the TTFont objects being built are not
+picklable, so work is not shipped to the workers as arguments. Instead, the
+function and the list of items to process are stashed in a module global
+before the pool is created, and the pool is started with the 'fork' method
+so that the worker processes inherit them; only the index of each item is
+sent over the pipe. Results, on the other hand, must be picklable.
+
+If a `ufo2ft.profiling.Profiler` is active, the stages recorded by the worker
+processes are sent back along with the results and added to it.
+
+On platforms where 'fork' is not available, or when called from inside a
+worker process (nested pools are not supported), the work is done serially
+in the current process.
+"""
+
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from fontTools.ttLib import TTFont
+
+from ufo2ft import profiling
+
+logger = logging.getLogger(__name__)
+
+
+# (func, items) tuple inherited by the forked worker processes
+_tasks = None
+
+# set to True in the worker processes to prevent nested pools
+_inWorker = False
+
+
+def _initWorker():
+    global _inWorker
+    _inWorker = True
+
+
+def _runTask(index):
+    func, items = _tasks
+    profiler = profiling.getProfiler()
+    if profiler is None:
+        return func(items[index]), None
+    # the profiler was inherited from the parent process along with its
+    # records; only send back the new ones
+    del profiler.records[:]
+    result = func(items[index])
+    return result, profiler.records
+
+
+def canRunInParallel(workers):
+    """Return True if `workers` requests more than one process and a process
+    pool can actually be used from the current process.
+    """
+    if workers is None or workers == 1 or _inWorker:
+        return False
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def effectiveWorkers(workers):
+    """Return the actual number of worker processes for the `workers` option.
+
+    None means serial execution (1 process); 0 means one worker per CPU.
+    """
+    if workers is None:
+        return 1
+    if workers < 0:
+        raise ValueError(f"workers must be a non-negative integer: {workers!r}")
+    if workers == 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+def parallelMap(func, items, workers=None):
+    """Return the list of `func(item)` for each item in `items`, in order.
+
+    If `workers` is greater than 1 (or 0, meaning one per CPU), the calls are
+    distributed over a pool of forked worker processes; `func` return values
+    must be picklable. Otherwise, or if a pool can't be used (see module
+    docstring), `func` is called serially in the current process.
+    """
+    global _tasks
+
+    items = list(items)
+    numWorkers = min(effectiveWorkers(workers), len(items))
+    if numWorkers <= 1 or not canRunInParallel(workers):
+        return [func(item) for item in items]
+
+    logger.debug("Running %d tasks on %d worker processes", len(items), numWorkers)
+    _tasks = (func, items)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=numWorkers,
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_initWorker,
+        ) as pool:
+            results = []
+            for result, records in pool.map(_runTask, range(len(items))):
+                if records:
+                    profiling.getProfiler().addRecords(records)
+                results.append(result)
+            return results
+    finally:
+        _tasks = None
+
+
+def splitInChunks(items, workers=None, maxChunkSize=64):
+    """Split the `items` list in chunks to be processed with `parallelMap`.
+
+    The chunks are small enough that each worker gets at least one, and no
+    longer than `maxChunkSize` items so that the load stays balanced.
+    """
+    numWorkers = effectiveWorkers(workers)
+    chunkSize = max(1, min(maxChunkSize, len(items) // numWorkers))
+    return [items[i : i + chunkSize] for i in range(0, len(items), chunkSize)]
+
+
+def serializeFont(ttFont):
+    """Compile a TTFont to bytes so it can be sent back from a worker."""
+    stream = BytesIO()
+    ttFont.save(stream)
+    return stream.getvalue()
+
+
+def deserializeFont(data):
+    """Load a TTFont from the bytes returned by `serializeFont`."""
+    return TTFont(BytesIO(data))
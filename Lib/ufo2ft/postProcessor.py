@@ -3,17 +3,46 @@ import logging
 import re
 from io import BytesIO
 
-from fontTools.ttLib import TTFont
+from fontTools.ttLib import TTFont, newTable
+from fontTools.ttLib.tables.otBase import BaseTTXConverter
 
 from ufo2ft.constants import (
     GLYPHS_DONT_USE_PRODUCTION_NAMES,
     KEEP_GLYPH_NAMES,
     USE_PRODUCTION_NAMES,
 )
+from ufo2ft.profiling import stage
 
 logger = logging.getLogger(__name__)
 
 
+# tables that don't refer to glyphs, hence need no renaming
+_GLYPH_NAME_FREE_TABLES = frozenset(
+    [
+        "head",
+        "hhea",
+        "vhea",
+        "maxp",
+        "OS/2",
+        "name",
+        "gasp",
+        "meta",
+        "CPAL",
+        "fvar",
+        "avar",
+        "cvt ",
+        "fpgm",
+        "prep",
+        "DSIG",
+    ]
+)
+
+# tables renamed in memory by PostProcessor.rename_glyphs
+_RENAMED_IN_PLACE_TABLES = frozenset(
+    ["glyf", "loca", "hmtx", "vmtx", "cmap", "VORG", "post", "CFF ", "CFF2"]
+)
+
+
 class CFFVersion(enum.IntEnum):
     CFF = 1
     CFF2 = 2
@@ -37,17 +66,20 @@ class PostProcessor:
         2: SubroutinizerBackend.CFFSUBR,
     }
 
-    def __init__(self, otf, ufo, glyphSet=None):
+    def __init__(self, otf, ufo, glyphSet=None, reloadFont=False):
         self.ufo = ufo
         self.glyphSet = glyphSet if glyphSet is not None else ufo
 
-        # FIXME: Stop reloading all incoming fonts here. It ensures that 1) we
-        # get the final binary layout, which canonicalizes data for us and 2)
-        # can easily rename glyphs later. The former point should be fixed, as
-        # reloading is expensive and it is within reason for the compiler to
-        # spit out something that can be used without reloading.
-        # https://github.com/googlefonts/ufo2ft/issues/485
-        self.otf = _reloadFont(otf)
+        # The outline and feature compilers produce fonts whose tables can be
+        # post-processed in memory; glyphs are renamed in place. Set reloadFont
+        # to True to compile the font and load it again before post-processing,
+        # like older ufo2ft versions did (that canonicalizes the tables, but is
+        # expensive). https://github.com/googlefonts/ufo2ft/issues/485
+        if reloadFont:
+            otf = _reloadFont(otf)
+        self.otf = otf
+        self._reloaded = reloadFont
+        self._renamed = False
 
         self._postscriptNames = ufo.lib.get("public.postscriptNames")
 
@@ -100,13 +132,20 @@ class PostProcessor:
           NOTE: compreffor currently doesn't support input fonts with CFF2 table.
         """
         if self._get_cff_version(self.otf):
-            self.process_cff(
-                optimizeCFF=optimizeCFF,
-                cffVersion=cffVersion,
-                subroutinizer=subroutinizer,
-            )
+            with stage("process_cff", "postProcessor"):
+                self.process_cff(
+                    optimizeCFF=optimizeCFF,
+                    cffVersion=cffVersion,
+                    subroutinizer=subroutinizer,
+                )
 
-        self.process_glyph_names(useProductionNames)
+        with stage("process_glyph_names", "postProcessor"):
+            self.process_glyph_names(useProductionNames)
+
+        if not self._reloaded:
+            with stage("canonicalize", "postProcessor"):
+                # renaming the glyphs already recompiled the layout tables
+                _canonicalizeFont(self.otf, recompileLayout=not self._renamed)
 
         return self.otf
 
@@ -169,11 +208,67 @@ class PostProcessor:
         """Rename glyphs using ufo.lib.public.postscriptNames in UFO."""
         rename_map = self._build_production_names()
         self.rename_glyphs(self.otf, rename_map)
+        self._renamed = True
 
     @staticmethod
     def rename_glyphs(otf, rename_map):
+        # Tables that were not loaded yet are decompiled with the new glyph
+        # order. Loaded tables refer to glyphs by name: those holding the bulk
+        # of the data are renamed in place, the others are compiled with the
+        # old glyph order and decompiled with the new one.
+        tablesData = {}
+        for tag in otf.keys():
+            if (
+                otf.isLoaded(tag)
+                and tag not in _GLYPH_NAME_FREE_TABLES
+                and tag not in _RENAMED_IN_PLACE_TABLES
+            ):
+                tablesData[tag] = otf[tag].compile(otf)
+
         otf.setGlyphOrder([rename_map.get(n, n) for n in otf.getGlyphOrder()])
 
+        if otf.isLoaded("glyf"):
+            glyf = otf["glyf"]
+            glyf.glyphs = {rename_map.get(n, n): g for n, g in glyf.glyphs.items()}
+            glyf.glyphOrder = otf.getGlyphOrder()
+            for glyph in glyf.glyphs.values():
+                if glyph.isComposite():
+                    for component in glyph.components:
+                        component.glyphName = rename_map.get(
+                            component.glyphName, component.glyphName
+                        )
+
+        for tag in ("hmtx", "vmtx"):
+            if otf.isLoaded(tag):
+                mtx = otf[tag]
+                mtx.metrics = {rename_map.get(n, n): m for n, m in mtx.metrics.items()}
+
+        if otf.isLoaded("cmap"):
+            for subtable in otf["cmap"].tables:
+                if subtable.format == 14:
+                    subtable.uvsDict = {
+                        selector: [
+                            (uv, rename_map.get(n, n) if n is not None else None)
+                            for uv, n in mappings
+                        ]
+                        for selector, mappings in subtable.uvsDict.items()
+                    }
+                else:
+                    subtable.cmap = {
+                        uv: rename_map.get(n, n) for uv, n in subtable.cmap.items()
+                    }
+
+        if otf.isLoaded("VORG"):
+            vorg = otf["VORG"]
+            vorg.VOriginRecords = {
+                rename_map.get(n, n): v for n, v in vorg.VOriginRecords.items()
+            }
+
+        for tag, data in tablesData.items():
+            table = newTable(tag)
+            table.decompile(data, otf)
+            otf[tag] = table
+
         # we need to compile format 2 'post' table so that the 'extraNames'
         # attribute is updated with the list of the names outside the
         # standard Macintosh glyph order; otherwise, if one dumps the font
@@ -388,6 +483,41 @@ def _stripCharStringWidth(program):
     return result
 
 
+def _canonicalizeFont(otf, recompileLayout=True):
+    """Update the tables of a font compiled in memory to the state they would
+    be in after a save and reload, for the data that fontTools only computes
+    when compiling the tables.
+
+    The OpenType layout (and other otData-based) tables, which may have been
+    built or merged in memory without their count fields, are compiled and
+    decompiled again unless *recompileLayout* is False. The outline and
+    metrics tables, which hold the bulk of the data, are left as they are.
+    """
+    if recompileLayout:
+        recompiled = {
+            tag: otf[tag].compile(otf)
+            for tag in otf.keys()
+            if otf.isLoaded(tag) and isinstance(otf[tag], BaseTTXConverter)
+        }
+        for tag, data in recompiled.items():
+            table = newTable(tag)
+            table.decompile(data, otf)
+            otf[tag] = table
+
+    if otf.isLoaded("name"):
+        otf["name"].names.sort()
+
+    # compute the post table's extraNames and mapping
+    if otf.isLoaded("post") and otf["post"].formatType == 2.0:
+        otf["post"].compile(otf)
+
+    if otf.isLoaded("CFF "):
+        private = otf["CFF "].cff.topDictIndex[0].Private
+        forceBold = private.rawDict.get("ForceBold")
+        if isinstance(forceBold, bool):
+            private.rawDict["ForceBold"] = private.ForceBold = int(forceBold)
+
+
 def _reloadFont(font: TTFont) -> TTFont:
     """Recompile a font to arrive at the final internal layout."""
     stream = BytesIO()
@@ -1,17 +1,25 @@
 import itertools
+import logging
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+from fontTools.pens.recordingPen import RecordingPointPen
 
 from ufo2ft.constants import (
     COLOR_LAYER_MAPPING_KEY,
     COLOR_LAYERS_KEY,
     COLOR_PALETTES_KEY,
 )
-from ufo2ft.filters import isValidFilter, loadFilters
+from ufo2ft.filters import BaseFilter, isValidFilter, loadFilters
 from ufo2ft.filters.decomposeComponents import DecomposeComponentsFilter
 from ufo2ft.filters.decomposeTransformedComponents import (
     DecomposeTransformedComponentsFilter,
 )
 from ufo2ft.fontInfoData import getAttrWithFallback
-from ufo2ft.util import _GlyphSet
+from ufo2ft.parallel import canRunInParallel, parallelMap, splitInChunks
+from ufo2ft.util import ComponentGraph, _GlyphSet, _materializeGlyphs
+
+logger = logging.getLogger(__name__)
 
 
 def _load_custom_filters(ufo, filters=None):
@@ -40,6 +48,33 @@ def _load_custom_filters(ufo, filters=None):
     return result
 
 
+@contextmanager
+def _sharedComponentGraphs(glyphSets):
+    # Attach a ComponentGraph to each glyph set, for all the filters that run
+    # on it to share, then detach it: the glyph sets can be modified later.
+    for glyphSet in glyphSets:
+        glyphSet.componentGraph = ComponentGraph(glyphSet)
+    try:
+        yield
+    finally:
+        for glyphSet in glyphSets:
+            del glyphSet.componentGraph
+
+
+def _runFilter(func, ufo, glyphSet):
+    # Only the filters whose own class declares it can be passed copy-on-write
+    # glyphs: the others may modify the source glyphs' contours, points,
+    # components or anchors in place, so give them private copies.
+    if not vars(type(func)).get("_copyOnWrite", False):
+        _materializeGlyphs(glyphSet)
+    # BaseFilter keeps the shared component graph up to date with the glyphs
+    # it modifies; for other filters, re-index all the glyphs
+    result = func(ufo, glyphSet)
+    if not isinstance(func, BaseFilter):
+        glyphSet.componentGraph.update()
+    return result
+
+
 class BasePreProcessor:
     """Base class for objects that performs pre-processing operations on
     the UFO glyphs, such as decomposing composites, removing overlaps, or
@@ -48,7 +83,9 @@ class BasePreProcessor:
     By default the input UFO is **not** modified. The ``process`` method
     returns a dictionary containing the new modified glyphset, keyed by
     glyph name. If ``inplace`` is True, the input UFO is modified directly
-    without the need to first copy the glyphs.
+    without the need to first copy the glyphs. Otherwise, the built-in filters
+    only copy the glyphs that they modify, while custom filters are given
+    copies of all the glyphs, which they can modify in any way.
 
     Subclasses can override the ``initDefaultFilters`` method and return
     a list of built-in filters which are performed in a predefined order,
@@ -68,6 +105,18 @@ class BasePreProcessor:
     insert additional filters before or after those already defined in the
     UFO lib, as opposed to discard/replace them which is the default behavior
     when ``...`` is absent.
+
+    The optional ``workers`` argument is the number of processes used to run
+    the default glyph-local filters (e.g. removing overlaps, converting curves
+    to quadratic) in parallel; None (default) runs them serially, 0 uses one
+    process per CPU.
+
+    If ``compactGlyphs`` is True (and ``inplace`` is False), the glyphs that
+    are modified are copied as ``ufo2ft.compactGlyph.CompactGlyph`` objects,
+    which store their outlines in flat arrays instead of one object per
+    point, and use much less memory than the defcon or ufoLib2 glyphs.
+    Custom filters must then only use the parts of the glyph API that
+    CompactGlyph implements.
     """
 
     def __init__(
@@ -77,13 +126,20 @@ class BasePreProcessor:
         layerName=None,
         skipExportGlyphs=None,
         filters=None,
+        workers=None,
+        compactGlyphs=False,
         **kwargs,
     ):
         self.ufo = ufo
         self.inplace = inplace
         self.layerName = layerName
+        self.workers = workers
         self.glyphSet = _GlyphSet.from_layer(
-            ufo, layerName, copy=not inplace, skipExportGlyphs=skipExportGlyphs
+            ufo,
+            layerName,
+            copy=not inplace,
+            skipExportGlyphs=skipExportGlyphs,
+            compact=compactGlyphs,
         )
         self.defaultFilters = self.initDefaultFilters(**kwargs)
 
@@ -97,8 +153,9 @@ class BasePreProcessor:
     def process(self):
         ufo = self.ufo
         glyphSet = self.glyphSet
-        for func in self.preFilters + self.defaultFilters + self.postFilters:
-            func(ufo, glyphSet)
+        with _sharedComponentGraphs([glyphSet]):
+            for func in self.preFilters + self.defaultFilters + self.postFilters:
+                _runFilter(func, ufo, glyphSet)
         return glyphSet
 
 
@@ -145,9 +202,11 @@ class OTFPreProcessor(BasePreProcessor):
             from ufo2ft.filters.removeOverlaps import RemoveOverlapsFilter
 
             if overlapsBackend is not None:
-                filters.append(RemoveOverlapsFilter(backend=overlapsBackend))
+                filters.append(
+                    RemoveOverlapsFilter(backend=overlapsBackend, workers=self.workers)
+                )
             else:
-                filters.append(RemoveOverlapsFilter())
+                filters.append(RemoveOverlapsFilter(workers=self.workers))
 
         return filters
 
@@ -215,9 +274,11 @@ class TTFPreProcessor(OTFPreProcessor):
             from ufo2ft.filters.removeOverlaps import RemoveOverlapsFilter
 
             if overlapsBackend is not None:
-                filters.append(RemoveOverlapsFilter(backend=overlapsBackend))
+                filters.append(
+                    RemoveOverlapsFilter(backend=overlapsBackend, workers=self.workers)
+                )
             else:
-                filters.append(RemoveOverlapsFilter())
+                filters.append(RemoveOverlapsFilter(workers=self.workers))
 
         if convertCubics:
             from ufo2ft.filters.cubicToQuadratic import CubicToQuadraticFilter
@@ -227,6 +288,7 @@ class TTFPreProcessor(OTFPreProcessor):
                     conversionError=conversionError,
                     reverseDirection=reverseDirection,
                     rememberCurveType=rememberCurveType and self.inplace,
+                    workers=self.workers,
                 )
             )
         return filters
@@ -253,6 +315,16 @@ class TTFInterpolatablePreProcessor:
     The ``conversionError``, ``reverseDirection``, ``flattenComponents`` and
     ``rememberCurveType`` arguments work in the same way as in the
     ``TTFPreProcessor``.
+
+    The optional ``workers`` argument is the number of processes used for
+    the cubic to quadratic conversion. Since the conversion of a glyph only
+    depends on the same glyph in the other masters, the glyph names are split
+    in chunks that are converted in parallel, then the new outlines are copied
+    back into the glyphsets. By default (None) everything runs in the current
+    process; 0 means one process per CPU.
+
+    The ``compactGlyphs`` argument works in the same way as in the
+    ``BasePreProcessor``.
     """
 
     def __init__(
@@ -266,11 +338,14 @@ class TTFInterpolatablePreProcessor:
         layerNames=None,
         skipExportGlyphs=None,
         filters=None,
+        workers=None,
+        compactGlyphs=False,
     ):
         from cu2qu.ufo import DEFAULT_MAX_ERR
 
         self.ufos = ufos
         self.inplace = inplace
+        self.workers = workers
         self.flattenComponents = flattenComponents
 
         if layerNames is None:
@@ -282,7 +357,11 @@ class TTFInterpolatablePreProcessor:
         # contains none of the glyphs to be skipped, or any references to it).
         self.glyphSets = [
             _GlyphSet.from_layer(
-                ufo, layerName, copy=not inplace, skipExportGlyphs=skipExportGlyphs
+                ufo,
+                layerName,
+                copy=not inplace,
+                skipExportGlyphs=skipExportGlyphs,
+                compact=compactGlyphs,
             )
             for ufo, layerName in zip(ufos, layerNames)
         ]
@@ -304,6 +383,10 @@ class TTFInterpolatablePreProcessor:
         self.postFilters = [[f for f in filters if not f.pre] for filters in filterses]
 
     def process(self):
+        with _sharedComponentGraphs(self.glyphSets):
+            return self._process()
+
+    def _process(self):
         from cu2qu.ufo import fonts_to_quadratic
 
         needs_decomposition = set()
@@ -312,9 +395,9 @@ class TTFInterpolatablePreProcessor:
         for funcs, ufo, glyphSet in zip(self.preFilters, self.ufos, self.glyphSets):
             for func in funcs:
                 if isinstance(func, DecomposeTransformedComponentsFilter):
-                    needs_decomposition |= func(ufo, glyphSet)
+                    needs_decomposition |= _runFilter(func, ufo, glyphSet)
                 else:
-                    func(ufo, glyphSet)
+                    _runFilter(func, ufo, glyphSet)
 
         # If we decomposed a glyph in some masters, we must ensure it is decomposed in
         # all masters. (https://github.com/googlefonts/ufo2ft/issues/507)
@@ -326,15 +409,18 @@ class TTFInterpolatablePreProcessor:
         # then apply all default filters
         for funcs, ufo, glyphSet in zip(self.defaultFilters, self.ufos, self.glyphSets):
             for func in funcs:
-                func(ufo, glyphSet)
-
-        fonts_to_quadratic(
-            self.glyphSets,
-            max_err=self._conversionErrors,
-            reverse_direction=self._reverseDirection,
-            dump_stats=True,
-            remember_curve_type=self._rememberCurveType and self.inplace,
-        )
+                _runFilter(func, ufo, glyphSet)
+
+        if canRunInParallel(self.workers):
+            self._convertToQuadraticInWorkers()
+        else:
+            fonts_to_quadratic(
+                self.glyphSets,
+                max_err=self._conversionErrors,
+                reverse_direction=self._reverseDirection,
+                dump_stats=True,
+                remember_curve_type=self._rememberCurveType and self.inplace,
+            )
 
         # TrueType fonts cannot mix contours and components, so pick out all glyphs
         # that have contours (`bool(len(g)) == True`) and decompose their
@@ -352,6 +438,118 @@ class TTFInterpolatablePreProcessor:
         # finally apply all custom post-filters
         for funcs, ufo, glyphSet in zip(self.postFilters, self.ufos, self.glyphSets):
             for func in funcs:
-                func(ufo, glyphSet)
+                _runFilter(func, ufo, glyphSet)
 
         return self.glyphSets
+
+    def _convertToQuadraticInWorkers(self):
+        # Same as calling cu2qu's fonts_to_quadratic on all the glyphsets, but
+        # with the glyphs converted in chunks on a pool of worker processes.
+        from cu2qu.errors import IncompatibleFontsError
+        from cu2qu.ufo import CURVE_TYPE_LIB_KEY, fonts_to_quadratic
+
+        rememberCurveType = self._rememberCurveType and self.inplace
+        if rememberCurveType:
+            # let cu2qu check the curve types stored in the glyph sets' libs,
+            # like in a serial build: it logs the same messages and raises the
+            # same errors. The glyph sets are stood in for by copies of their
+            # libs without glyphs, so nothing is converted or modified here;
+            # cu2qu returns False when all the curves are already quadratic.
+            if not fonts_to_quadratic(
+                [
+                    SimpleNamespace(lib=dict(glyphSet.lib), keys=tuple)
+                    for glyphSet in self.glyphSets
+                ],
+                max_err=self._conversionErrors,
+                remember_curve_type=True,
+            ):
+                return
+
+        glyphNames = sorted(
+            set().union(*(glyphSet.keys() for glyphSet in self.glyphSets))
+        )
+        stats = {}
+        errorGlyphs = []
+        for outlines, chunkStats, chunkErrors in parallelMap(
+            self._convertChunkToQuadratic,
+            splitInChunks(glyphNames, self.workers),
+            workers=self.workers,
+        ):
+            for glyphName, recordings in outlines:
+                for glyphSet, recording in zip(self.glyphSets, recordings):
+                    if recording is None:
+                        continue
+                    glyph = glyphSet[glyphName]
+                    glyph.clearContours()
+                    glyph.clearComponents()
+                    recording.replay(glyph.getPointPen())
+            for spline_length, count in chunkStats.items():
+                stats[spline_length] = stats.get(spline_length, 0) + count
+            errorGlyphs.extend(chunkErrors)
+
+        if errorGlyphs:
+            # the errors reference the glyph objects, which can't be sent back
+            # from the workers: convert the incompatible glyphs again here to
+            # log and raise the same errors as in a serial build.
+            fonts_to_quadratic(
+                [
+                    {name: glyphSet[name] for name in errorGlyphs if name in glyphSet}
+                    for glyphSet in self.glyphSets
+                ],
+                max_err=self._conversionErrors,
+                reverse_direction=self._reverseDirection,
+                remember_curve_type=False,
+            )
+            # unreachable, unless the conversion isn't deterministic
+            raise IncompatibleFontsError({name: None for name in errorGlyphs})
+
+        if stats:
+            logger.info(
+                "New spline lengths: %s",
+                ", ".join("%s: %d" % (n, stats[n]) for n in sorted(stats)),
+            )
+
+        if rememberCurveType:
+            for glyphSet in self.glyphSets:
+                glyphSet.lib[CURVE_TYPE_LIB_KEY] = "quadratic"
+
+    def _convertChunkToQuadratic(self, glyphNames):
+        # called in a worker process: convert the given glyphs compatibly
+        # across the masters like fonts_to_quadratic does, and return the new
+        # outlines of the glyphs that were modified (None for masters that
+        # don't have the glyph), the cu2qu stats and the names of the glyphs
+        # that failed to convert.
+        from cu2qu.errors import IncompatibleGlyphsError
+        from cu2qu.ufo import glyphs_to_quadratic
+
+        stats = {}
+        errorGlyphs = []
+        outlines = []
+        for glyphName in glyphNames:
+            glyphs = [glyphSet.get(glyphName) for glyphSet in self.glyphSets]
+            try:
+                modified = glyphs_to_quadratic(
+                    [glyph for glyph in glyphs if glyph is not None],
+                    max_err=[
+                        maxErr
+                        for glyph, maxErr in zip(glyphs, self._conversionErrors)
+                        if glyph is not None
+                    ],
+                    reverse_direction=self._reverseDirection,
+                    stats=stats,
+                )
+            except IncompatibleGlyphsError:
+                errorGlyphs.append(glyphName)
+                continue
+            if not modified:
+                continue
+            recordings = []
+            for glyph in glyphs:
+                if glyph is None:
+                    recordings.append(None)
+                    continue
+                recording = RecordingPointPen()
+                glyph.drawPoints(recording)
+                recordings.append(recording)
+            outlines.append((glyphName, recordings))
+        return outlines, stats, errorGlyphs
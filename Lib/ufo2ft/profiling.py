@@ -0,0 +1,340 @@
+"""Record where the compilation of a font spends its time and memory.
+
+The compile functions, and the pre-processors, filters, outline compilers,
+feature writers and compilers and post-processors they call, mark each of
+their stages with the `stage` context manager. Nothing is recorded unless a
+`Profiler` is active, either because it was passed to a ``compile*`` function
+as the `profile` argument, or because it is used as a context manager:
+
+    >>> profiler = Profiler()
+    >>> with profiler:  # doctest: +SKIP
+    ...     ttf = compileTTF(ufo)
+    >>> profiler.writeJSON("report.json")  # doctest: +SKIP
+    >>> profiler.writeChromeTrace("trace.json")  # doctest: +SKIP
+
+For each stage the profiler records the wall-clock time, the CPU time of the
+process and, if `traceMemory` is True (the default), the peak size of the
+memory blocks allocated by Python while the stage was running, as reported by
+the `tracemalloc` module; tracing the memory allocations makes the build
+noticeably slower. Stages run on worker processes (see `ufo2ft.parallel`) are
+sent back to the profiler in the parent process, with the worker's pid.
+
+The Chrome trace can be loaded in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from inspect import isgeneratorfunction
+
+logger = logging.getLogger(__name__)
+
+
+# the Profiler recording the stages in the current process, if any
+_current = None
+
+_noStage = nullcontext()
+
+
+class StageRecord:
+    """The measurements of one run of a compilation stage.
+
+    *start*, *wallTime* and *cpuTime* are in seconds; *start* is relative to
+    the creation of the profiler. *peakMemory* is in bytes, or None if the
+    memory allocations were not traced. *depth* is the number of enclosing
+    stages.
+    """
+
+    __slots__ = (
+        "name",
+        "category",
+        "start",
+        "wallTime",
+        "cpuTime",
+        "peakMemory",
+        "depth",
+        "pid",
+        "args",
+    )
+
+    def __init__(
+        self, name, category, start, wallTime, cpuTime, peakMemory, depth, pid, args
+    ):
+        self.name = name
+        self.category = category
+        self.start = start
+        self.wallTime = wallTime
+        self.cpuTime = cpuTime
+        self.peakMemory = peakMemory
+        self.depth = depth
+        self.pid = pid
+        self.args = args
+
+    def __getstate__(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
+    def __repr__(self):
+        return "<{} {}:{} {:.3f}s>".format(
+            type(self).__name__, self.category, self.name, self.wallTime
+        )
+
+    def asDict(self):
+        result = self.__getstate__()
+        result["args"] = {k: _jsonValue(v) for k, v in self.args.items()}
+        return result
+
+
+class _OpenStage:
+    __slots__ = ("name", "category", "args", "wallStart", "cpuStart", "peakMemory")
+
+    def __init__(self, name, category, args, peakMemory):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.peakMemory = peakMemory
+        self.wallStart = time.perf_counter()
+        self.cpuStart = time.process_time()
+
+
+class Profiler:
+    """Collect a `StageRecord` for each stage run while the profiler is active.
+
+    A profiler can be activated several times (e.g. by nested compile
+    functions); the records accumulate in its *records* list.
+    """
+
+    def __init__(self, traceMemory=True):
+        self.traceMemory = traceMemory
+        self.records = []
+        self._origin = time.perf_counter()
+        self._openStages = []
+        self._previous = []
+        self._startedTracing = []
+
+    def __enter__(self):
+        global _current
+
+        self._previous.append(_current)
+        _current = self
+        startTracing = self.traceMemory and not tracemalloc.is_tracing()
+        if startTracing:
+            tracemalloc.start()
+        self._startedTracing.append(startTracing)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        global _current
+
+        if self._startedTracing.pop():
+            tracemalloc.stop()
+        _current = self._previous.pop()
+
+    @contextmanager
+    def stage(self, name, category, **args):
+        """Record the time and memory spent in the body of the with statement
+        as a stage called *name* of the given *category*. The keyword *args*
+        are stored with the record.
+        """
+        tracing = self.traceMemory and tracemalloc.is_tracing()
+        if tracing:
+            self._updatePeakMemory()
+            peakMemory = tracemalloc.get_traced_memory()[0]
+        else:
+            peakMemory = None
+        openStage = _OpenStage(name, category, args, peakMemory)
+        self._openStages.append(openStage)
+        try:
+            yield
+        finally:
+            wallTime = time.perf_counter() - openStage.wallStart
+            cpuTime = time.process_time() - openStage.cpuStart
+            if tracing:
+                self._updatePeakMemory()
+            self._openStages.pop()
+            self.records.append(
+                StageRecord(
+                    name,
+                    category,
+                    openStage.wallStart - self._origin,
+                    wallTime,
+                    cpuTime,
+                    openStage.peakMemory,
+                    len(self._openStages),
+                    os.getpid(),
+                    args,
+                )
+            )
+
+    def _updatePeakMemory(self):
+        # Fold the peak traced since the last call into all the open stages,
+        # then start measuring a new peak. Before Python 3.9 the peak can't be
+        # reset, so the stages report the peak since tracing started.
+        if not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for openStage in self._openStages:
+            if openStage.peakMemory is None or peak > openStage.peakMemory:
+                openStage.peakMemory = peak
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    def addRecords(self, records):
+        """Add the records collected by another process (e.g. a worker)."""
+        self.records.extend(records)
+
+    def sortedRecords(self):
+        """Return the records sorted by process and start time, outer stages
+        before the stages they contain.
+        """
+        return sorted(self.records, key=lambda r: (r.pid, r.start, r.depth))
+
+    def summary(self):
+        """Return a list of dicts with the number of runs, the total wall and
+        CPU times and the maximum peak memory of each stage, identified by its
+        category and name, in order of first run.
+        """
+        result = {}
+        for record in self.sortedRecords():
+            key = (record.category, record.name)
+            if key not in result:
+                result[key] = {
+                    "category": record.category,
+                    "name": record.name,
+                    "count": 0,
+                    "wallTime": 0.0,
+                    "cpuTime": 0.0,
+                    "peakMemory": None,
+                }
+            total = result[key]
+            total["count"] += 1
+            total["wallTime"] += record.wallTime
+            total["cpuTime"] += record.cpuTime
+            if record.peakMemory is not None and (
+                total["peakMemory"] is None or record.peakMemory > total["peakMemory"]
+            ):
+                total["peakMemory"] = record.peakMemory
+        return list(result.values())
+
+    def report(self):
+        """Return the recorded stages and their summary as a JSON-compatible
+        dict.
+        """
+        return {
+            "stages": [record.asDict() for record in self.sortedRecords()],
+            "summary": self.summary(),
+        }
+
+    def chromeTrace(self):
+        """Return the recorded stages as a dict in the Chrome Trace Event
+        format, with one complete ("X") event per stage.
+        """
+        events = []
+        for record in self.sortedRecords():
+            args = {k: _jsonValue(v) for k, v in record.args.items()}
+            args["cpuTime"] = record.cpuTime
+            if record.peakMemory is not None:
+                args["peakMemory"] = record.peakMemory
+            events.append(
+                {
+                    "name": record.name,
+                    "cat": record.category,
+                    "ph": "X",
+                    "ts": round(record.start * 1e6, 3),
+                    "dur": round(record.wallTime * 1e6, 3),
+                    "pid": record.pid,
+                    "tid": record.pid,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def writeJSON(self, path):
+        """Write the `report` to the JSON file at *path*."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def writeChromeTrace(self, path):
+        """Write the `chromeTrace` to the JSON file at *path*."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chromeTrace(), f)
+
+
+def _jsonValue(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def getProfiler():
+    """Return the active Profiler, or None."""
+    return _current
+
+
+def stage(name, category, **args):
+    """Return a context manager recording a stage with the active profiler,
+    or doing nothing if no profiler is active.
+    """
+    if _current is None:
+        return _noStage
+    return _current.stage(name, category, **args)
+
+
+def profiledCompile(func):
+    """Decorate a ``compile*`` function so that it activates the Profiler
+    passed as its `profile` keyword argument, if any, and records its whole
+    run as a stage of the "compile" category.
+
+    A generator function is only profiled while it runs: the profiler is
+    deactivated whenever the generator yields, and each run up to the next
+    item is recorded as a separate stage, so the time the caller spends
+    between the items isn't counted.
+    """
+    if isgeneratorfunction(func):
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = kwargs.get("profile")
+            generator = func(*args, **kwargs)
+            resume, value = generator.send, None
+            while True:
+                with _activate(profiler), stage(func.__name__, "compile"):
+                    try:
+                        item = resume(value)
+                    except StopIteration as e:
+                        return e.value
+                try:
+                    value = yield item
+                except GeneratorExit:
+                    generator.close()
+                    raise
+                except Exception as e:
+                    resume, value = generator.throw, e
+                else:
+                    resume = generator.send
+
+    else:
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with _activate(kwargs.get("profile")), stage(func.__name__, "compile"):
+                return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _activate(profiler):
+    # A profiler that's already active isn't activated again, so that nested
+    # compile functions don't start and stop the memory tracing.
+    if profiler is None or profiler is _current:
+        return _noStage
+    if not isinstance(profiler, Profiler):
+        raise TypeError(f"profile must be a Profiler instance: {profiler!r}")
+    return profiler
@@ -3,7 +3,11 @@ from __future__ import annotations
 import importlib
 import logging
 import re
+import weakref
+from collections import namedtuple
+from collections.abc import MutableMapping, MutableSequence
 from copy import deepcopy
+from functools import lru_cache
 from inspect import currentframe, getfullargspec
 from typing import TYPE_CHECKING, Callable
 
@@ -12,8 +16,13 @@ from fontTools.designspaceLib import DesignSpaceDocument
 from fontTools.feaLib.builder import addOpenTypeFeatures
 from fontTools.misc.fixedTools import otRound
 from fontTools.misc.transform import Identity, Transform
+from fontTools.pens.pointPen import SegmentToPointPen
+from fontTools.pens.recordingPen import RecordingPointPen
 from fontTools.pens.reverseContourPen import ReverseContourPen
-from fontTools.pens.transformPen import TransformPen
+from fontTools.pens.transformPen import TransformPen, TransformPointPen
+from fontTools.ttLib.tables import otTables
+
+from ufo2ft.compactGlyph import CompactGlyph
 
 if TYPE_CHECKING:
     from fontTools.ttLib.tables.G_S_U_B_ import table_G_S_U_B_
@@ -48,15 +57,23 @@ def makeOfficialGlyphOrder(font, glyphOrder=None):
 
 class _GlyphSet(dict):
     @classmethod
-    def from_layer(cls, font, layerName=None, copy=False, skipExportGlyphs=None):
-        """Return a mapping of glyph names to glyph objects from `font`."""
+    def from_layer(
+        cls, font, layerName=None, copy=False, skipExportGlyphs=None, compact=False
+    ):
+        """Return a mapping of glyph names to glyph objects from `font`.
+
+        If `copy` is True, the glyphs of `font` are left untouched: they are
+        wrapped in `_CopyOnWriteGlyph` objects, which copy them the first time
+        they are modified. If `compact` is also True, the copies are
+        `ufo2ft.compactGlyph.CompactGlyph` objects.
+        """
         if layerName is not None:
             layer = font.layers[layerName]
         else:
             layer = font.layers.defaultLayer
 
         if copy:
-            self = _copyLayer(layer, obj_type=cls)
+            self = _copyLayer(layer, obj_type=cls, compact=compact)
             self.lib = deepcopy(layer.lib)
         else:
             self = cls((g.name, g) for g in layer)
@@ -65,9 +82,18 @@ class _GlyphSet(dict):
         # If any glyphs in the skipExportGlyphs list are used as components, decompose
         # them in the containing glyphs...
         if skipExportGlyphs:
+            contoursCache = {}
             for glyph in self.values():
                 if any(c.baseGlyph in skipExportGlyphs for c in glyph.components):
-                    deepCopyContours(self, glyph, glyph, Transform(), skipExportGlyphs)
+                    deepCopyContours(
+                        self,
+                        glyph,
+                        glyph,
+                        Transform(),
+                        skipExportGlyphs,
+                        contoursCache=contoursCache,
+                    )
+                    discardCachedContours(contoursCache, glyph.name)
                     if hasattr(glyph, "removeComponent"):  # defcon
                         for c in [
                             component
@@ -90,19 +116,323 @@ class _GlyphSet(dict):
         return self
 
 
-def _copyLayer(layer, obj_type=dict):
+def _copyLayer(layer, obj_type=dict, compact=False):
     try:
         g = next(iter(layer))
     except StopIteration:  # layer is empty
         return obj_type()
 
-    newGlyph = _getNewGlyphFactory(g)
+    if compact:
+        newGlyph = CompactGlyph
+    else:
+        newGlyph = _getNewGlyphFactory(g)
     glyphSet = obj_type()
     for glyph in layer:
-        glyphSet[glyph.name] = _copyGlyph(glyph, glyphFactory=newGlyph)
+        glyphSet[glyph.name] = _CopyOnWriteGlyph(glyph, glyphFactory=newGlyph)
     return glyphSet
 
 
+# The glyph attributes and methods that don't modify the glyph, nor return
+# objects that can be modified in place.
+_READ_ONLY_GLYPH_ATTRIBUTES = frozenset(
+    [
+        "name",
+        "width",
+        "height",
+        "unicode",
+        "note",
+        "markColor",
+        "verticalOrigin",
+        "identifier",
+        "layer",
+        "font",
+        "bounds",
+        "controlPointBounds",
+        "leftMargin",
+        "rightMargin",
+        "topMargin",
+        "bottomMargin",
+        "area",
+        "draw",
+        "drawPoints",
+        "getBounds",
+        "getControlBounds",
+        "getLeftMargin",
+        "getRightMargin",
+        "getTopMargin",
+        "getBottomMargin",
+        "pointInside",
+    ]
+)
+
+
+class _CopyOnWriteGlyph:
+    """A glyph which reads from a source glyph until it is first modified,
+    then from a private copy of the source glyph.
+
+    The glyph is copied (with `_copyGlyph`) when an attribute is set, when
+    a method that may modify it is called (e.g. `clearContours`, `getPen` or
+    `appendAnchor`), or when one of its `unicodes`, `components`, `anchors`,
+    `guidelines`, `contours` or `lib` containers is modified. Contours,
+    components and anchors of the source glyph passed to the methods or
+    containers of the copied glyph are replaced by their own copies.
+
+    Until the glyph is copied, the contours, points, components and anchors
+    read from it belong to the source glyph. The pre-processors therefore only
+    pass these glyphs to the filters which never modify those in place (see
+    `BaseFilter._copyOnWrite`), and replace them with their copies (see
+    `_materializeGlyphs`) before running any other filter.
+    """
+
+    __slots__ = ("_source", "_copy", "_glyphFactory", "_counterparts")
+
+    def __init__(self, glyph, glyphFactory=None):
+        object.__setattr__(self, "_source", glyph)
+        object.__setattr__(self, "_copy", None)
+        object.__setattr__(self, "_glyphFactory", glyphFactory)
+        object.__setattr__(self, "_counterparts", None)
+
+    @property
+    def _glyph(self):
+        # the glyph to read from
+        copy = self._copy
+        return self._source if copy is None else copy
+
+    def _materialize(self, copyContours=True):
+        copy = self._copy
+        if copy is None:
+            source = self._source
+            copy = _copyGlyph(
+                source, glyphFactory=self._glyphFactory, copyContours=copyContours
+            )
+            counterparts = {}
+            for sourceObjects, copiedObjects in (
+                (source, copy if copyContours else [None] * len(source)),
+                (source.components, copy.components),
+                (source.anchors, copy.anchors),
+            ):
+                for obj, copiedObj in zip(sourceObjects, copiedObjects):
+                    counterparts[id(obj)] = (obj, copiedObj)
+            object.__setattr__(self, "_copy", copy)
+            object.__setattr__(self, "_counterparts", counterparts)
+        return copy
+
+    def _translate(self, value):
+        # replace the source contours, components or anchors in value with
+        # their copies
+        if isinstance(value, (_CopyOnWriteList, _CopyOnWriteDict)):
+            value = value.copy()
+        counterparts = self._counterparts
+        if not counterparts:
+            return value
+        if type(value) in (list, tuple):
+            return type(value)(self._translate(v) for v in value)
+        pair = counterparts.get(id(value))
+        if pair is None or pair[0] is not value:
+            return value
+        if pair[1] is None:
+            # the contours weren't copied, as they were cleared right away
+            counterparts[id(value)] = pair = (value, self._copyContour(value))
+        return pair[1]
+
+    def _copyContour(self, contour):
+        # draw a contour of the source glyph in the copy, then take it out: it
+        # can be added back like the contours removed by clearContours
+        copy = self._copy
+        contour.drawPoints(copy.getPointPen())
+        copiedContour = copy[len(copy) - 1]
+        if hasattr(copy, "removeContour"):  # defcon
+            copy.removeContour(copiedContour)
+        else:  # ufoLib2
+            del copy.contours[-1]
+        return copiedContour
+
+    def __getattr__(self, name):
+        container = _COPY_ON_WRITE_CONTAINERS.get(name)
+        if container is not None:
+            getattr(self._glyph, name)  # raise AttributeError if missing
+            return container(self, name)
+        value = getattr(self._glyph, name)
+        if name in _READ_ONLY_GLYPH_ATTRIBUTES:
+            return value
+        if callable(value):
+            # copy the glyph when the method is called, not when it is looked
+            # up (e.g. by hasattr)
+            def method(*args, **kwargs):
+                # no need to copy the contours that are about to be cleared
+                glyph = self._materialize(copyContours=name != "clearContours")
+                args = [self._translate(arg) for arg in args]
+                kwargs = {k: self._translate(v) for k, v in kwargs.items()}
+                return getattr(glyph, name)(*args, **kwargs)
+
+            return method
+        # any other object (e.g. the image) may be modified in place
+        return getattr(self._materialize(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._materialize(), name, self._translate(value))
+
+    def __delattr__(self, name):
+        delattr(self._materialize(), name)
+
+    def __len__(self):
+        return len(self._glyph)
+
+    def __iter__(self):
+        return iter(self._glyph)
+
+    def __getitem__(self, index):
+        return self._glyph[index]
+
+    def __eq__(self, other):
+        if isinstance(other, _CopyOnWriteGlyph):
+            other = other._glyph
+        return self._glyph == other
+
+    __hash__ = object.__hash__
+
+    def __deepcopy__(self, memo):
+        return deepcopy(self._glyph, memo)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name!r} of {self._glyph!r}>"
+
+
+class _CopyOnWriteList(MutableSequence):
+    """A list attribute of a `_CopyOnWriteGlyph`, which copies the glyph
+    when it is modified.
+    """
+
+    __slots__ = ("_owner", "_name")
+
+    def __init__(self, owner, name):
+        self._owner = owner
+        self._name = name
+
+    def _target(self):
+        return getattr(self._owner._glyph, self._name)
+
+    def _writable(self):
+        return getattr(self._owner._materialize(), self._name)
+
+    def __getitem__(self, index):
+        return self._target()[index]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+        self._writable()[index] = self._owner._translate(value)
+
+    def __delitem__(self, index):
+        del self._writable()[index]
+
+    def __len__(self):
+        return len(self._target())
+
+    def __iter__(self):
+        return iter(self._target())
+
+    def __contains__(self, value):
+        return value in self._target()
+
+    def insert(self, index, value):
+        self._writable().insert(index, self._owner._translate(value))
+
+    def sort(self, *args, **kwargs):
+        self._writable().sort(*args, **kwargs)
+
+    def copy(self):
+        return list(self._target())
+
+    def __eq__(self, other):
+        if isinstance(other, _CopyOnWriteList):
+            other = other.copy()
+        return self.copy() == other
+
+    def __add__(self, other):
+        return self.copy() + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.copy()
+
+    def __deepcopy__(self, memo):
+        return deepcopy(self._target(), memo)
+
+    def __repr__(self):
+        return repr(self._target())
+
+
+class _CopyOnWriteDict(MutableMapping):
+    """A dict attribute (the lib) of a `_CopyOnWriteGlyph`, which copies
+    the glyph when it is modified.
+    """
+
+    __slots__ = ("_owner", "_name")
+
+    def __init__(self, owner, name):
+        self._owner = owner
+        self._name = name
+
+    def _target(self):
+        return getattr(self._owner._glyph, self._name)
+
+    def _writable(self):
+        return getattr(self._owner._materialize(), self._name)
+
+    def __getitem__(self, key):
+        return self._target()[key]
+
+    def __setitem__(self, key, value):
+        self._writable()[key] = value
+
+    def __delitem__(self, key):
+        del self._writable()[key]
+
+    def __len__(self):
+        return len(self._target())
+
+    def __iter__(self):
+        return iter(self._target())
+
+    def __contains__(self, key):
+        return key in self._target()
+
+    def get(self, key, default=None):
+        return self._target().get(key, default)
+
+    def copy(self):
+        return dict(self._target())
+
+    def __eq__(self, other):
+        if isinstance(other, _CopyOnWriteDict):
+            other = other.copy()
+        return self.copy() == other
+
+    def __deepcopy__(self, memo):
+        return deepcopy(self._target(), memo)
+
+    def __repr__(self):
+        return repr(self._target())
+
+
+_COPY_ON_WRITE_CONTAINERS = {
+    "unicodes": _CopyOnWriteList,
+    "components": _CopyOnWriteList,
+    "anchors": _CopyOnWriteList,
+    "guidelines": _CopyOnWriteList,
+    "contours": _CopyOnWriteList,
+    "lib": _CopyOnWriteDict,
+}
+
+
+def _materializeGlyphs(glyphSet):
+    # replace the copy-on-write glyphs of glyphSet with their copies (made now
+    # if needed), which can be modified in any way
+    for glyphName, glyph in glyphSet.items():
+        if type(glyph) is _CopyOnWriteGlyph:
+            glyphSet[glyphName] = glyph._materialize()
+
+
 def _getNewGlyphFactory(glyph):
     # defcon.Glyph doesn't take a name argument, ufoLib2 requires one...
     cls = glyph.__class__
@@ -125,8 +455,20 @@ def _getNewGlyphFactory(glyph):
     return newGlyph
 
 
-def _copyGlyph(glyph, glyphFactory=None, reverseContour=False):
-    # copy everything except unused attributes: 'guidelines', 'note', 'image'
+def _getCompactGlyph(glyph):
+    # Return the CompactGlyph to modify in place for 'glyph': the glyph itself,
+    # or the copy of a copy-on-write glyph whose copies are CompactGlyphs (made
+    # now if needed); or None for the other glyphs
+    if type(glyph) is _CopyOnWriteGlyph:
+        if glyph._glyphFactory is CompactGlyph:
+            return glyph._materialize()
+        return None
+    return glyph if isinstance(glyph, CompactGlyph) else None
+
+
+def _copyGlyph(glyph, glyphFactory=None, reverseContour=False, copyContours=True):
+    # copy everything except unused attributes: 'guidelines', 'note', 'image';
+    # skip the contours if 'copyContours' is False
     if glyphFactory is None:
         glyphFactory = _getNewGlyphFactory(glyph)
 
@@ -143,7 +485,11 @@ def _copyGlyph(glyph, glyphFactory=None, reverseContour=False):
 
         pointPen = ReverseContourPointPen(pointPen)
 
-    glyph.drawPoints(pointPen)
+    if copyContours:
+        glyph.drawPoints(pointPen)
+    else:
+        for component in glyph.components:
+            component.drawPoints(pointPen)
 
     return copy
 
@@ -164,13 +510,24 @@ def _setGlyphMargin(glyph, side, margin):
 
 
 def deepCopyContours(
-    glyphSet, parent, composite, transformation, specificComponents=None
+    glyphSet,
+    parent,
+    composite,
+    transformation,
+    specificComponents=None,
+    contoursCache=None,
 ):
     """Copy contours from component to parent, including nested components.
 
     specificComponent: an optional list of glyph name strings. If not passed or
     None, decompose all components of a glyph unconditionally and completely. If
     passed, only completely decompose components whose baseGlyph is in the list.
+
+    contoursCache: an optional dict, in which the contours of the base glyphs
+    are recorded the first time they are copied, and replayed the next times.
+    The same dict can be passed to all the calls that decompose the glyphs of
+    a glyph set, as long as the glyphs whose contours are modified in between
+    are removed from it with `discardCachedContours`.
     """
 
     for nestedComponent in composite.components:
@@ -200,22 +557,52 @@ def deepCopyContours(
                 nestedBaseGlyph,
                 transformation.transform(nestedComponent.transformation),
                 specificComponents=specificComponentsEffective,
+                contoursCache=contoursCache,
             )
 
     # Check if there are any contours to copy before instantiating pens.
     if composite != parent and len(composite):
-        if transformation == Identity:
-            pen = parent.getPen()
-        else:
-            pen = TransformPen(parent.getPen(), transformation)
-            # if the transformation has a negative determinant, it will
-            # reverse the contour direction of the component
-            xx, xy, yx, yy = transformation[:4]
-            if xx * yy - xy * yx < 0:
+        # if the transformation has a negative determinant, it will
+        # reverse the contour direction of the component
+        xx, xy, yx, yy = transformation[:4]
+        reverse = xx * yy - xy * yx < 0
+
+        if contoursCache is None:
+            if transformation == Identity:
+                pen = parent.getPen()
+            else:
+                pen = TransformPen(parent.getPen(), transformation)
+                if reverse:
+                    pen = ReverseContourPen(pen)
+            for contour in composite:
+                contour.draw(pen)
+            return
+
+        # Record the points that the parent's pen would receive from the
+        # untransformed (and possibly reversed) contours, then replay them
+        # through the transformation: the result is the same.
+        key = (composite.name, reverse)
+        try:
+            recording = contoursCache[key]
+        except KeyError:
+            recording = contoursCache[key] = RecordingPointPen()
+            pen = SegmentToPointPen(recording)
+            if reverse:
                 pen = ReverseContourPen(pen)
+            for contour in composite:
+                contour.draw(pen)
+        pointPen = parent.getPointPen()
+        if transformation != Identity:
+            pointPen = TransformPointPen(pointPen, transformation)
+        recording.replay(pointPen)
+
 
-        for contour in composite:
-            contour.draw(pen)
+def discardCachedContours(contoursCache, glyphName):
+    """Remove the recordings of the contours of a glyph from a contoursCache
+    (see `deepCopyContours`), after the glyph is modified.
+    """
+    for reverse in (False, True):
+        contoursCache.pop((glyphName, reverse), None)
 
 
 def makeUnicodeToGlyphNameMapping(font, glyphOrder=None):
@@ -284,6 +671,140 @@ def closeGlyphsOverGSUB(gsub, glyphs):
     gsub.closure_glyphs(subsetter)
 
 
+class SubstitutionGraph:
+    """The substitutions of a GSUB table as a graph from each glyph to the
+    glyphs it can be substituted with, to close many sets of glyphs over the
+    same table without walking all of its lookups for each of them.
+
+    The closures are the same as those of closeGlyphsOverGSUB: only the
+    lookups referenced by the features are followed, and a ligature is only
+    reachable when all its components are. Whether a contextual lookup
+    applies depends on the whole set of glyphs, so these lookups are not
+    part of the graph but are closed over with the FontTools subsetter,
+    alternating with the traversals of the graph until no glyph is added.
+    """
+
+    _simpleSubtables = (
+        otTables.SingleSubst,
+        otTables.MultipleSubst,
+        otTables.AlternateSubst,
+        otTables.LigatureSubst,
+    )
+
+    def __init__(self, gsub):
+        self._gsubRef = weakref.ref(gsub)
+        # glyph name => set of glyph names it can be substituted with
+        self.substitutions = {}
+        # glyph name => list of (components, ligature) it is a component of
+        self.ligatures = {}
+        self.contextualLookups = []
+
+        table = gsub.table
+        if table.ScriptList:
+            featureIndices = table.ScriptList.collect_features()
+        else:
+            featureIndices = []
+        if table.FeatureList:
+            lookupIndices = table.FeatureList.collect_lookups(featureIndices)
+        else:
+            lookupIndices = []
+        if getattr(table, "FeatureVariations", None):
+            lookupIndices += table.FeatureVariations.collect_lookups(featureIndices)
+        if not table.LookupList:
+            return
+        lookups = table.LookupList.Lookup
+        for i in sorted(set(lookupIndices)):
+            if i >= table.LookupList.LookupCount or not lookups[i]:
+                continue
+            subtables = [
+                st.ExtSubTable if isinstance(st, otTables.ExtensionSubst) else st
+                for st in lookups[i].SubTable
+                if st
+            ]
+            if all(isinstance(st, self._simpleSubtables) for st in subtables):
+                for subtable in subtables:
+                    self._addSubtable(subtable)
+            else:
+                self.contextualLookups.append(lookups[i])
+
+    def _addSubtable(self, subtable):
+        substitutions = self.substitutions
+        if isinstance(subtable, otTables.SingleSubst):
+            for glyph, substitute in subtable.mapping.items():
+                substitutions.setdefault(glyph, set()).add(substitute)
+        elif isinstance(subtable, otTables.MultipleSubst):
+            for glyph, sequence in subtable.mapping.items():
+                substitutions.setdefault(glyph, set()).update(sequence)
+        elif isinstance(subtable, otTables.AlternateSubst):
+            for glyph, alternates in subtable.alternates.items():
+                substitutions.setdefault(glyph, set()).update(alternates)
+        else:
+            for glyph, ligatures in subtable.ligatures.items():
+                for ligature in ligatures:
+                    components = (glyph, *ligature.Component)
+                    rule = (components, ligature.LigGlyph)
+                    for component in set(components):
+                        self.ligatures.setdefault(component, []).append(rule)
+
+    def _traverse(self, glyphs, todo):
+        substitutions = self.substitutions
+        ligatures = self.ligatures
+        while todo:
+            glyph = todo.pop()
+            for substitute in substitutions.get(glyph, ()):
+                if substitute not in glyphs:
+                    glyphs.add(substitute)
+                    todo.append(substitute)
+            for components, ligature in ligatures.get(glyph, ()):
+                if ligature not in glyphs and glyphs.issuperset(components):
+                    glyphs.add(ligature)
+                    todo.append(ligature)
+
+    def closeGlyphs(self, glyphs, closedGlyphs=None):
+        """Update the set of glyph names 'glyphs' in-place, adding all the
+        glyphs that can be reached via GSUB substitutions from it.
+
+        'closedGlyphs' is an optional subset of 'glyphs' that is already
+        closed over the GSUB table, e.g. by a previous call: the traversal
+        of the graph then only starts from the other glyphs.
+        """
+        if not glyphs:
+            return
+        if closedGlyphs:
+            todo = list(glyphs - closedGlyphs)
+        else:
+            todo = list(glyphs)
+        while True:
+            self._traverse(glyphs, todo)
+            if not self.contextualLookups:
+                return
+            previousGlyphs = set(glyphs)
+            subsetter = subset.Subsetter()
+            subsetter.glyphs = glyphs
+            subsetter.table = self._gsubRef().table
+            subsetter._doneLookups = {}
+            for lookup in self.contextualLookups:
+                lookup.closure_glyphs(subsetter)
+            todo = list(glyphs - previousGlyphs)
+            if not todo:
+                return
+
+
+_substitutionGraphs = {}
+
+
+def getSubstitutionGraph(gsub):
+    """Return the SubstitutionGraph of the 'gsub' table, which is only built
+    once for all the callers as long as the table exists.
+    """
+    key = id(gsub)
+    graph = _substitutionGraphs.get(key)
+    if graph is None or graph._gsubRef() is not gsub:
+        weakref.finalize(gsub, _substitutionGraphs.pop, key, None)
+        graph = _substitutionGraphs[key] = SubstitutionGraph(gsub)
+    return graph
+
+
 def classifyGlyphs(
     unicodeFunc: Callable[[int], str | bool | list[str] | set[str] | tuple[str] | None],
     cmap: dict[int, str],
@@ -314,24 +835,47 @@ def classifyGlyphs(
             glyphSets.setdefault(key_or_keys, set()).add(glyphName)
 
     if gsub is not None:
+        graph = getSubstitutionGraph(gsub)
         if neutralGlyphs:
-            closeGlyphsOverGSUB(gsub, neutralGlyphs)
+            graph.closeGlyphs(neutralGlyphs)
 
         for glyphs in glyphSets.values():
             s = glyphs | neutralGlyphs
-            closeGlyphsOverGSUB(gsub, s)
+            graph.closeGlyphs(s, closedGlyphs=neutralGlyphs)
             glyphs.update(s - neutralGlyphs)
 
     return glyphSets
 
 
+UnicodeProperties = namedtuple(
+    "UnicodeProperties", ["script", "scriptExtensions", "bidiType"]
+)
+
+
+@lru_cache(maxsize=None)
+def getUnicodeProperties(uv):
+    """Return the UnicodeProperties(script, scriptExtensions, bidiType) of
+    the unicode codepoint 'uv', with the script extensions as a frozenset.
+
+    The result is cached, so that the same codepoints classified by the
+    OS/2 table and by the various feature writers (by script, direction or
+    bidi type) are only looked up once in the Unicode database.
+    """
+    char = chr(uv)
+    return UnicodeProperties(
+        unicodedata.script(char),
+        frozenset(unicodedata.script_extension(char)),
+        unicodedata.bidirectional(char),
+    )
+
+
 def unicodeInScripts(uv, scripts):
     """Check UnicodeData's ScriptExtension property for unicode codepoint
     'uv' and return True if it intersects with the set of 'scripts' provided,
     False if it does not intersect.
     Return None for 'Common' script ('Zyyy').
     """
-    sx = unicodedata.script_extension(chr(uv))
+    sx = getUnicodeProperties(uv).scriptExtensions
     if "Zyyy" in sx:
         return None
     return not sx.isdisjoint(scripts)
@@ -343,7 +887,7 @@ DFLT_SCRIPTS = {"Zyyy", "Zinh"}
 
 
 def unicodeScriptDirection(uv):
-    sc = unicodedata.script(chr(uv))
+    sc = getUnicodeProperties(uv).script
     if sc in DFLT_SCRIPTS:
         return None
     return unicodedata.script_horizontal_direction(sc)
@@ -357,80 +901,81 @@ def calcCodePageRanges(unicodes):
     """
     codepageRanges = set()
 
-    chars = [chr(u) for u in unicodes]
+    # only the presence of a few characters matters, so we look them up in
+    # a set rather than testing each of the font's characters in turn
+    chars = {chr(u) for u in unicodes}
 
     hasAscii = set(range(0x20, 0x7E)).issubset(unicodes)
     hasLineart = "┤" in chars
 
-    for char in chars:
-        if char == "Þ" and hasAscii:
-            codepageRanges.add(0)  # Latin 1
-        elif char == "Ľ" and hasAscii:
-            codepageRanges.add(1)  # Latin 2: Eastern Europe
-            if hasLineart:
-                codepageRanges.add(58)  # Latin 2
-        elif char == "Б":
-            codepageRanges.add(2)  # Cyrillic
-            if "Ѕ" in chars and hasLineart:
-                codepageRanges.add(57)  # IBM Cyrillic
-            if "╜" in chars and hasLineart:
-                codepageRanges.add(49)  # MS-DOS Russian
-        elif char == "Ά":
-            codepageRanges.add(3)  # Greek
-            if hasLineart and "½" in chars:
-                codepageRanges.add(48)  # IBM Greek
-            if hasLineart and "√" in chars:
-                codepageRanges.add(60)  # Greek, former 437 G
-        elif char == "İ" and hasAscii:
-            codepageRanges.add(4)  # Turkish
-            if hasLineart:
-                codepageRanges.add(56)  # IBM turkish
-        elif char == "א":
-            codepageRanges.add(5)  # Hebrew
-            if hasLineart and "√" in chars:
-                codepageRanges.add(53)  # Hebrew
-        elif char == "ر":
-            codepageRanges.add(6)  # Arabic
-            if "√" in chars:
-                codepageRanges.add(51)  # Arabic
-            if hasLineart:
-                codepageRanges.add(61)  # Arabic; ASMO 708
-        elif char == "ŗ" and hasAscii:
-            codepageRanges.add(7)  # Windows Baltic
-            if hasLineart:
-                codepageRanges.add(59)  # MS-DOS Baltic
-        elif char == "₫" and hasAscii:
-            codepageRanges.add(8)  # Vietnamese
-        elif char == "ๅ":
-            codepageRanges.add(16)  # Thai
-        elif char == "エ":
-            codepageRanges.add(17)  # JIS/Japan
-        elif char == "ㄅ":
-            codepageRanges.add(18)  # Chinese: Simplified chars
-        elif char == "ㄱ":
-            codepageRanges.add(19)  # Korean wansung
-        elif char == "央":
-            codepageRanges.add(20)  # Chinese: Traditional chars
-        elif char == "곴":
-            codepageRanges.add(21)  # Korean Johab
-        elif char == "♥" and hasAscii:
-            codepageRanges.add(30)  # OEM Character Set
-        # TODO: Symbol bit has a special meaning (check the spec), we need
-        # to confirm if this is wanted by default.
-        # elif chr(0xF000) <= char <= chr(0xF0FF):
-        #    codepageRanges.add(31)          # Symbol Character Set
-        elif char == "þ" and hasAscii and hasLineart:
-            codepageRanges.add(54)  # MS-DOS Icelandic
-        elif char == "╚" and hasAscii:
-            codepageRanges.add(62)  # WE/Latin 1
-            codepageRanges.add(63)  # US
-        elif hasAscii and hasLineart and "√" in chars:
-            if char == "Å":
-                codepageRanges.add(50)  # MS-DOS Nordic
-            elif char == "é":
-                codepageRanges.add(52)  # MS-DOS Canadian French
-            elif char == "õ":
-                codepageRanges.add(55)  # MS-DOS Portuguese
+    if "Þ" in chars and hasAscii:
+        codepageRanges.add(0)  # Latin 1
+    if "Ľ" in chars and hasAscii:
+        codepageRanges.add(1)  # Latin 2: Eastern Europe
+        if hasLineart:
+            codepageRanges.add(58)  # Latin 2
+    if "Б" in chars:
+        codepageRanges.add(2)  # Cyrillic
+        if "Ѕ" in chars and hasLineart:
+            codepageRanges.add(57)  # IBM Cyrillic
+        if "╜" in chars and hasLineart:
+            codepageRanges.add(49)  # MS-DOS Russian
+    if "Ά" in chars:
+        codepageRanges.add(3)  # Greek
+        if hasLineart and "½" in chars:
+            codepageRanges.add(48)  # IBM Greek
+        if hasLineart and "√" in chars:
+            codepageRanges.add(60)  # Greek, former 437 G
+    if "İ" in chars and hasAscii:
+        codepageRanges.add(4)  # Turkish
+        if hasLineart:
+            codepageRanges.add(56)  # IBM turkish
+    if "א" in chars:
+        codepageRanges.add(5)  # Hebrew
+        if hasLineart and "√" in chars:
+            codepageRanges.add(53)  # Hebrew
+    if "ر" in chars:
+        codepageRanges.add(6)  # Arabic
+        if "√" in chars:
+            codepageRanges.add(51)  # Arabic
+        if hasLineart:
+            codepageRanges.add(61)  # Arabic; ASMO 708
+    if "ŗ" in chars and hasAscii:
+        codepageRanges.add(7)  # Windows Baltic
+        if hasLineart:
+            codepageRanges.add(59)  # MS-DOS Baltic
+    if "₫" in chars and hasAscii:
+        codepageRanges.add(8)  # Vietnamese
+    if "ๅ" in chars:
+        codepageRanges.add(16)  # Thai
+    if "エ" in chars:
+        codepageRanges.add(17)  # JIS/Japan
+    if "ㄅ" in chars:
+        codepageRanges.add(18)  # Chinese: Simplified chars
+    if "ㄱ" in chars:
+        codepageRanges.add(19)  # Korean wansung
+    if "央" in chars:
+        codepageRanges.add(20)  # Chinese: Traditional chars
+    if "곴" in chars:
+        codepageRanges.add(21)  # Korean Johab
+    if "♥" in chars and hasAscii:
+        codepageRanges.add(30)  # OEM Character Set
+    # TODO: Symbol bit has a special meaning (check the spec), we need
+    # to confirm if this is wanted by default.
+    # if any(chr(0xF000) <= char <= chr(0xF0FF) for char in chars):
+    #    codepageRanges.add(31)          # Symbol Character Set
+    if "þ" in chars and hasAscii and hasLineart:
+        codepageRanges.add(54)  # MS-DOS Icelandic
+    if "╚" in chars and hasAscii:
+        codepageRanges.add(62)  # WE/Latin 1
+        codepageRanges.add(63)  # US
+    if hasAscii and hasLineart and "√" in chars:
+        if "Å" in chars:
+            codepageRanges.add(50)  # MS-DOS Nordic
+        if "é" in chars:
+            codepageRanges.add(52)  # MS-DOS Canadian French
+        if "õ" in chars:
+            codepageRanges.add(55)  # MS-DOS Portuguese
 
     if hasAscii and "‰" in chars and "∑" in chars:
         codepageRanges.add(29)  # Macintosh Character Set (US Roman)
@@ -605,3 +1150,126 @@ def getMaxComponentDepth(glyph, glyphSet, maxComponentDepth=0):
         maxComponentDepth = max(maxComponentDepth, componentDepth)
 
     return maxComponentDepth
+
+
+class ComponentGraph:
+    """An index of the component references between the glyphs of a glyph set.
+
+    For each glyph, it keeps the names of the base glyphs of its components
+    (in order, including the ones that are missing from the glyph set), the
+    names of the composite glyphs that use it as a component, and its
+    maximum component depth (see `getMaxComponentDepth`), which is computed
+    once and cached.
+
+    The index doesn't track changes to the glyphs by itself: call `update`
+    with the names of the glyphs whose components were modified, or that
+    were added to or removed from the glyph set.
+    """
+
+    def __init__(self, glyphSet):
+        self.glyphSet = glyphSet
+        self._components = {}
+        self._dependents = {}
+        self._depths = {}
+        for glyphName, glyph in glyphSet.items():
+            self._addGlyph(glyphName, glyph)
+
+    def _addGlyph(self, glyphName, glyph):
+        baseGlyphs = tuple(c.baseGlyph for c in glyph.components)
+        self._components[glyphName] = baseGlyphs
+        for baseGlyph in baseGlyphs:
+            self._dependents.setdefault(baseGlyph, set()).add(glyphName)
+
+    def _removeGlyph(self, glyphName):
+        for baseGlyph in self._components.pop(glyphName, ()):
+            dependents = self._dependents.get(baseGlyph)
+            if dependents is not None:
+                dependents.discard(glyphName)
+                if not dependents:
+                    del self._dependents[baseGlyph]
+
+    def update(self, glyphNames=None):
+        """Re-index the glyphs named in `glyphNames`, as well as the glyphs
+        that were added to or removed from the glyph set since the last
+        update. If `glyphNames` is None, re-index all the glyphs.
+        """
+        glyphSet = self.glyphSet
+        if glyphNames is None:
+            self.__init__(glyphSet)
+            return
+        changed = set(glyphNames)
+        changed.update(glyphSet.keys() - self._components.keys())
+        changed.update(self._components.keys() - glyphSet.keys())
+        if not changed:
+            return
+        # the depths of the composites that use a changed glyph change too
+        self._invalidateDepths(changed)
+        for glyphName in changed:
+            self._removeGlyph(glyphName)
+            if glyphName in glyphSet:
+                self._addGlyph(glyphName, glyphSet[glyphName])
+
+    def _invalidateDepths(self, glyphNames):
+        depths = self._depths
+        stack = [g for g in glyphNames if g in depths or g in self._dependents]
+        seen = set(stack)
+        while stack:
+            glyphName = stack.pop()
+            depths.pop(glyphName, None)
+            for dependent in self._dependents.get(glyphName, ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+
+    def baseGlyphs(self, glyphName):
+        """Return a tuple with the base glyph names of the components of the
+        glyph, in order.
+        """
+        return self._components[glyphName]
+
+    def dependents(self, glyphName, recursive=False):
+        """Return the set of names of the composite glyphs that use the glyph
+        as a component. If `recursive` is True, also include the composites
+        that use those, and so on.
+        """
+        dependents = self._dependents.get(glyphName, ())
+        if not recursive:
+            return set(dependents)
+        result = set()
+        stack = list(dependents)
+        while stack:
+            dependent = stack.pop()
+            if dependent not in result:
+                result.add(dependent)
+                stack.extend(self._dependents.get(dependent, ()))
+        return result
+
+    def depth(self, glyphName):
+        """Return the maximum component depth of the glyph: 0 for glyphs
+        without components, 1 for glyphs whose components only have contours
+        or are missing from the glyph set, and so on.
+        """
+        try:
+            return self._depths[glyphName]
+        except KeyError:
+            pass
+        baseGlyphs = self._components[glyphName]
+        if not baseGlyphs:
+            depth = 0
+        else:
+            depth = 1 + max(
+                (self.depth(g) for g in baseGlyphs if g in self._components),
+                default=0,
+            )
+        self._depths[glyphName] = depth
+        return depth
+
+    def levels(self):
+        """Return a list of lists of glyph names with the same component depth,
+        from the deepest composites to the glyphs without components, in the
+        order of the glyph set within each level.
+        """
+        levels = {}
+        for glyphName in self.glyphSet.keys():
+            levels.setdefault(self.depth(glyphName), []).append(glyphName)
+        return [levels[depth] for depth in sorted(levels, reverse=True)]
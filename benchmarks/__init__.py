@@ -0,0 +1,21 @@
+"""Benchmarks of the ufo2ft compilation pipeline.
+
+Each benchmark times one stage of the pipeline (a pre-processor, an outline
+compiler, the feature compiler with a given feature writer, the
+post-processor) or a whole compile function, on the fonts in ``tests/data``
+and on synthetic fonts generated by `benchmarks.corpus`, whose size and
+complexity are configurable. All the inputs can also be scaled up, to see how
+each stage behaves on larger fonts.
+
+Run the suite from the root of the repository, save the results as a baseline,
+and compare later runs against it:
+
+    $ python -m benchmarks run --output baseline.json
+    $ python -m benchmarks run --output current.json
+    $ python -m benchmarks compare baseline.json current.json
+
+The ``compare`` command exits with status 1 if any benchmark got slower than
+the baseline by more than the ``--threshold`` (10% by default). Baselines are
+specific to the machine they were recorded on. See ``python -m benchmarks
+--help`` for all the options.
+"""
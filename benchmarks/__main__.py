@@ -0,0 +1,155 @@
+import argparse
+import logging
+import sys
+
+from .runner import (
+    compareResults,
+    formatComparison,
+    loadResults,
+    runBenchmarks,
+    saveResults,
+    selectBenchmarks,
+)
+
+
+def _addRunOptions(parser):
+    parser.add_argument(
+        "-k",
+        "--select",
+        metavar="PATTERN",
+        action="append",
+        help="only run the benchmarks whose name matches the glob pattern "
+        "(can be repeated)",
+    )
+    parser.add_argument(
+        "-s",
+        "--scale",
+        type=int,
+        default=1,
+        help="add SCALE - 1 copies of all the glyphs of the input fonts "
+        "(default: 1)",
+    )
+    parser.add_argument(
+        "--glyphs",
+        type=int,
+        default=1000,
+        help="number of base glyphs of the synthetic fonts (default: 1000)",
+    )
+    parser.add_argument(
+        "--masters",
+        type=int,
+        default=2,
+        help="number of masters of the synthetic designspace (default: 2)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="seed of the synthetic fonts generator (default: 0)",
+    )
+    parser.add_argument(
+        "-r",
+        "--rounds",
+        type=int,
+        default=5,
+        help="number of timed runs of each benchmark (default: 5)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="number of untimed runs before the timed ones (default: 1)",
+    )
+    parser.add_argument(
+        "--ufo-module",
+        choices=["ufoLib2", "defcon"],
+        default="ufoLib2",
+        help="the library used to load the UFOs (default: ufoLib2)",
+    )
+
+
+def _run(options):
+    names = selectBenchmarks(options.select)
+    if not names:
+        sys.exit("No benchmarks selected")
+    return runBenchmarks(
+        names,
+        ufoModule=options.ufo_module,
+        scale=options.scale,
+        synthetic=dict(
+            glyphs=options.glyphs, masters=options.masters, seed=options.seed
+        ),
+        rounds=options.rounds,
+        warmup=options.warmup,
+        log=sys.stderr,
+    )
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    runParser = subparsers.add_parser("run", help="run the benchmarks")
+    _addRunOptions(runParser)
+    runParser.add_argument(
+        "-o", "--output", metavar="JSON", help="save the results to this file"
+    )
+
+    compareParser = subparsers.add_parser(
+        "compare",
+        help="compare results with a baseline; exits with status 1 if any "
+        "benchmark got slower",
+        description="Compare the CURRENT results with the BASELINE results. If "
+        "CURRENT is omitted, run the benchmarks with the same input options as "
+        "the baseline.",
+    )
+    compareParser.add_argument("baseline", metavar="BASELINE")
+    compareParser.add_argument("current", metavar="CURRENT", nargs="?")
+    compareParser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown above which a benchmark is reported as a "
+        "regression (default: 0.1)",
+    )
+    compareParser.add_argument(
+        "--stat",
+        choices=["min", "median", "mean"],
+        default="min",
+        help="the statistic of the times to compare (default: min)",
+    )
+    _addRunOptions(compareParser)
+
+    options = parser.parse_args(args)
+    logging.basicConfig(level=logging.WARNING)
+
+    if options.command == "run":
+        results = _run(options)
+        if options.output:
+            saveResults(results, options.output)
+        return
+
+    baseline = loadResults(options.baseline)
+    if options.current:
+        current = loadResults(options.current)
+    else:
+        metadata = baseline["metadata"]
+        options.scale = metadata["scale"]
+        options.ufo_module = metadata["ufoModule"]
+        for key, value in metadata.get("synthetic", {}).items():
+            setattr(options, key, value)
+        if not options.select:
+            options.select = list(baseline["benchmarks"])
+        current = _run(options)
+
+    comparison = compareResults(
+        baseline, current, threshold=options.threshold, stat=options.stat
+    )
+    print(formatComparison(comparison))
+    if any(status == "slower" for *_, status in comparison):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""Generate synthetic UFO fonts and designspaces of any size.
+
+The fonts in tests/data are tiny; the fonts built here can have tens of
+thousands of glyphs, with contours of configurable complexity, nested
+components, anchors, kerning groups and pairs, and color layers, to exercise
+the scaling behaviour of the filters, feature writers and compilers.
+
+The output only depends on the arguments: the same *seed* always gives the
+same fonts. The masters of a designspace are interpolation compatible.
+
+    >>> font = makeFont(glyphs=1000, seed=1)
+    >>> doc = makeDesignSpace(masters=3, glyphs=1000, seed=1)
+
+The glyphs are, in order:
+
+- ".notdef" and "space";
+- the base glyphs, with outlines, a Unicode value and the *anchors*;
+- the mark glyphs, one for each anchor name, with the "_" anchors to attach
+  to the base glyphs;
+- the composite glyphs, at each level of component nesting up to
+  *componentDepth*: each one is made of a glyph from the level below and a
+  mark. Their number is a fraction (*compositeRatio*) of the base glyphs.
+"""
+
+import math
+import random
+
+from fontTools import designspaceLib
+
+from ufo2ft.constants import (
+    COLOR_LAYER_MAPPING_KEY,
+    COLOR_PALETTES_KEY,
+    OPENTYPE_CATEGORIES_KEY,
+)
+
+ANCHOR_NAMES = ["top", "bottom", "center", "topright", "bottomleft", "ogonek"]
+
+UNITS_PER_EM = 1000
+ADVANCE_WIDTH = 600
+
+
+def makeFont(
+    glyphs=100,
+    contours=2,
+    points=8,
+    curveRatio=0.5,
+    componentDepth=1,
+    compositeRatio=0.5,
+    anchors=2,
+    kerningDensity=0.1,
+    kerningGroupSize=10,
+    colorLayers=0,
+    unicodeStart=0x4E00,
+    seed=0,
+    master=0,
+    ufoModule="ufoLib2",
+):
+    """Return a new synthetic font.
+
+    *glyphs* (int) is the number of base glyphs, each with *contours* contours
+      of *points* on-curve points; a *curveRatio* fraction of the segments are
+      cubic curves, the others lines.
+    *componentDepth* (int) is the maximum nesting depth of the components.
+    *compositeRatio* (float) is the number of composite glyphs at each level
+      of nesting, relative to the number of base glyphs.
+    *anchors* (int) is the number of anchors of each base glyph, and the
+      number of mark glyphs.
+    *kerningDensity* (float) is the fraction of all the possible pairs of
+      kerning groups that have a kerning value. The base glyphs are assigned
+      to groups of *kerningGroupSize* glyphs on each side; about one pair of
+      glyphs per group pair is kerned as an exception.
+    *colorLayers* (int) is the number of color layers of each base glyph; if
+      not zero, the font has a color palette and layer mapping for the
+      ExplodeColorLayerGlyphsFilter.
+    *unicodeStart* (int) is the Unicode value of the first base glyph; the
+      others follow. The marks are mapped to U+0300 onwards.
+    *seed* (int) seeds the random generator for the glyph structure,
+      coordinates and kerning values.
+    *master* (int) selects the variation of the coordinates and kerning
+      values: the fonts made with different masters and the same other
+      arguments are interpolation compatible.
+    *ufoModule* (str) is "ufoLib2" or "defcon".
+    """
+    font = _newFont(ufoModule)
+    info = font.info
+    info.familyName = "Synthetic"
+    info.styleName = f"Master{master}"
+    info.unitsPerEm = UNITS_PER_EM
+    info.ascender = 800
+    info.descender = -200
+    info.xHeight = 500
+    info.capHeight = 700
+
+    # The structure (glyph names, contours, components, kerning pairs) only
+    # depends on the seed; the coordinates and values also depend on master.
+    structure = random.Random(seed)
+    variation = random.Random(f"{seed}-{master}")
+    weight = 1 + 0.2 * master
+
+    glyphOrder = [".notdef", "space"]
+    categories = {}
+    font.newGlyph(".notdef")
+    _drawRectangle(font[".notdef"], 50, 0, 450, 700)
+    font[".notdef"].width = 500
+    font.newGlyph("space")
+    font["space"].width = 250
+    font["space"].unicodes = [0x20]
+
+    anchorNames = ANCHOR_NAMES[:anchors] + [
+        f"anchor{i}" for i in range(len(ANCHOR_NAMES), anchors)
+    ]
+
+    baseGlyphs = [f"uni{unicodeStart + i:04X}" for i in range(glyphs)]
+    for i, name in enumerate(baseGlyphs):
+        font.newGlyph(name)
+        glyph = font[name]
+        glyph.width = ADVANCE_WIDTH + round(100 * (weight - 1))
+        glyph.unicodes = [unicodeStart + i]
+        _drawContours(glyph, structure, variation, contours, points, curveRatio, weight)
+        positions = _anchorPositions(len(anchorNames))
+        for anchorName, (x, y) in zip(anchorNames, positions):
+            glyph.appendAnchor({"name": anchorName, "x": x, "y": y})
+        categories[name] = "base"
+    glyphOrder.extend(baseGlyphs)
+
+    markGlyphs = []
+    for i, anchorName in enumerate(anchorNames):
+        name = f"uni{0x0300 + i:04X}"
+        font.newGlyph(name)
+        glyph = font[name]
+        glyph.width = 0
+        glyph.unicodes = [0x0300 + i]
+        x, y = _anchorPositions(len(anchorNames))[i]
+        _drawRectangle(glyph, x - 40, y, x + 40, y + round(60 * weight))
+        glyph.appendAnchor({"name": "_" + anchorName, "x": x, "y": y})
+        categories[name] = "mark"
+        markGlyphs.append(name)
+    glyphOrder.extend(markGlyphs)
+
+    previousLevel = baseGlyphs
+    for depth in range(1, componentDepth + 1):
+        if not markGlyphs or not previousLevel:
+            break
+        level = []
+        for i in range(round(glyphs * compositeRatio)):
+            # nest a glyph of the level below
+            nested = previousLevel[i % len(previousLevel)]
+            name = f"{nested.split('.')[0]}.comp{depth}.{i}"
+            mark = structure.choice(markGlyphs)
+            font.newGlyph(name)
+            glyph = font[name]
+            glyph.width = font[nested].width
+            pen = glyph.getPointPen()
+            pen.addComponent(nested, (1, 0, 0, 1, 0, 0))
+            pen.addComponent(mark, (1, 0, 0, 1, structure.randint(-20, 20), 0))
+            categories[name] = "base"
+            level.append(name)
+        glyphOrder.extend(level)
+        previousLevel = level
+
+    _addKerning(
+        font, baseGlyphs, structure, variation, kerningDensity, kerningGroupSize
+    )
+
+    if colorLayers:
+        _addColorLayers(font, baseGlyphs, colorLayers, structure, variation, weight)
+
+    font.lib["public.glyphOrder"] = glyphOrder
+    font.lib[OPENTYPE_CATEGORIES_KEY] = categories
+    return font
+
+
+def makeDesignSpace(masters=2, ufoModule="ufoLib2", **kwargs):
+    """Return a DesignSpaceDocument with a weight axis and *masters* (>= 2)
+    compatible master fonts made with `makeFont`, evenly spaced along the
+    axis; the first one is the default. The other keyword arguments are
+    passed to `makeFont`.
+    """
+    if masters < 2:
+        raise ValueError(f"A designspace needs at least 2 masters: {masters}")
+    doc = designspaceLib.DesignSpaceDocument()
+    doc.addAxisDescriptor(
+        tag="wght", name="Weight", minimum=100, default=100, maximum=900
+    )
+    for i in range(masters):
+        font = makeFont(master=i, ufoModule=ufoModule, **kwargs)
+        weight = 100 + round(800 * i / (masters - 1))
+        doc.addSourceDescriptor(
+            name=f"Synthetic Master{i}",
+            familyName=font.info.familyName,
+            styleName=font.info.styleName,
+            filename=f"Synthetic-Master{i}.ufo",
+            location={"Weight": weight},
+            font=font,
+        )
+    return doc
+
+
+def _newFont(ufoModule):
+    if ufoModule == "ufoLib2":
+        import ufoLib2
+
+        return ufoLib2.Font()
+    elif ufoModule == "defcon":
+        import defcon
+
+        return defcon.Font()
+    raise ValueError(f"Unknown UFO module: {ufoModule!r}")
+
+
+def _drawRectangle(glyph, xMin, yMin, xMax, yMax):
+    pen = glyph.getPointPen()
+    pen.beginPath()
+    for pt in ((xMin, yMin), (xMin, yMax), (xMax, yMax), (xMax, yMin)):
+        pen.addPoint(pt, "line")
+    pen.endPath()
+
+
+def _drawContours(glyph, structure, variation, contours, points, curveRatio, weight):
+    # Draw star-shaped contours, which don't intersect themselves, around
+    # centers spread over the glyph box. The angles of the points and the
+    # segment types are part of the structure; the radii vary by master.
+    pen = glyph.getPointPen()
+    for c in range(contours):
+        cx = 100 + (c * 397) % 400
+        cy = 100 + (c * 211) % 500
+        angles = sorted(structure.uniform(0, 2 * math.pi) for _ in range(points))
+        isCurve = [structure.random() < curveRatio for _ in range(points)]
+        radii = [variation.uniform(40, 100) * weight for _ in range(points)]
+        pen.beginPath()
+        for i in range(points):
+            if isCurve[i]:
+                # two off-curve points on the way from the previous point
+                previousAngle = angles[i - 1] - (2 * math.pi if i == 0 else 0)
+                for t in (1 / 3, 2 / 3):
+                    angle = previousAngle + t * (angles[i] - previousAngle)
+                    radius = radii[i - 1] + t * (radii[i] - radii[i - 1])
+                    pen.addPoint(_polar(cx, cy, radius, angle))
+            pen.addPoint(
+                _polar(cx, cy, radii[i], angles[i]), "curve" if isCurve[i] else "line"
+            )
+        pen.endPath()
+
+
+def _polar(cx, cy, radius, angle):
+    return (round(cx + radius * math.cos(angle)), round(cy + radius * math.sin(angle)))
+
+
+def _anchorPositions(count):
+    return [
+        (ADVANCE_WIDTH // 2 + 50 * (i // 2), 700 if i % 2 == 0 else -50)
+        for i in range(count)
+    ]
+
+
+def _addKerning(font, glyphNames, structure, variation, density, groupSize):
+    if not density or not glyphNames:
+        return
+    groups = {}
+    for side in (1, 2):
+        shuffled = list(glyphNames)
+        structure.shuffle(shuffled)
+        for i in range(0, len(shuffled), groupSize):
+            groups[f"public.kern{side}.g{i // groupSize}"] = shuffled[i : i + groupSize]
+    font.groups.update(groups)
+
+    firstGroups = sorted(g for g in groups if g.startswith("public.kern1."))
+    secondGroups = sorted(g for g in groups if g.startswith("public.kern2."))
+    kerning = {}
+    for first in firstGroups:
+        for second in secondGroups:
+            if structure.random() < density:
+                kerning[first, second] = variation.randint(-100, 50)
+                # a glyph-to-glyph exception
+                left = structure.choice(groups[first])
+                right = structure.choice(groups[second])
+                kerning[left, right] = variation.randint(-100, 50)
+    font.kerning.update(kerning)
+
+
+def _addColorLayers(font, glyphNames, colorLayers, structure, variation, weight):
+    palette = [
+        [round(variation.random(), 2) for _ in range(3)] + [1]
+        for _ in range(colorLayers)
+    ]
+    font.lib[COLOR_PALETTES_KEY] = [palette]
+    mapping = []
+    for i in range(colorLayers):
+        layerName = f"color{i + 1}"
+        layer = font.newLayer(layerName)
+        for name in glyphNames:
+            layer.newGlyph(name)
+            glyph = layer[name]
+            glyph.width = font[name].width
+            _drawContours(glyph, structure, variation, 1, 4, 0, weight)
+        mapping.append([layerName, i])
+    font.lib[COLOR_LAYER_MAPPING_KEY] = mapping
@@ -0,0 +1,162 @@
+"""Run the benchmarks, and compare the results with a baseline."""
+
+import fnmatch
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+
+import fontTools
+
+import ufo2ft
+
+from .suite import BENCHMARKS, Inputs
+
+
+def selectBenchmarks(patterns=None):
+    """Return the names of the benchmarks matching any of the fnmatch-style
+    *patterns*, or all of them if *patterns* is empty.
+    """
+    names = list(BENCHMARKS)
+    if not patterns:
+        return names
+    return [n for n in names if any(fnmatch.fnmatchcase(n, p) for p in patterns)]
+
+
+def timeBenchmark(func, inputs, rounds=5, warmup=1):
+    """Return the list of wall times, in seconds, of *rounds* timed runs of the
+    benchmark *func*, after *warmup* untimed runs.
+    """
+    times = []
+    for i in range(warmup + rounds):
+        target = func(inputs)
+        gc.collect()
+        start = time.perf_counter()
+        target()
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            times.append(elapsed)
+    return times
+
+
+def runBenchmarks(
+    names,
+    ufoModule="ufoLib2",
+    scale=1,
+    synthetic=None,
+    rounds=5,
+    warmup=1,
+    log=None,
+):
+    """Run the benchmarks with the given *names*, and return the results as
+    a JSON-compatible dict.
+
+    *ufoModule*, *scale* and *synthetic* are passed on to `Inputs`. The
+    results contain the metadata of the run (versions, platform and options)
+    and, for each benchmark, the statistics of its wall times. If *log* is a
+    file, a line is written to it as each benchmark completes.
+    """
+    inputs = Inputs(ufoModule=ufoModule, scale=scale, synthetic=synthetic)
+    benchmarks = {}
+    for name in names:
+        times = timeBenchmark(BENCHMARKS[name], inputs, rounds=rounds, warmup=warmup)
+        benchmarks[name] = {
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.mean(times),
+            "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+            "times": times,
+        }
+        if log is not None:
+            log.write(f"{name}: {_formatTime(min(times))}\n")
+    return {
+        "metadata": {
+            "ufo2ft": ufo2ft.__version__,
+            "fontTools": fontTools.version,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "ufoModule": ufoModule,
+            "scale": scale,
+            "synthetic": inputs.synthetic,
+            "rounds": rounds,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compareResults(baseline, current, threshold=0.1, stat="min"):
+    """Compare the *current* results with the *baseline* results, and return
+    a list of (name, baselineTime, currentTime, ratio, status) tuples.
+
+    The ratio is the current time divided by the baseline time for the given
+    statistic. The status is "slower" if the ratio is greater than 1 plus the
+    *threshold*, "faster" if it is less than 1 minus the threshold, "same"
+    otherwise, and "added" or "removed" for the benchmarks that are only in
+    one of the results (with None for the missing time and the ratio).
+    """
+    baselineBenchmarks = baseline["benchmarks"]
+    currentBenchmarks = current["benchmarks"]
+    comparison = []
+    for name in baselineBenchmarks:
+        if name not in currentBenchmarks:
+            old = baselineBenchmarks[name][stat]
+            comparison.append((name, old, None, None, "removed"))
+            continue
+        old = baselineBenchmarks[name][stat]
+        new = currentBenchmarks[name][stat]
+        ratio = new / old if old else float("inf")
+        if ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 - threshold:
+            status = "faster"
+        else:
+            status = "same"
+        comparison.append((name, old, new, ratio, status))
+    for name in currentBenchmarks:
+        if name not in baselineBenchmarks:
+            new = currentBenchmarks[name][stat]
+            comparison.append((name, None, new, None, "added"))
+    return comparison
+
+
+def formatComparison(comparison):
+    """Return the comparison as a text table."""
+    rows = [("benchmark", "baseline", "current", "ratio", "")]
+    for name, old, new, ratio, status in comparison:
+        rows.append(
+            (
+                name,
+                _formatTime(old),
+                _formatTime(new),
+                f"{ratio:.2f}x" if ratio is not None else "-",
+                status,
+            )
+        )
+    widths = [max(len(row[i]) for row in rows) for i in range(4)]
+    lines = []
+    for row in rows:
+        cells = [row[0].ljust(widths[0])]
+        cells += [row[i].rjust(widths[i]) for i in range(1, 4)]
+        cells.append(row[4])
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines)
+
+
+def _formatTime(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1:
+        return f"{seconds * 1000:.2f} ms"
+    return f"{seconds:.3f} s"
+
+
+def loadResults(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def saveResults(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
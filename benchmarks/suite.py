@@ -0,0 +1,322 @@
+"""The benchmark inputs and definitions.
+
+A benchmark is a function that takes an `Inputs` object and the name of an
+input source, and returns the callable to time. It is called again before
+each timed round, so it must build there (untimed) whatever the timed
+callable modifies.
+
+The sources are the fonts from tests/data ("TestFont", the "NestedComponents"
+masters and the "LayerFont" designspace), and "Synthetic" fonts and
+designspaces made with `benchmarks.corpus`.
+"""
+
+import copy
+import functools
+import os
+
+from fontTools import designspaceLib
+
+from ufo2ft import compileVariableTTFs
+from ufo2ft.featureCompiler import FeatureCompiler
+from ufo2ft.featureWriters import KernFeatureWriter, MarkFeatureWriter
+from ufo2ft.outlineCompiler import OutlineOTFCompiler, OutlineTTFCompiler
+from ufo2ft.postProcessor import PostProcessor
+from ufo2ft.preProcessor import (
+    OTFPreProcessor,
+    TTFInterpolatablePreProcessor,
+    TTFPreProcessor,
+)
+
+from .corpus import makeDesignSpace, makeFont
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tests", "data")
+
+BENCHMARKS = {}
+
+
+def benchmark(name, *sources):
+    """Register the decorated function as a benchmark for each of the
+    *sources*, named "<name>_<source>".
+    """
+
+    def decorator(func):
+        for source in sources:
+            BENCHMARKS[f"{name}_{source}"] = functools.partial(func, source=source)
+        return func
+
+    return decorator
+
+
+def scaleFont(font, scale):
+    """Add `scale - 1` copies of all the glyphs of *font*, in all its layers,
+    named like the original glyphs with a ".1", ".2", etc. suffix.
+
+    The components of the copies refer to the copies of their base glyphs,
+    the copies are added to the same kerning groups as their original glyph
+    and the kerning pairs between glyphs are duplicated for each copy. The
+    copies have no Unicode values.
+    """
+    if scale <= 1:
+        return font
+    suffixes = [f".{i}" for i in range(1, scale)]
+
+    for layer in font.layers:
+        originals = [layer[name] for name in sorted(layer.keys())]
+        for suffix in suffixes:
+            for glyph in originals:
+                layer.newGlyph(glyph.name + suffix)
+                newGlyph = layer[glyph.name + suffix]
+                newGlyph.width = glyph.width
+                newGlyph.height = glyph.height
+                pen = _SuffixComponentsPointPen(newGlyph.getPointPen(), suffix)
+                glyph.drawPoints(pen)
+                for anchor in glyph.anchors:
+                    newGlyph.appendAnchor(
+                        {"name": anchor.name, "x": anchor.x, "y": anchor.y}
+                    )
+
+    for groupName, members in list(font.groups.items()):
+        font.groups[groupName] = list(members) + [
+            name + suffix for suffix in suffixes for name in members
+        ]
+
+    for (first, second), value in list(font.kerning.items()):
+        for suffix in suffixes:
+            pair = (
+                first if first in font.groups else first + suffix,
+                second if second in font.groups else second + suffix,
+            )
+            font.kerning[pair] = value
+
+    return font
+
+
+class _SuffixComponentsPointPen:
+    def __init__(self, pen, suffix):
+        self.pen = pen
+        self.suffix = suffix
+
+    def beginPath(self, identifier=None, **kwargs):
+        self.pen.beginPath()
+
+    def endPath(self):
+        self.pen.endPath()
+
+    def addPoint(self, pt, segmentType=None, smooth=False, name=None, **kwargs):
+        self.pen.addPoint(pt, segmentType=segmentType, smooth=smooth, name=name)
+
+    def addComponent(self, baseGlyphName, transformation, identifier=None, **kwargs):
+        self.pen.addComponent(baseGlyphName + self.suffix, transformation)
+
+
+class Inputs:
+    """Load or generate the input fonts with the given *ufoModule* ("ufoLib2"
+    or "defcon"), and scale them up by *scale* (see `scaleFont`).
+
+    The *synthetic* dict holds the keyword arguments of the `makeFont` and
+    `makeDesignSpace` functions for the "Synthetic" source.
+
+    Each font is loaded and scaled once; the benchmarks must not modify them.
+    """
+
+    def __init__(self, ufoModule="ufoLib2", scale=1, synthetic=None):
+        self.ufoModule = ufoModule
+        self.scale = scale
+        self.synthetic = dict(synthetic or {})
+        self._cache = {}
+
+    def cached(self, key, factory):
+        """Return the value cached under *key*, calling *factory* to build it
+        the first time.
+        """
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+    def font(self, source):
+        """Return the "TestFont" or "Synthetic" font."""
+        if source == "Synthetic":
+            return self.cached(
+                ("font", source),
+                lambda: scaleFont(
+                    makeFont(ufoModule=self.ufoModule, **self._fontOptions()),
+                    self.scale,
+                ),
+            )
+        return self._dataFont(f"{source}.ufo")
+
+    def masters(self, source):
+        """Return the list of "NestedComponents" or "Synthetic" master fonts."""
+        if source == "Synthetic":
+            return [s.font for s in self.designspace(source).sources]
+        return [
+            self._dataFont(f"{source}-Regular.ufo"),
+            self._dataFont(f"{source}-Bold.ufo"),
+        ]
+
+    def designspace(self, source):
+        """Return the "LayerFont" or "Synthetic" designspace."""
+        if source == "Synthetic":
+            return self.cached(("designspace", source), self._syntheticDesignSpace)
+        return self._layerFontDesignSpace()
+
+    def _fontOptions(self):
+        options = dict(self.synthetic)
+        options.pop("masters", None)
+        return options
+
+    def _syntheticDesignSpace(self):
+        doc = makeDesignSpace(ufoModule=self.ufoModule, **self.synthetic)
+        for source in doc.sources:
+            scaleFont(source.font, self.scale)
+        return doc
+
+    def _dataFont(self, fileName):
+        def load():
+            path = os.path.join(DATA_DIR, fileName)
+            if self.ufoModule == "ufoLib2":
+                import ufoLib2
+
+                font = ufoLib2.Font.open(path)
+            elif self.ufoModule == "defcon":
+                import defcon
+
+                font = defcon.Font(path)
+            else:
+                raise ValueError(f"Unknown UFO module: {self.ufoModule!r}")
+            return scaleFont(font, self.scale)
+
+        return self.cached(("font", fileName), load)
+
+    def _layerFontDesignSpace(self):
+        # two master UFOs and a sparse intermediate master layer, like the
+        # tests' designspace fixture
+        regular = self._dataFont("LayerFont-Regular.ufo")
+        bold = self._dataFont("LayerFont-Bold.ufo")
+        doc = designspaceLib.DesignSpaceDocument()
+        doc.addAxisDescriptor(
+            tag="wght", name="Weight", minimum=350, default=350, maximum=625
+        )
+        doc.addSourceDescriptor(
+            name="Layer Font Regular",
+            familyName="Layer Font",
+            styleName="Regular",
+            filename="LayerFont-Regular.ufo",
+            location={"Weight": 350},
+            font=regular,
+        )
+        doc.addSourceDescriptor(
+            name="Layer Font Medium",
+            familyName="Layer Font",
+            styleName="Medium",
+            filename="LayerFont-Regular.ufo",
+            layerName="Medium",
+            location={"Weight": 450},
+            font=regular,
+        )
+        doc.addSourceDescriptor(
+            name="Layer Font Bold",
+            familyName="Layer Font",
+            styleName="Bold",
+            filename="LayerFont-Bold.ufo",
+            location={"Weight": 625},
+            font=bold,
+        )
+        return doc
+
+
+@benchmark("OTFPreProcessor", "TestFont", "Synthetic")
+def preProcessOTF(inputs, source):
+    ufo = inputs.font(source)
+    return lambda: OTFPreProcessor(ufo, removeOverlaps=True).process()
+
+
+@benchmark("TTFPreProcessor", "TestFont", "Synthetic")
+def preProcessTTF(inputs, source):
+    ufo = inputs.font(source)
+    return lambda: TTFPreProcessor(ufo).process()
+
+
+@benchmark("TTFInterpolatablePreProcessor", "NestedComponents", "Synthetic")
+def preProcessInterpolatableTTFs(inputs, source):
+    ufos = inputs.masters(source)
+    return lambda: TTFInterpolatablePreProcessor(ufos, flattenComponents=True).process()
+
+
+@benchmark("OutlineTTFCompiler", "TestFont", "Synthetic")
+def compileOutlinesTTF(inputs, source):
+    ufo = inputs.font(source)
+    glyphSet = _preProcessed(inputs, source, TTFPreProcessor)
+    return lambda: OutlineTTFCompiler(ufo, glyphSet=glyphSet).compile()
+
+
+@benchmark("OutlineOTFCompiler", "TestFont", "Synthetic")
+def compileOutlinesOTF(inputs, source):
+    ufo = inputs.font(source)
+    glyphSet = _preProcessed(inputs, source, OTFPreProcessor)
+    return lambda: OutlineOTFCompiler(ufo, glyphSet=glyphSet).compile()
+
+
+@benchmark("FeatureCompiler_KernFeatureWriter", "TestFont", "Synthetic")
+def compileKernFeature(inputs, source):
+    return _featureCompiler(inputs, source, KernFeatureWriter)
+
+
+@benchmark("FeatureCompiler_MarkFeatureWriter", "TestFont", "Synthetic")
+def compileMarkFeature(inputs, source):
+    return _featureCompiler(inputs, source, MarkFeatureWriter)
+
+
+@benchmark("PostProcessor_TTF", "TestFont", "Synthetic")
+def postProcessTTF(inputs, source):
+    ufo = inputs.font(source)
+    otf = _compiledFont(inputs, source, TTFPreProcessor, OutlineTTFCompiler)
+    return lambda: PostProcessor(otf, ufo).process(useProductionNames=True)
+
+
+@benchmark("PostProcessor_OTF", "TestFont", "Synthetic")
+def postProcessOTF(inputs, source):
+    ufo = inputs.font(source)
+    otf = _compiledFont(inputs, source, OTFPreProcessor, OutlineOTFCompiler)
+    return lambda: PostProcessor(otf, ufo).process(
+        useProductionNames=True, optimizeCFF=True
+    )
+
+
+@benchmark("compileVariableTTFs", "LayerFont", "Synthetic")
+def compileVariableFonts(inputs, source):
+    designspace = inputs.designspace(source)
+    return lambda: compileVariableTTFs(designspace)
+
+
+def _preProcessed(inputs, source, preProcessorClass):
+    # the outline compilers don't modify the pre-processed glyph sets
+    return inputs.cached(
+        ("glyphSet", source, preProcessorClass),
+        lambda: preProcessorClass(inputs.font(source)).process(),
+    )
+
+
+def _compiledFont(inputs, source, preProcessorClass, outlineCompilerClass):
+    # compile the font once, and return a copy each time as the post-processor
+    # and the feature compiler modify it
+    def compileFont():
+        ufo = inputs.font(source)
+        glyphSet = _preProcessed(inputs, source, preProcessorClass)
+        otf = outlineCompilerClass(ufo, glyphSet=glyphSet).compile()
+        FeatureCompiler(ufo, otf, glyphSet=glyphSet).compile()
+        return otf
+
+    otf = inputs.cached(("ttFont", source, outlineCompilerClass), compileFont)
+    return copy.deepcopy(otf)
+
+
+def _featureCompiler(inputs, source, featureWriterClass):
+    ufo = inputs.font(source)
+    otf = _compiledFont(inputs, source, TTFPreProcessor, OutlineTTFCompiler)
+    for tag in ("GDEF", "GSUB", "GPOS"):
+        if tag in otf:
+            del otf[tag]
+    return lambda: FeatureCompiler(
+        ufo, otf, featureWriters=[featureWriterClass]
+    ).compile()
@@ -38,6 +38,8 @@ setup(
         "pathops": ["skia-pathops>=0.5.1"],
         "cffsubr": [],  # keep empty for backward compat
         "compreffor": ["compreffor>=0.4.6"],
+        # faster geometry kernels for the compact glyphs (see ufo2ft.geometry)
+        "numpy": ["numpy"],
     },
     python_requires=">=3.7",
     classifiers=[
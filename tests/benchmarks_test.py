@@ -0,0 +1,155 @@
+import json
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.corpus import makeDesignSpace, makeFont
+from benchmarks.runner import compareResults, runBenchmarks, selectBenchmarks
+from benchmarks.suite import BENCHMARKS, Inputs, scaleFont
+
+from .conftest import getpath
+
+
+def _results(**times):
+    return {
+        "metadata": {"scale": 1, "ufoModule": "ufoLib2"},
+        "benchmarks": {name: {"min": t} for name, t in times.items()},
+    }
+
+
+class BenchmarksTest:
+    def test_scaleFont(self, FontClass):
+        ufo = FontClass(getpath("NestedComponents-Regular.ufo"))
+        ufo.groups["public.kern1.a"] = ["a"]
+        ufo.kerning["public.kern1.a", "b"] = -10
+        numGlyphs = len(ufo)
+
+        scaleFont(ufo, 3)
+
+        assert len(ufo) == numGlyphs * 3
+        assert [c.baseGlyph for c in ufo["e.2"].components] == [
+            c.baseGlyph + ".2" for c in ufo["e"].components
+        ]
+        assert ufo["e.1"].width == ufo["e"].width
+        assert not ufo["e.1"].unicodes
+        assert ufo.groups["public.kern1.a"] == ["a", "a.1", "a.2"]
+        assert ufo.kerning["public.kern1.a", "b.2"] == -10
+
+    def test_selectBenchmarks(self):
+        assert selectBenchmarks() == list(BENCHMARKS)
+        assert selectBenchmarks(["PostProcessor_*_TestFont"]) == [
+            "PostProcessor_TTF_TestFont",
+            "PostProcessor_OTF_TestFont",
+        ]
+
+    @pytest.mark.parametrize("name", list(BENCHMARKS))
+    def test_benchmarks(self, name):
+        # all the benchmarks can run more than once on the same inputs
+        inputs = Inputs(scale=2, synthetic={"glyphs": 10, "masters": 3})
+        for _ in range(2):
+            BENCHMARKS[name](inputs)()
+
+    def test_runBenchmarks(self):
+        results = runBenchmarks(
+            ["TTFPreProcessor_TestFont"], scale=2, rounds=2, warmup=0
+        )
+        assert results["metadata"]["scale"] == 2
+        result = results["benchmarks"]["TTFPreProcessor_TestFont"]
+        assert len(result["times"]) == 2
+        assert result["min"] <= result["median"]
+        json.dumps(results)
+
+    def test_compareResults(self):
+        baseline = _results(a=1.0, b=1.0, c=1.0, d=1.0)
+        current = _results(a=1.05, b=1.5, c=0.5, e=1.0)
+        assert compareResults(baseline, current, threshold=0.1) == [
+            ("a", 1.0, 1.05, 1.05, "same"),
+            ("b", 1.0, 1.5, 1.5, "slower"),
+            ("c", 1.0, 0.5, 0.5, "faster"),
+            ("d", 1.0, None, None, "removed"),
+            ("e", None, 1.0, None, "added"),
+        ]
+
+    def test_compare_command(self, tmp_path, capsys):
+        baselinePath = tmp_path / "baseline.json"
+        currentPath = tmp_path / "current.json"
+        baselinePath.write_text(json.dumps(_results(a=1.0, b=1.0)))
+
+        currentPath.write_text(json.dumps(_results(a=1.0, b=1.05)))
+        main(["compare", str(baselinePath), str(currentPath)])
+        assert "same" in capsys.readouterr().out
+
+        currentPath.write_text(json.dumps(_results(a=1.0, b=2.0)))
+        with pytest.raises(SystemExit) as e:
+            main(["compare", str(baselinePath), str(currentPath)])
+        assert e.value.code == 1
+        assert "slower" in capsys.readouterr().out
+
+
+class CorpusTest:
+    def test_makeFont(self, ufo_module):
+        font = makeFont(
+            glyphs=20,
+            contours=3,
+            points=5,
+            componentDepth=2,
+            compositeRatio=0.5,
+            anchors=3,
+            kerningGroupSize=5,
+            kerningDensity=1.0,
+            colorLayers=2,
+            ufoModule=ufo_module.__name__,
+        )
+        glyphOrder = font.lib["public.glyphOrder"]
+        assert len(font) == len(glyphOrder) == 2 + 20 + 3 + 2 * 10
+        assert sorted(font.keys()) == sorted(glyphOrder)
+
+        base = font["uni4E00"]
+        assert len(base) == 3
+        assert all(len([p for p in c if p.segmentType]) == 5 for c in base)
+        assert [a.name for a in base.anchors] == ["top", "bottom", "center"]
+        assert base.unicodes == [0x4E00]
+        assert [a.name for a in font["uni0300"].anchors] == ["_top"]
+
+        composite = font["uni4E00.comp2.0"]
+        assert len(composite.components) == 2
+        assert composite.components[0].baseGlyph == "uni4E00.comp1.0"
+        assert font.lib["public.openTypeCategories"]["uni0301"] == "mark"
+
+        assert len(font.groups) == 2 * 4
+        # all group pairs, plus one glyph pair exception for each
+        assert len(font.kerning) == 2 * 4 * 4
+
+        assert [layer.name for layer in font.layers][1:] == ["color1", "color2"]
+        assert len(font.layers["color1"]) == 20
+
+    def test_makeFont_deterministic(self):
+        def dump(font):
+            return (
+                [(g.name, g.width, [[(p.x, p.y) for p in c] for c in g]) for g in font],
+                dict(font.kerning),
+            )
+
+        assert dump(makeFont(glyphs=20, seed=1)) == dump(makeFont(glyphs=20, seed=1))
+        assert dump(makeFont(glyphs=20, seed=1)) != dump(makeFont(glyphs=20, seed=2))
+
+    def test_makeDesignSpace(self):
+        doc = makeDesignSpace(masters=3, glyphs=20, componentDepth=2)
+        assert [s.location for s in doc.sources] == [
+            {"Weight": 100},
+            {"Weight": 500},
+            {"Weight": 900},
+        ]
+        # the masters are compatible
+        fonts = [s.font for s in doc.sources]
+        for name in fonts[0].keys():
+            glyphs = [font[name] for font in fonts]
+            structures = {
+                tuple(tuple(p.segmentType for p in c) for c in g) for g in glyphs
+            }
+            assert len(structures) == 1
+        assert len({tuple(font.kerning) for font in fonts}) == 1
+        assert fonts[0]["uni4E00"][0][0].x != fonts[1]["uni4E00"][0][0].x
+
+        with pytest.raises(ValueError):
+            makeDesignSpace(masters=1)
@@ -0,0 +1,203 @@
+import pytest
+from fontTools.pens.recordingPen import RecordingPen, RecordingPointPen
+
+from ufo2ft.compactGlyph import SMOOTH, CompactGlyph
+from ufo2ft.util import _copyGlyph, _getNewGlyphFactory
+
+
+def drawGlyph(glyph):
+    pen = glyph.getPointPen()
+    pen.beginPath(identifier="contour1")
+    pen.addPoint((0, 0), "line", name="start", identifier="point1")
+    pen.addPoint((0, 100), "line")
+    pen.addPoint((50, 150.5))
+    pen.addPoint((100, 150.5))
+    pen.addPoint((100, 100), "curve", smooth=True)
+    pen.endPath()
+    pen.beginPath()
+    pen.addPoint((200, 0), "move")
+    pen.addPoint((300, 0), "line")
+    pen.endPath()
+    pen.addComponent("b", (1, 0, 0, 1, 10, 20), identifier="component1")
+
+
+def recording(glyph):
+    pen = RecordingPointPen()
+    glyph.drawPoints(pen)
+    return pen.value
+
+
+class CompactGlyphTest:
+    def test_arrays(self):
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+
+        assert len(glyph) == 2
+        assert list(glyph.contourEnds) == [5, 7]
+        assert list(glyph.coordinates[:4]) == [0, 0, 0, 100]
+        assert glyph.pointTypes[4] == 3 | SMOOTH
+
+    def test_drawPoints(self, FontClass):
+        ufo = FontClass()
+        ufoGlyph = ufo.newGlyph("a")
+        drawGlyph(ufoGlyph)
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+
+        assert recording(glyph) == recording(ufoGlyph)
+
+    def test_draw(self):
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+        pen = RecordingPen()
+        glyph.draw(pen)
+
+        assert pen.value == [
+            ("moveTo", ((0, 0),)),
+            ("lineTo", ((0, 100),)),
+            ("curveTo", ((50, 150.5), (100, 150.5), (100, 100))),
+            ("closePath", ()),
+            ("moveTo", ((200, 0),)),
+            ("lineTo", ((300, 0),)),
+            ("endPath", ()),
+            ("addComponent", ("b", (1, 0, 0, 1, 10, 20))),
+        ]
+
+        glyph.clearComponents()
+        assert glyph.getControlBounds() == (0, 0, 300, 150.5)
+
+    def test_points(self):
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+        contour = glyph[0]
+
+        assert len(contour) == 5
+        assert not contour.open
+        assert glyph[1].open
+        assert contour.identifier == "contour1"
+        point = contour[0]
+        assert (point.x, point.y, point.segmentType) == (0, 0, "line")
+        assert isinstance(point.x, int)
+        assert (point.name, point.identifier) == ("start", "point1")
+        assert contour[-1].smooth
+        assert contour[2].y == 150.5
+
+        point.x = 10
+        point.segmentType = "move"
+        contour[-1].smooth = False
+        assert glyph.coordinates[0] == 10
+        assert glyph[0].open
+        assert not contour[-1].smooth
+        assert contour[-1].segmentType == "curve"
+
+    def test_clear_and_append_contours(self):
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+        expected = recording(glyph)
+
+        # the views on the cleared contours remain valid
+        contours = list(glyph)
+        glyph.clearContours()
+        assert len(glyph) == 0
+        assert len(contours[0]) == 5
+        for contour in contours:
+            glyph.appendContour(contour)
+
+        assert recording(glyph) == expected
+
+    def test_removeContour(self):
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+        first = glyph[0]
+
+        glyph.removeContour(first)
+
+        assert len(glyph) == 1
+        assert [(p.x, p.y) for p in glyph[0]] == [(200, 0), (300, 0)]
+        assert len(first) == 5
+        with pytest.raises(ValueError):
+            glyph.removeContour(first)
+
+    def test_components(self):
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+        component = glyph.components[0]
+
+        assert component.baseGlyph == "b"
+        assert component.identifier == "component1"
+        glyph.removeComponent(component)
+        assert not glyph.components
+
+    def test_anchors(self):
+        glyph = CompactGlyph("a")
+        glyph.anchors = [{"name": "top", "x": 100, "y": 200}]
+        glyph.appendAnchor({"name": "bottom", "x": 100, "y": 0, "color": "1,0,0,1"})
+
+        assert [(a.name, a.x, a.y) for a in glyph.anchors] == [
+            ("top", 100, 200),
+            ("bottom", 100, 0),
+        ]
+        assert dict(glyph.anchors[1]) == {
+            "x": 100,
+            "y": 0,
+            "name": "bottom",
+            "color": "1,0,0,1",
+        }
+
+    def test_move(self):
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+        glyph.appendAnchor({"name": "top", "x": 100, "y": 200})
+
+        glyph.move((10, -10))
+
+        assert (glyph[0][0].x, glyph[0][0].y) == (10, -10)
+        assert tuple(glyph.components[0].transformation) == (1, 0, 0, 1, 20, 10)
+        assert (glyph.anchors[0].x, glyph.anchors[0].y) == (110, 190)
+
+    def test_unicodes(self):
+        glyph = CompactGlyph("a", unicodes=[0x61, 0x41])
+        assert glyph.unicode == 0x61
+        glyph.unicode = 0x41
+        assert glyph.unicodes == [0x41, 0x61]
+
+    def test_verticalOrigin(self):
+        glyph = CompactGlyph("a")
+        assert glyph.verticalOrigin is None
+        glyph.verticalOrigin = 880
+        assert glyph.lib == {"public.verticalOrigin": 880}
+
+    def test_copyGlyph(self, FontClass):
+        ufo = FontClass()
+        ufoGlyph = ufo.newGlyph("a")
+        ufoGlyph.width = 500
+        ufoGlyph.unicodes = [0x61]
+        ufoGlyph.appendAnchor({"name": "top", "x": 100, "y": 200})
+        ufoGlyph.lib["foo"] = [1, 2]
+        drawGlyph(ufoGlyph)
+
+        glyph = _copyGlyph(ufoGlyph, glyphFactory=CompactGlyph)
+        assert (glyph.name, glyph.width, glyph.unicodes) == ("a", 500, [0x61])
+        assert [(a.name, a.x, a.y) for a in glyph.anchors] == [("top", 100, 200)]
+        assert glyph.lib == {"foo": [1, 2]}
+        assert recording(glyph) == recording(ufoGlyph)
+
+        # and back
+        newGlyph = _getNewGlyphFactory(ufoGlyph)
+        ufoGlyph2 = _copyGlyph(glyph, glyphFactory=newGlyph)
+        assert [(a.name, a.x, a.y) for a in ufoGlyph2.anchors] == [("top", 100, 200)]
+        assert recording(ufoGlyph2) == recording(ufoGlyph)
+
+    def test_reorderContours(self):
+        glyph = CompactGlyph("a")
+        drawGlyph(glyph)
+        contours = recording(glyph)
+        first, second = contours[:7], contours[7:11]
+
+        glyph.reorderContours([1, 0])
+
+        assert recording(glyph) == second + first + contours[11:]
+        assert glyph[1].identifier == "contour1"
+        assert glyph[1][0].name == "start"
+        with pytest.raises(ValueError):
+            glyph.reorderContours([0, 0])
@@ -301,6 +301,131 @@ class FeatureCompilerTest:
             if tmpfile is not None:
                 tmpfile.remove(ignore_errors=True)
 
+    def test_buildTables_featureFile_error(self, FontClass, caplog):
+        ufo = FontClass()
+        ufo.newGlyph("a")
+        ufo.newGlyph("v")
+        ufo.kerning.update({("a", "v"): -40})
+
+        class BadStatement(ast.Comment):
+            def build(self, builder):
+                raise FeatureLibError("cannot build this", None)
+
+        class BadCompiler(FeatureCompiler):
+            def setupFeatures(self):
+                super().setupFeatures()
+                self.featureFile.statements.append(BadStatement("# bad"))
+
+        compiler = BadCompiler(ufo, compileFeaturesFromAST=True)
+
+        # the features text compiles: the error of the AST is raised, with no
+        # temporary file to inspect
+        with caplog.at_level(logging.WARNING, logger=logger.name):
+            with pytest.raises(FeatureLibError, match="cannot build this"):
+                compiler.compile()
+
+        assert len(caplog.records) == 1
+        assert "Compiling the features AST failed: cannot build this" in caplog.text
+
+    def test_buildTables_from_featureFile(self, FontClass, monkeypatch):
+        ufo = FontClass()
+        ufo.newGlyph("a")
+        ufo.newGlyph("v")
+        ufo.kerning.update({("a", "v"): -40})
+        compiler = FeatureCompiler(ufo, compileFeaturesFromAST=True)
+
+        def parseFeatures(*args, **kwargs):
+            raise AssertionError("the features text should not be parsed")
+
+        monkeypatch.setattr(
+            "ufo2ft.featureCompiler.addOpenTypeFeaturesFromString", parseFeatures
+        )
+        ttFont = compiler.compile()
+
+        assert "GPOS" in ttFont
+        assert compiler._features is None
+        assert "pos a v -40;" in compiler.features
+
+    def test_buildTables_from_text_by_default(self, FontClass, monkeypatch):
+        ufo = FontClass()
+        ufo.newGlyph("a")
+        ufo.newGlyph("v")
+        ufo.kerning.update({("a", "v"): -40})
+        compiler = FeatureCompiler(ufo)
+
+        def compileFeatureFile(*args, **kwargs):
+            raise AssertionError("the feature file should not be compiled")
+
+        monkeypatch.setattr(
+            "ufo2ft.featureCompiler.addOpenTypeFeatures", compileFeatureFile
+        )
+        ttFont = compiler.compile()
+
+        assert "GPOS" in ttFont
+
+    @pytest.mark.parametrize("compileFeaturesFromAST", [False, True])
+    def test_buildTables_GlyphName_class_members(
+        self, FontClass, caplog, compileFeaturesFromAST
+    ):
+        # third-party writers may make classes of ast.GlyphName, which the
+        # feaLib builder can't compile
+        ufo = FontClass()
+        for name in ("a", "b", "a.alt", "b.alt"):
+            ufo.newGlyph(name)
+
+        class SS01Writer(BaseFeatureWriter):
+            tableTag = "GSUB"
+            features = frozenset(["ss01"])
+
+            def _write(self):
+                classDef = ast.GlyphClassDefinition(
+                    "Foo", ast.GlyphClass([ast.GlyphName("a"), ast.GlyphName("b")])
+                )
+                feature = ast.FeatureBlock("ss01")
+                feature.statements.append(
+                    ast.SingleSubstStatement(
+                        [ast.GlyphClassName(classDef)],
+                        [ast.GlyphClass(["a.alt", "b.alt"])],
+                        [],
+                        [],
+                        False,
+                    )
+                )
+                self.context.feaFile.statements.extend([classDef, feature])
+                return True
+
+        compiler = FeatureCompiler(
+            ufo,
+            featureWriters=[SS01Writer],
+            compileFeaturesFromAST=compileFeaturesFromAST,
+        )
+        with caplog.at_level(logging.WARNING, logger=logger.name):
+            ttFont = compiler.compile()
+
+        lookup = ttFont["GSUB"].table.LookupList.Lookup[0]
+        assert lookup.SubTable[0].mapping == {"a": "a.alt", "b": "b.alt"}
+        assert ("Compiling the features AST failed" in caplog.text) is (
+            compileFeaturesFromAST
+        )
+
+    def test_features_text_overrides_featureFile(self, FontClass):
+        ufo = FontClass()
+        ufo.newGlyph("a")
+        ufo.newGlyph("v")
+        ufo.kerning.update({("a", "v"): -40})
+
+        class UserCompiler(FeatureCompiler):
+            def setupFeatures(self):
+                super().setupFeatures()
+                self.features = "feature liga { sub a by v; } liga;"
+
+        compiler = UserCompiler(ufo)
+        ttFont = compiler.compile()
+
+        assert compiler.featureFile is None
+        assert "GSUB" in ttFont
+        assert "GPOS" not in ttFont
+
     def test_setupFeatures_custom_feaIncludeDir(self, FontClass, tmp_path):
         (tmp_path / "family.fea").write_text(
             """\
@@ -4,9 +4,9 @@ from textwrap import dedent
 import pytest
 
 from ufo2ft.errors import InvalidFeaturesData
-from ufo2ft.featureCompiler import parseLayoutFeatures
+from ufo2ft.featureCompiler import FeatureCompiler, parseLayoutFeatures
 from ufo2ft.featureWriters import KernFeatureWriter, ast
-from ufo2ft.featureWriters.kernFeatureWriter import KerningPair
+from ufo2ft.featureWriters.kernFeatureWriter import KerningPair, PairPosRules
 
 from . import FeatureWriterTest
 
@@ -689,6 +689,115 @@ class KernFeatureWriterTest(FeatureWriterTest):
         assert (pairs[4].firstIsClass, pairs[4].secondIsClass) == (True, True)
         assert pairs[4].glyphs == {"A", "B", "C", "D"}
 
+    def test_KerningPair_sides(self):
+        classDef = ast.GlyphClassDefinition("kern1.foo", ast.GlyphClass(["A", "B"]))
+        classGlyphSets = {}
+        pair1 = KerningPair(classDef, "C", 10, classGlyphSets=classGlyphSets)
+        pair2 = KerningPair(classDef, ["D", "C"], 5, classGlyphSets=classGlyphSets)
+
+        # the glyph sets of a class are shared by all its pairs
+        assert pair1.firstGlyphs == {"A", "B"}
+        assert pair1.firstGlyphs is pair2.firstGlyphs
+        assert classGlyphSets == {classDef: {"A", "B"}}
+        assert KerningPair(classDef, "C", 10).firstGlyphs == {"A", "B"}
+        assert pair1.secondGlyphs == {"C"}
+        assert pair2.secondGlyphs == {"C", "D"}
+
+        assert isinstance(pair1.side1, ast.GlyphClassName)
+        assert pair1.side1.glyphclass is classDef
+        assert isinstance(pair1.side2, ast.GlyphName)
+        assert pair2.side2.asFea() == "[C D]"
+
+        assert pair1.intersects({"B"})
+        assert pair1.intersects({"C"})
+        assert not pair1.intersects({"D"})
+        assert pair2.intersects({"D"})
+
+        # the sides are made on each access, so changing them is an error
+        with pytest.raises(AttributeError, match="read-only"):
+            pair1.side2.glyph = "D"
+        with pytest.raises(AttributeError):
+            pair2.side2.glyphs.append("E")
+        assert pair2.side2.asFea() == "[C D]"
+
+        pair1.side2 = ["E", "F"]
+        assert pair1.secondIsClass
+        assert pair1.glyphs == {"A", "B", "E", "F"}
+        assert repr(pair1) == "<KerningPair @kern1.foo [E F] 10>"
+
+    def test_classGlyphSets_per_run(self, FontClass):
+        font = FontClass()
+        for name in ("A", "B", "C"):
+            font.newGlyph(name)
+        font.groups["public.kern1.foo"] = ["A"]
+        font.kerning[("public.kern1.foo", "C")] = 10
+        writer = KernFeatureWriter()
+
+        writer.setContext(font, parseLayoutFeatures(font))
+        (pair,) = writer.context.kerning.pairs
+        assert pair.firstGlyphs == {"A"}
+        assert writer.context.kerning.classGlyphSets == {pair.side1.glyphclass: {"A"}}
+
+        # the glyph sets of the classes are not kept from one run to the next
+        font.groups["public.kern1.foo"] = ["A", "B"]
+        writer.setContext(font, parseLayoutFeatures(font))
+        (pair,) = writer.context.kerning.pairs
+        assert pair.firstGlyphs == {"A", "B"}
+
+    def test__intersectPairs(self, FontClass):
+        font = FontClass()
+        for i in range(65, 65 + 6):  # A..F
+            font.newGlyph(chr(i))
+        font.groups.update({"public.kern1.foo": ["A", "B"], "public.kern2.bar": ["C"]})
+        font.kerning.update(
+            {
+                ("public.kern1.foo", "public.kern2.bar"): 10,
+                ("public.kern1.foo", "D"): 15,
+                ("E", "F"): -5,
+                ("F", "public.kern2.bar"): 5,
+            }
+        )
+        writer = KernFeatureWriter()
+        writer.setContext(font, parseLayoutFeatures(font))
+
+        allKeys = writer._intersectPairs(
+            "scripts", {"Latn": {"A", "D"}, "Grek": {"B", "E"}, "Cyrl": {"X"}}
+        )
+
+        assert allKeys == {"Latn", "Grek"}
+        scripts = {
+            (pair.side1.asFea(), pair.side2.asFea()): pair.scripts
+            for pair in writer.context.kerning.pairs
+        }
+        assert scripts == {
+            ("E", "F"): {"Grek"},
+            ("F", "@kern2.bar"): set(),
+            ("@kern1.foo", "D"): {"Latn", "Grek"},
+            ("@kern1.foo", "@kern2.bar"): {"Latn", "Grek"},
+        }
+
+    def test_partitionByScript_sideScripts(self):
+        glyphScripts = {"A": {"Latn"}, "Alpha": {"Grek"}, "period": {"Zyyy"}}
+        classDef = ast.GlyphClassDefinition("kern1.foo", ast.GlyphClass(["A", "Alpha"]))
+        sideScripts = {}
+
+        split1 = list(
+            KerningPair(classDef, "period", -20).partitionByScript(
+                glyphScripts, sideScripts
+            )
+        )
+        split2 = list(
+            KerningPair(classDef, "A", -10).partitionByScript(glyphScripts, sideScripts)
+        )
+
+        # the class glyphs are only partitioned once
+        assert list(sideScripts) == [frozenset(["A", "Alpha"])]
+        assert sorted(str(pair) for _, pair in split1) == [
+            "<KerningPair A period -20 {'Latn'}>",
+            "<KerningPair Alpha period -20 {'Grek'}>",
+        ]
+        assert [str(pair) for _, pair in split2] == ["<KerningPair A A -10 {'Latn'}>"]
+
     def test_kern_LTR_and_RTL(self, FontClass):
         glyphs = {
             ".notdef": None,
@@ -1339,6 +1448,65 @@ class KernFeatureWriterTest(FeatureWriterTest):
             """
         )
 
+    def test_compactRules(self, FontClass):
+        glyphs = {
+            "A": 0x41,
+            "V": 0x56,
+            "W": 0x57,
+            "four": 0x34,
+            "seven": 0x37,
+            "bet-hb": 0x5D1,
+            "yod-hb": 0x5D9,
+            "acutecomb": 0x301,
+        }
+        groups = {"public.kern1.A": ["A"], "public.kern2.VW": ["V", "W"]}
+        kerning = {
+            ("public.kern1.A", "public.kern2.VW"): -42,
+            ("A", "public.kern2.VW"): -31,
+            ("A", "V"): -40,
+            ("seven", "four"): -25,
+            ("yod-hb", "bet-hb"): -100,
+            ("yod-hb", "four"): -10,
+            ("acutecomb", "V"): 12,
+        }
+        features = dedent(
+            """\
+            languagesystem DFLT dflt;
+            languagesystem latn dflt;
+            languagesystem hebr dflt;
+
+            @Marks = [acutecomb];
+            table GDEF {
+                GlyphClassDef , , @Marks, ;
+            } GDEF;
+            """
+        )
+        ufo = makeUFO(FontClass, glyphs, groups, kerning, features)
+
+        results = []
+        for compactRules in (False, True):
+            compiler = FeatureCompiler(
+                ufo,
+                featureWriters=[
+                    KernFeatureWriter(compactRules=compactRules, quantization=4)
+                ],
+            )
+            ttFont = compiler.compile()
+            results.append((compiler.features, ttFont["GPOS"].compile(ttFont)))
+
+            lookups = getLookups(compiler.featureFile)
+            assert len(lookups) == 4
+            for lookup in lookups:
+                assert bool(getPairPosRules(lookup)) is not compactRules
+                assert (
+                    any(isinstance(st, PairPosRules) for st in lookup.statements)
+                    is compactRules
+                )
+
+        assert results[0] == results[1]
+        assert "pos yod-hb four -8;" in results[1][0]
+        assert "enum pos A @kern2.VW -32;" in results[1][0]
+
 
 if __name__ == "__main__":
     import sys
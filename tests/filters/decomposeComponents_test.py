@@ -1,7 +1,11 @@
 import logging
 
 from ufo2ft.filters.decomposeComponents import DecomposeComponentsFilter
-from ufo2ft.util import logger
+from ufo2ft.util import _GlyphSet, logger
+
+
+def _points(glyph):
+    return [[(p.x, p.y, p.segmentType) for p in contour] for contour in glyph]
 
 
 def test_missing_component_is_dropped(FontClass, caplog):
@@ -65,3 +69,39 @@ def test_nested_components(FontClass):
     assert not ufo["nine.lf"].components
     assert len(ufo["nine"]) == 1
     assert not ufo["nine"].components
+
+
+def test_shared_base_glyphs(FontClass):
+    ufo = FontClass()
+    a = ufo.newGlyph("a")
+    pen = a.getPen()
+    pen.moveTo((0, 0))
+    pen.lineTo((0, 300))
+    pen.curveTo((100, 400), (200, 400), (300, 300))
+    pen.lineTo((300, 0))
+    pen.closePath()
+    # the same base glyph, nested or not, with and without flipping
+    components = {
+        "b": [("a", (1, 0, 0, 1, 0, 0)), ("a", (1, 0, 0, 1, 400, 0))],
+        "c": [("a", (-1, 0, 0, 1, 300, 0)), ("b", (1, 0, 0, 1, 0, 500))],
+        "d": [("c", (1, 0, 0, -1, 0, 0)), ("a", (0.5, 0, 0, 0.5, 10, 20))],
+    }
+    for name, baseGlyphs in components.items():
+        pen = ufo.newGlyph(name).getPen()
+        for baseGlyph, transformation in baseGlyphs:
+            pen.addComponent(baseGlyph, transformation)
+
+    # decompose each glyph on its own, without sharing the recorded contours
+    expected = {}
+    for name in components:
+        glyphSet = _GlyphSet.from_layer(ufo, copy=True)
+        DecomposeComponentsFilter(include={name})(ufo, glyphSet)
+        expected[name] = _points(glyphSet[name])
+
+    filter_ = DecomposeComponentsFilter()
+    assert filter_(ufo) == set(components)
+
+    assert {name: _points(ufo[name]) for name in components} == expected
+    assert len(ufo["d"]) == 4
+    # the flipped contours are reversed
+    assert _points(ufo["c"])[0][:2] == [(300, 0, "line"), (0, 0, "line")]
@@ -1,8 +1,11 @@
+import itertools
+import multiprocessing
 from types import SimpleNamespace
 
 import pytest
 from fontTools.misc.loggingTools import CapturingLogHandler
 
+from ufo2ft import parallel
 from ufo2ft.filters import (
     FILTERS_KEY,
     BaseFilter,
@@ -11,6 +14,7 @@ from ufo2ft.filters import (
     loadFilters,
     logger,
 )
+from ufo2ft.util import ComponentGraph, _GlyphSet, getMaxComponentDepth
 
 from ..testSupport import _TempModule
 
@@ -257,3 +261,129 @@ if __name__ == "__main__":
     import sys
 
     sys.exit(pytest.main(sys.argv))
+
+
+def test_BaseFilter_workers(FontClass, datadir):
+    from ufo2ft.filters.cubicToQuadratic import CubicToQuadraticFilter
+
+    ufo1 = FontClass(datadir.join("TestFont.ufo"))
+    ufo2 = FontClass(datadir.join("TestFont.ufo"))
+
+    filter1 = CubicToQuadraticFilter()
+    modified1 = filter1(ufo1)
+    filter2 = CubicToQuadraticFilter(workers=2)
+    assert filter2.workers == 2
+    modified2 = filter2(ufo2)
+
+    assert modified1 == modified2
+    # cu2qu stats collected in the worker processes are merged back
+    assert filter1.context.stats == filter2.context.stats
+    for glyphName in modified1:
+        assert [
+            [(p.x, p.y, p.segmentType) for p in contour] for contour in ufo1[glyphName]
+        ] == [
+            [(p.x, p.y, p.segmentType) for p in contour] for contour in ufo2[glyphName]
+        ]
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="requires the 'fork' start method",
+)
+def test_BaseFilter_workers_single_pool(FontClass, datadir, monkeypatch):
+    import ufo2ft.filters.base
+    from ufo2ft.filters.cubicToQuadratic import CubicToQuadraticFilter
+
+    ufo = FontClass(datadir.join("TestFont.ufo"))
+    assert len(ComponentGraph(_GlyphSet.from_layer(ufo)).levels()) > 1
+
+    calls = []
+
+    def parallelMap(func, items, workers=None):
+        calls.append(items)
+        return parallel.parallelMap(func, items, workers=workers)
+
+    monkeypatch.setattr(ufo2ft.filters.base, "parallelMap", parallelMap)
+    modified = CubicToQuadraticFilter(workers=2)(ufo)
+
+    # all the component depth levels are filtered on the same pool
+    assert len(calls) == 1
+    assert modified == CubicToQuadraticFilter()(FontClass(datadir.join("TestFont.ufo")))
+
+
+def _makeCompositeFont(FontClass):
+    ufo = FontClass()
+    for name, components in [
+        ("a", []),
+        ("acute", []),
+        ("aacute", ["a", "acute"]),
+        ("aacute.alt", ["aacute"]),
+        ("broken", ["missing"]),
+    ]:
+        glyph = ufo.newGlyph(name)
+        pen = glyph.getPointPen()
+        for baseGlyph in components:
+            pen.addComponent(baseGlyph, (1, 0, 0, 1, 0, 0))
+    return ufo
+
+
+def test_ComponentGraph(FontClass):
+    glyphSet = _GlyphSet.from_layer(_makeCompositeFont(FontClass))
+    graph = ComponentGraph(glyphSet)
+
+    assert graph.baseGlyphs("aacute") == ("a", "acute")
+    assert graph.dependents("a") == {"aacute"}
+    assert graph.dependents("a", recursive=True) == {"aacute", "aacute.alt"}
+    assert graph.dependents("missing") == {"broken"}
+    assert {g: graph.depth(g) for g in glyphSet} == {
+        g: getMaxComponentDepth(glyphSet[g], glyphSet) for g in glyphSet
+    }
+    levels = graph.levels()
+    assert [sorted(level) for level in levels] == [
+        ["aacute.alt"],
+        ["aacute", "broken"],
+        ["a", "acute"],
+    ]
+    # in the order of the glyph set within each level
+    assert list(itertools.chain(*levels)) == sorted(
+        glyphSet, key=lambda g: -graph.depth(g)
+    )
+
+
+def test_ComponentGraph_update(FontClass):
+    glyphSet = _GlyphSet.from_layer(_makeCompositeFont(FontClass))
+    graph = ComponentGraph(glyphSet)
+    assert graph.depth("aacute.alt") == 2
+
+    # replace a component with its base glyphs
+    glyphSet["aacute.alt"].clearComponents()
+    pen = glyphSet["aacute.alt"].getPointPen()
+    pen.addComponent("a", (1, 0, 0, 1, 0, 0))
+    pen.addComponent("acute", (1, 0, 0, 1, 0, 0))
+    # and add a glyph that was missing
+    glyphSet["missing"] = glyphSet.pop("aacute")
+    glyphSet["missing"].clearComponents()
+    glyphSet["missing"].getPointPen().addComponent("a", (1, 0, 0, 1, 0, 0))
+
+    graph.update(["aacute.alt", "missing"])
+
+    assert graph.baseGlyphs("aacute.alt") == ("a", "acute")
+    assert graph.dependents("a") == {"aacute.alt", "missing"}
+    assert graph.dependents("aacute") == set()
+    assert graph.depth("aacute.alt") == 1
+    assert graph.depth("broken") == 2
+    assert "aacute" not in graph.levels()[-1]
+
+
+def test_BaseFilter_componentGraph(FontClass):
+    from ufo2ft.filters.decomposeComponents import DecomposeComponentsFilter
+
+    glyphSet = _GlyphSet.from_layer(_makeCompositeFont(FontClass))
+    graph = glyphSet.componentGraph = ComponentGraph(glyphSet)
+
+    decompose = DecomposeComponentsFilter(include={"aacute"})
+    assert decompose(None, glyphSet) == {"aacute"}
+
+    assert decompose.context.componentGraph is graph
+    assert graph.baseGlyphs("aacute") == ()
+    assert graph.depth("aacute.alt") == 1
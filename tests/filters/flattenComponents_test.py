@@ -220,6 +220,22 @@ class FlattenComponentsFilterTest:
             for c in font["scaledNestedComponentGlyph"].components
         ] == [("contourGlyph", (0.6, 0, 0, 0.6, 100, 100))]
 
+    def test_flattened_glyphs_cached(self, font):
+        philter = FlattenComponentsFilter()
+        philter(font)
+        # the composites used as components are only flattened once
+        assert {
+            name: [(baseGlyph, tuple(t)) for baseGlyph, t in flattened]
+            for name, flattened in philter.context.flattenedGlyphs.items()
+        } == {
+            "componentGlyph": [("contourGlyph", (1, 0, 0, 1, 0, 0))],
+            "nestedComponentGlyph": [("contourGlyph", (1, 0, 0, 1, 0, 0))],
+            "nestedContourAndComponentGlyph": [
+                ("contourAndComponentGlyph", (1, 0, 0, 1, 50, 0))
+            ],
+            "scaledComponentGlyph": [("contourGlyph", (0.5, 0, 0, 0.5, 50, 50))],
+        }
+
     def test_logger(self, font):
         with CapturingLogHandler(logger, level="INFO") as captor:
             philter = FlattenComponentsFilter()
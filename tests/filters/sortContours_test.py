@@ -4,6 +4,7 @@ import pytest
 
 import ufo2ft
 import ufo2ft.filters.sortContours
+from ufo2ft.util import _GlyphSet
 
 
 @pytest.fixture
@@ -486,3 +487,15 @@ EXPECTED_glyph_graphemejoinercomb = [
         (357, 279, "line", False),
     ],
 ]
+
+
+def test_sort_compact_glyphs(font):
+    # the same order as when sorting the UFO glyphs
+    glyphSet = _GlyphSet.from_layer(font, copy=True, compact=True)
+    philter = ufo2ft.filters.sortContours.SortContoursFilter()
+    assert philter(font, glyphSet) == philter(font)
+
+    for glyph in font:
+        assert [[(p.x, p.y) for p in c] for c in glyphSet[glyph.name]] == [
+            [(p.x, p.y) for p in c] for c in glyph
+        ]
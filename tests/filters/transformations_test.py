@@ -1,8 +1,16 @@
 from math import isclose
 
 import pytest
+from fontTools.pens.recordingPen import RecordingPointPen
 
 from ufo2ft.filters.transformations import TransformationsFilter
+from ufo2ft.util import _GlyphSet
+
+
+def _outline(glyph):
+    pen = RecordingPointPen()
+    glyph.drawPoints(pen)
+    return pen.value
 
 
 @pytest.fixture(
@@ -206,3 +214,20 @@ class TransformationsFilterTest:
         # The offset value here should not change the fact that the glyph
         # bounding box is scaled by 50%.
         assert a.width == 350 * factor
+
+    def test_compact_glyphs(self, font):
+        filter_ = TransformationsFilter(
+            OffsetX=-10, OffsetY=51, ScaleX=50, Slant=10, exclude={"c"}
+        )
+        glyphSet = _GlyphSet.from_layer(font, copy=True, compact=True)
+        assert filter_(font, glyphSet)
+        # the same as transforming the UFO glyphs
+        filter_(font)
+
+        for glyph in font:
+            compactGlyph = glyphSet[glyph.name]
+            assert _outline(compactGlyph) == _outline(glyph)
+            assert [(a.x, a.y) for a in compactGlyph.anchors] == [
+                (a.x, a.y) for a in glyph.anchors
+            ]
+            assert compactGlyph.width == glyph.width
@@ -5,6 +5,7 @@ import time
 import pytest
 
 from ufo2ft.fontInfoData import (
+    ResolvedInfo,
     dateStringToTimeValue,
     getAttrWithFallback,
     normalizeStringForPostscript,
@@ -186,6 +187,41 @@ class GetAttrWithFallbackTest:
         assert getAttrWithFallback(info, "descender") == -410
 
 
+class ResolvedInfoTest:
+    def test_fallbacks(self, info):
+        resolved = ResolvedInfo(info)
+
+        for attr in (
+            "styleMapFamilyName",
+            "openTypeOS2WinAscent",
+            "openTypeNameUniqueID",
+            "postscriptFontName",
+            "postscriptBlueScale",
+            "openTypeOS2SubscriptXSize",
+        ):
+            assert getattr(resolved, attr) == getAttrWithFallback(info, attr)
+        assert resolved.postscriptFontName == "FamilyName-StyleName"
+        with pytest.raises(KeyError):
+            resolved.foobar
+
+    def test_values_kept(self, info):
+        resolved = ResolvedInfo(info)
+        assert resolved.postscriptFontName == "FamilyName-StyleName"
+
+        info.styleName = "Bold"
+        assert resolved.postscriptFontName == "FamilyName-StyleName"
+        assert ResolvedInfo(info).postscriptFontName == "FamilyName-Bold"
+
+    def test_head_created(self, info):
+        resolved = ResolvedInfo(info)
+        os.environ["SOURCE_DATE_EPOCH"] = "1514485183"
+        try:
+            assert resolved.openTypeHeadCreated == "2017/12/28 18:19:43"
+        finally:
+            del os.environ["SOURCE_DATE_EPOCH"]
+        assert resolved.openTypeHeadCreated != "2017/12/28 18:19:43"
+
+
 class PostscriptBlueScaleFallbackTest:
     def test_without_blue_zones(self, info):
         postscriptBlueScale = getAttrWithFallback(info, "postscriptBlueScale")
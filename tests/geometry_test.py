@@ -0,0 +1,106 @@
+from array import array
+
+import pytest
+from fontTools.misc.transform import Transform
+from fontTools.pens.boundsPen import ControlBoundsPen
+from fontTools.pens.pointPen import PointToSegmentPen
+
+import ufo2ft.geometry
+from ufo2ft.compactGlyph import CompactGlyph
+from ufo2ft.geometry import (
+    contourControlBounds,
+    controlBounds,
+    sideBearingExtrema,
+    transformCoordinates,
+)
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        # also use numpy for the small arrays of the tests
+        monkeypatch.setattr(ufo2ft.geometry, "NUMPY_MIN_COORDINATES", 0)
+    else:
+        monkeypatch.setattr(ufo2ft.geometry, "np", None)
+    return request.param
+
+
+def makeGlyph(contours):
+    glyph = CompactGlyph("a")
+    pen = glyph.getPointPen()
+    for points in contours:
+        pen.beginPath()
+        for pt, segmentType in points:
+            pen.addPoint(pt, segmentType)
+        pen.endPath()
+    return glyph
+
+
+CONTOURS = [
+    [((10, 10), "line"), ((10, 110), "line"), ((110, 110), "line")],
+    [((0, 0), "move"), ((20.5, -30), None), ((40, -30), None), ((60, 0), "curve")],
+    [((300, 200), "qcurve")],
+    [((-5, 15), None), ((5, 25), None), ((15, 15), None)],
+]
+
+
+class GeometryTest:
+    def test_transformCoordinates(self, backend):
+        glyph = makeGlyph(CONTOURS)
+        coordinates = glyph.coordinates
+        transformation = Transform().scale(0.9, 1.1).skew(0.2).translate(5, -3)
+        expected = [transformation.transformPoint((p.x, p.y)) for c in glyph for p in c]
+
+        transformCoordinates(coordinates, transformation)
+
+        assert [(p.x, p.y) for c in glyph for p in c] == expected
+
+    def test_transformCoordinates_empty(self, backend):
+        coordinates = array("d")
+        transformCoordinates(coordinates, (2, 0, 0, 2, 0, 0))
+        assert not coordinates
+
+    def test_contourControlBounds(self, backend):
+        glyph = makeGlyph(CONTOURS)
+        expected = []
+        for contour in glyph:
+            pen = ControlBoundsPen(None)
+            contour.drawPoints(PointToSegmentPen(pen))
+            expected.append(pen.bounds)
+
+        bounds = contourControlBounds(glyph.coordinates, glyph.contourEnds)
+
+        assert bounds == expected
+
+    def test_contourControlBounds_empty_contours(self, backend):
+        coordinates = array("d", [0, 0, 10, 20, 30, 40])
+        ends = array("l", [0, 2, 2, 3])
+        assert contourControlBounds(coordinates, ends) == [
+            None,
+            (0, 0, 10, 20),
+            None,
+            (30, 40, 30, 40),
+        ]
+        assert contourControlBounds(array("d"), array("l", [0])) == [None]
+
+    def test_controlBounds(self, backend):
+        glyph = makeGlyph(CONTOURS)
+        pen = ControlBoundsPen(None)
+        glyph.drawPoints(PointToSegmentPen(pen))
+
+        assert controlBounds(glyph.coordinates) == pen.bounds
+        assert controlBounds(array("d")) is None
+
+    def test_sideBearingExtrema(self, backend):
+        advances = [500, 600, 0]
+        sideBearings = [50, -10, -120]
+        mins = [50, -10, -120]
+        maxs = [470, 620, -20]
+
+        assert sideBearingExtrema(advances, sideBearings, mins, maxs) == (
+            -120,
+            -20,
+            620,
+        )
+        assert sideBearingExtrema([], [], [], []) == (0, 0, 0)
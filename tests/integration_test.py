@@ -135,6 +135,17 @@ class IntegrationTest:
         ttf = compileTTF(testufo, removeOverlaps=True, overlapsBackend="pathops")
         expectTTX(ttf, "TestFont-NoOverlaps-TTF-pathops.ttx")
 
+    @pytest.mark.parametrize(
+        "compileFunc, expected_ttx",
+        [
+            (compileOTF, "TestFont-NoOverlaps-CFF.ttx"),
+            (compileTTF, "TestFont-NoOverlaps-TTF.ttx"),
+        ],
+    )
+    def test_removeOverlaps_workers(self, testufo, compileFunc, expected_ttx):
+        font = compileFunc(testufo, removeOverlaps=True, workers=2)
+        expectTTX(font, expected_ttx)
+
     def test_nestedComponents(self, FontClass):
         ufo = FontClass(getpath("NestedComponents-Regular.ufo"))
         ttf = compileTTF(ufo)
@@ -267,6 +278,72 @@ class IntegrationTest:
         ttf = compile_func(designspace, **options)
         expectTTX(ttf, expected_ttx)
 
+    @pytest.mark.parametrize(
+        "compileFunc, options",
+        [
+            (compileOTF, {}),
+            (compileOTF, {"cffVersion": 2}),
+            (compileTTF, {}),
+            (compileTTF, {"useProductionNames": True}),
+        ],
+    )
+    def test_reloadFont(self, testufo, compileFunc, options):
+        # post-processing in memory gives the same font as reloading it first
+        results = []
+        for reloadFont in (False, True):
+            font = compileFunc(testufo, reloadFont=reloadFont, **options)
+            font.recalcTimestamp = False
+            font["head"].created = font["head"].modified = 3570196637
+            buf = io.BytesIO()
+            font.save(buf)
+            results.append(buf.getvalue())
+        assert results[0] == results[1]
+
+    @pytest.mark.parametrize("compileFunc", [compileVariableTTF, compileVariableCFF2])
+    def test_reloadFont_variable(self, designspace, compileFunc):
+        results = []
+        for reloadFont in (False, True):
+            font = compileFunc(designspace, reloadFont=reloadFont)
+            font.recalcTimestamp = False
+            font["head"].created = font["head"].modified = 3570196637
+            buf = io.BytesIO()
+            font.save(buf)
+            results.append(buf.getvalue())
+        assert results[0] == results[1]
+
+    @pytest.mark.parametrize(
+        "compileFunc, options",
+        [
+            (compileOTF, {}),
+            (compileOTF, {"removeOverlaps": True}),
+            (compileTTF, {}),
+            (compileTTF, {"removeOverlaps": True, "flattenComponents": True}),
+        ],
+    )
+    def test_compactGlyphs(self, FontClass, compileFunc, options):
+        results = []
+        for compactGlyphs in (False, True):
+            ufo = FontClass(getpath("TestFont.ufo"))
+            font = compileFunc(ufo, compactGlyphs=compactGlyphs, **options)
+            font.recalcTimestamp = False
+            font["head"].created = font["head"].modified = 3570196637
+            buf = io.BytesIO()
+            font.save(buf)
+            results.append(buf.getvalue())
+        assert results[0] == results[1]
+
+    @pytest.mark.parametrize("compileFunc", [compileVariableTTF, compileVariableCFF2])
+    def test_compactGlyphs_variable(self, designspace, compileFunc):
+        results = []
+        for compactGlyphs in (False, True):
+            font = compileFunc(designspace, compactGlyphs=compactGlyphs)
+            font.recalcTimestamp = False
+            font["head"].created = font["head"].modified = 3570196637
+            buf = io.BytesIO()
+            font.save(buf)
+            results.append(buf.getvalue())
+        assert results[0] == results[1]
+
     @pytest.mark.parametrize(
         "compileFunc",
         [
@@ -416,6 +493,41 @@ class IntegrationTest:
             "DSv5/MutatorSerifVariable_Width-CFF2.ttx",
         )
 
+    @pytest.mark.parametrize(
+        "compileFunc, suffix",
+        [(compileVariableTTFs, "TTF"), (compileVariableCFF2s, "CFF2")],
+    )
+    def test_compileVariableFonts_workers(self, designspace_v5, compileFunc, suffix):
+        # the designspace has two interpolable sub-spaces, compiled in parallel
+        fonts = compileFunc(designspace_v5, workers=2)
+
+        for vfName, font in fonts.items():
+            expectTTX(font, f"DSv5/{vfName}-{suffix}.ttx")
+
+    @pytest.mark.parametrize(
+        "compileFunc, expected_ttx",
+        [
+            (compileVariableTTF, "TestVariableFont-TTF.ttx"),
+            (compileVariableCFF2, "TestVariableFont-CFF2.ttx"),
+        ],
+    )
+    def test_compileVariable_workers(self, designspace, compileFunc, expected_ttx):
+        # a single interpolable sub-space, its masters are compiled in parallel
+        varfont = compileFunc(designspace, workers=2)
+        expectTTX(varfont, expected_ttx)
+
+    def test_debugFeatureFile_workers(self, designspace):
+        tmp = io.StringIO()
+
+        _ = compileVariableTTF(designspace, workers=2, debugFeatureFile=tmp)
+
+        debugText = tmp.getvalue()
+        assert "### LayerFont-Regular ###" in debugText
+        assert "### LayerFont-Bold ###" in debugText
+        assert debugText.index("### LayerFont-Regular ###") < debugText.index(
+            "### LayerFont-Bold ###"
+        )
+
 
 if __name__ == "__main__":
     sys.exit(pytest.main(sys.argv))
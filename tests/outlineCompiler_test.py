@@ -3,6 +3,8 @@ import os
 
 import pytest
 from cu2qu.ufo import font_to_quadratic
+from fontTools.misc.roundTools import otRound
+from fontTools.pens.t2CharStringPen import T2CharStringPen
 from fontTools.ttLib import TTFont
 from fontTools.ttLib.tables._g_l_y_f import USE_MY_METRICS
 
@@ -74,6 +76,18 @@ class OutlineTTFCompilerTest:
         assert "gasp" in compiler.otf
         assert compiler.otf["gasp"].gaspRange == {7: 10, 65535: 15}
 
+    def test_resolvedInfo_per_compile(self, testufo):
+        compiler = OutlineTTFCompiler(testufo)
+        ttFont = compiler.compile()
+        resolved = compiler.resolvedInfo
+        assert compiler.resolvedInfo is resolved
+        assert ttFont["head"].unitsPerEm == 1000
+
+        testufo.info.unitsPerEm = 2000
+        ttFont = compiler.compile()
+        assert compiler.resolvedInfo is not resolved
+        assert ttFont["head"].unitsPerEm == 2000
+
     def test_compile_without_gasp(self, testufo):
         testufo.info.openTypeGaspRangeRecords = None
         compiler = OutlineTTFCompiler(testufo)
@@ -95,6 +109,121 @@ class OutlineTTFCompilerTest:
         # float coordinates are rounded, so is the bbox
         assert compiler.glyphBoundingBoxes["d"] == (90, 77, 211, 197)
 
+    def test_makeGlyphsMetrics(self, quadufo):
+        compiler = OutlineTTFCompiler(quadufo)
+        metrics = compiler.glyphMetrics
+        assert metrics.glyphNames == list(compiler.allGlyphs)
+        glyphBoxes = compiler.glyphBoundingBoxes
+        for i, glyphName in enumerate(metrics.glyphNames):
+            glyph = compiler.allGlyphs[glyphName]
+            assert metrics.advanceWidths[i] == otRound(glyph.width)
+            bounds = glyphBoxes[glyphName]
+            assert metrics.hasBounds[i] == (bounds is not None)
+            assert (
+                metrics.xMins[i],
+                metrics.yMins[i],
+                metrics.xMaxs[i],
+                metrics.yMaxs[i],
+            ) == (bounds or (0, 0, 0, 0))
+
+        compiler.compile()
+        hmtx = compiler.otf["hmtx"]
+        assert hmtx["space"] == (otRound(quadufo["space"].width), 0)
+        assert hmtx["d"][1] == glyphBoxes["d"].xMin
+
+    def test_negative_width(self, quadufo):
+        quadufo["a"].width = -10
+        compiler = OutlineTTFCompiler(quadufo)
+        with pytest.raises(ValueError, match="The width should not be negative: 'a'"):
+            compiler.compile()
+
+    def test_makeGlyphsBoundingBoxes_composites(self, quadufo):
+        for name, components in [
+            ("offset", [("a", (1, 0, 0, 1, 10, -20)), ("d", (1, 0, 0, 1, 300, 0))]),
+            (
+                "nested",
+                [("offset", (1, 0, 0, 1, -5, 5)), ("space", (1, 0, 0, 1, 0, 0))],
+            ),
+            ("scaled", [("a", (1, 0, 0, 1, 0, 0)), ("d", (2, 0, 0, 0.5, 0, 0))]),
+            ("nestedScaled", [("scaled", (1, 0, 0, 1, 20, 0))]),
+        ]:
+            pen = quadufo.newGlyph(name).getPointPen()
+            for baseGlyph, transformation in components:
+                pen.addComponent(baseGlyph, transformation)
+        compiler = OutlineTTFCompiler(quadufo)
+        ttGlyphs = compiler.getCompiledGlyphs()
+
+        glyphBoxes = compiler.glyphBoundingBoxes
+
+        for name in ("offset", "nested", "scaled", "nestedScaled"):
+            glyph = ttGlyphs[name]
+            bounds = (glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax)
+            glyph.recalcBounds(ttGlyphs)
+            assert bounds == (glyph.xMin, glyph.yMin, glyph.xMax, glyph.yMax)
+            assert glyphBoxes[name] == bounds
+        assert glyphBoxes["nested"] == (71, -15, 506, 495)
+
+    def test_compileGlyphs_workers(self, quadufo):
+        expected = OutlineTTFCompiler(quadufo).compile()
+        compiler = OutlineTTFCompiler(quadufo, workers=2)
+        ttf = compiler.compile()
+
+        assert ttf.getGlyphOrder() == expected.getGlyphOrder()
+        for glyphName in ttf.getGlyphOrder():
+            assert ttf["glyf"][glyphName].compile(ttf["glyf"]) == expected["glyf"][
+                glyphName
+            ].compile(expected["glyf"])
+        assert compiler.glyphBoundingBoxes["d"] == (90, 77, 211, 197)
+
+    def test_compileGlyphs_glyphCacheDir(self, quadufo, tmp_path, caplog):
+        expected = OutlineTTFCompiler(quadufo).compile()
+
+        compiler = OutlineTTFCompiler(quadufo, glyphCacheDir=tmp_path)
+        compiler.compile()
+        assert any(tmp_path.iterdir())
+
+        numGlyphs = len(compiler.glyphOrder)
+        with caplog.at_level(logging.INFO, logger="ufo2ft.outlineCompiler"):
+            ttf = OutlineTTFCompiler(quadufo, glyphCacheDir=tmp_path).compile()
+        assert f"Found {numGlyphs} of {numGlyphs} compiled glyphs" in caplog.text
+
+        for glyphName in ttf.getGlyphOrder():
+            assert ttf["glyf"][glyphName].compile(ttf["glyf"]) == expected["glyf"][
+                glyphName
+            ].compile(expected["glyf"])
+
+    def test_compileGlyphs_glyphCacheDir_modified(self, quadufo, tmp_path, caplog):
+        OutlineTTFCompiler(quadufo, glyphCacheDir=tmp_path).compile()
+        # the composite glyphs don't change, unless they have to be decomposed
+        quadufo["b"].move((10, 0))
+        expected = OutlineTTFCompiler(quadufo).compile()
+
+        compiler = OutlineTTFCompiler(quadufo, glyphCacheDir=tmp_path)
+        with caplog.at_level(logging.INFO, logger="ufo2ft.outlineCompiler"):
+            ttf = compiler.compile()
+        numGlyphs = len(compiler.glyphOrder)
+        # "b" and "h", which uses "b" as a component
+        assert f"Found {numGlyphs - 2} of {numGlyphs} compiled glyphs" in caplog.text
+        assert ttf["glyf"]["b"].compile(ttf["glyf"]) == expected["glyf"]["b"].compile(
+            expected["glyf"]
+        )
+
+    def test_compileGlyphs_glyphCacheDir_invalid(self, quadufo, tmp_path, caplog):
+        pen = quadufo.newGlyph("cubic").getPen()
+        pen.moveTo((0, 0))
+        pen.curveTo((0, 100), (100, 100), (100, 0))
+        pen.closePath()
+        OutlineTTFCompiler(quadufo, glyphCacheDir=tmp_path).compile()
+
+        # the glyph that failed is not cached, so its error is logged again
+        compiler = OutlineTTFCompiler(quadufo, glyphCacheDir=tmp_path)
+        with caplog.at_level(logging.INFO, logger="ufo2ft.outlineCompiler"):
+            ttf = compiler.compile()
+        numGlyphs = len(compiler.glyphOrder)
+        assert f"Found {numGlyphs - 1} of {numGlyphs} compiled glyphs" in caplog.text
+        assert "'cubic' has invalid curve format; skipped" in caplog.text
+        assert ttf["glyf"]["cubic"].numberOfContours == 0
+
     def test_autoUseMyMetrics(self, use_my_metrics_ufo):
         compiler = OutlineTTFCompiler(use_my_metrics_ufo)
         ttf = compiler.compile()
@@ -463,6 +592,51 @@ class OutlineOTFCompilerTest:
             [-12, 66, 0, "rmoveto", 256, 0, "rlineto", -128, 510, "rlineto", "endchar"],
         )
 
+    def test_compileGlyphs_workers(self, testufo):
+        expected = OutlineOTFCompiler(testufo).compile()
+        compiler = OutlineOTFCompiler(testufo, workers=2)
+        otf = compiler.compile()
+
+        charStrings = otf["CFF "].cff.topDictIndex[0].CharStrings
+        expectedCharStrings = expected["CFF "].cff.topDictIndex[0].CharStrings
+        assert list(charStrings.keys()) == list(expectedCharStrings.keys())
+        for glyphName in charStrings.keys():
+            assert charStrings[glyphName].program == (
+                expectedCharStrings[glyphName].program
+            )
+            assert charStrings[glyphName].private is charStrings.private
+        assert compiler.glyphBoundingBoxes["d"] == (90, 77, 211, 197)
+
+    def test_compileGlyphs_glyphCacheDir(self, testufo, tmp_path, caplog):
+        OutlineOTFCompiler(testufo, glyphCacheDir=tmp_path).compile()
+        # components are decomposed in CFF, so all the glyphs using "a" change
+        testufo["a"].move((10, 0))
+        expected = OutlineOTFCompiler(testufo).compile()
+
+        compiler = OutlineOTFCompiler(testufo, glyphCacheDir=tmp_path)
+        with caplog.at_level(logging.INFO, logger="ufo2ft.outlineCompiler"):
+            otf = compiler.compile()
+        numGlyphs = len(compiler.glyphOrder)
+        # "a", "g", "i", "j", "k" and "l"
+        assert f"Found {numGlyphs - 6} of {numGlyphs} compiled glyphs" in caplog.text
+
+        charStrings = otf["CFF "].cff.topDictIndex[0].CharStrings
+        expectedCharStrings = expected["CFF "].cff.topDictIndex[0].CharStrings
+        for glyphName in charStrings.keys():
+            assert charStrings[glyphName].program == (
+                expectedCharStrings[glyphName].program
+            )
+            assert charStrings[glyphName].private is charStrings.private
+
+    def test_compileGlyphs_glyphCacheDir_options(self, testufo, tmp_path, caplog):
+        OutlineOTFCompiler(testufo, glyphCacheDir=tmp_path).compile()
+
+        with caplog.at_level(logging.INFO, logger="ufo2ft.outlineCompiler"):
+            OutlineOTFCompiler(
+                testufo, glyphCacheDir=tmp_path, optimizeCFF=False
+            ).compile()
+        assert "Found 0 of" in caplog.text
+
     def test_makeGlyphsBoundingBoxes(self, testufo):
         compiler = OutlineOTFCompiler(testufo)
         # with default roundTolerance, all coordinates and hence the bounding
@@ -476,6 +650,58 @@ class OutlineOTFCompilerTest:
         compiler = OutlineOTFCompiler(testufo, roundTolerance=0.1)
         assert compiler.glyphBoundingBoxes["d"] == (90, 77, 211, 198)
 
+    @pytest.mark.parametrize("roundTolerance", [0, 0.1, 0.5])
+    @pytest.mark.parametrize("optimizeCFF", [True, False])
+    def test_getCharStringForGlyph_bounds(self, testufo, roundTolerance, optimizeCFF):
+        # contours with a single point: the first one is merged with the next
+        # move when the charstring is optimized
+        pen = testufo.newGlyph("points").getPen()
+        pen.moveTo((-10.3, 900.7))
+        pen.endPath()
+        pen.moveTo((0, 0))
+        pen.lineTo((100.2, 50))
+        pen.closePath()
+        pen.moveTo((300, 20.6))
+        pen.endPath()
+        # quadratic curves and transformed components
+        pen = testufo.newGlyph("curves").getPen()
+        pen.moveTo((10.4, 0))
+        pen.qCurveTo((50.3, 120.7), (140.1, 80.5), (200, 0))
+        pen.closePath()
+        pen.addComponent("d", (0.7, 0.1, 0, 1.3, 20.4, -8.8))
+        compiler = OutlineOTFCompiler(
+            testufo, roundTolerance=roundTolerance, optimizeCFF=optimizeCFF
+        )
+        charStrings = compiler.getCompiledGlyphs()
+        bounds = compiler._charStringBounds
+
+        assert bounds.keys() == charStrings.keys()
+        for name, cs in charStrings.items():
+            assert not hasattr(cs, "bounds")
+            expected = cs.calcBounds(charStrings)
+            if expected is None:
+                assert bounds[name] is None
+            else:
+                assert bounds[name] == pytest.approx(expected)
+        assert bounds["space"] is None
+        xMin = bounds["points"][0]
+        assert (xMin == 0) if optimizeCFF else (xMin < 0)
+
+    def test_makeGlyphsBoundingBoxes_without_bounds(self, testufo):
+        # e.g. the charstrings from a subclass overriding getCharStringForGlyph
+        class CharStringCompiler(OutlineOTFCompiler):
+            def getCharStringForGlyph(self, glyph, private, globalSubrs=None):
+                width = otRound(glyph.width - private.nominalWidthX)
+                pen = T2CharStringPen(width, self.allGlyphs)
+                glyph.draw(pen)
+                return pen.getCharString(private, globalSubrs)
+
+        expected = OutlineOTFCompiler(testufo).glyphBoundingBoxes
+        compiler = CharStringCompiler(testufo)
+
+        assert compiler.glyphBoundingBoxes == expected
+        assert not compiler._charStringBounds
+
     def test_importTTX(self, testufo):
         compiler = OutlineOTFCompiler(testufo)
         otf = compiler.otf = TTFont(sfntVersion="OTTO")
@@ -993,6 +1219,7 @@ ASCII = [chr(c) for c in range(0x20, 0x7E)]
         [ASCII + ["┤", "√", "é"], {52}],  # MS-DOS Canadian French
         [ASCII + ["┤", "√", "õ"], {55}],  # MS-DOS Portuguese
         [ASCII + ["‰", "∑"], {29}],  # Macintosh Character Set (US Roman)
+        [ASCII + ["Þ", "Б", "Ά", "╚"], {0, 2, 3, 62, 63}],  # several codepages
         [[" ", "0", "1", "2", "අ"], {0}],  # always fallback to Latin 1
     ],
 )
@@ -1012,6 +1239,20 @@ def test_calcCodePageRanges(emptyufo, unicodes, expected):
     )
 
 
+def test_calcUnicodeRanges(emptyufo):
+    font = emptyufo
+    for i, c in enumerate(["a", "Б", "ر", "\U0001F170"]):
+        font.newGlyph("glyph%d" % i).unicode = ord(c)
+
+    compiler = OutlineOTFCompiler(font)
+    otf = compiler.compile()
+    os2 = otf["OS/2"]
+    unicodeRanges = os2.getUnicodeRanges()
+
+    assert unicodeRanges == {0, 9, 13, 57}
+    assert os2.recalcUnicodeRanges(otf) == unicodeRanges
+
+
 def test_custom_layer_compilation(layertestrgufo):
     ufo = layertestrgufo
 
@@ -1,7 +1,9 @@
 import logging
 import os
+from copy import deepcopy
 
 import pytest
+from cu2qu.errors import IncompatibleFontsError
 from cu2qu.ufo import CURVE_TYPE_LIB_KEY
 from fontTools import designspaceLib
 
@@ -11,13 +13,15 @@ from ufo2ft.constants import (
     COLOR_LAYERS_KEY,
     COLOR_PALETTES_KEY,
 )
-from ufo2ft.filters import FILTERS_KEY, loadFilterFromString
+from ufo2ft.filters import FILTERS_KEY, BaseFilter, loadFilterFromString
 from ufo2ft.filters.explodeColorLayerGlyphs import ExplodeColorLayerGlyphsFilter
 from ufo2ft.preProcessor import (
+    OTFPreProcessor,
     TTFInterpolatablePreProcessor,
     TTFPreProcessor,
     _init_explode_color_layer_glyphs_filter,
 )
+from ufo2ft.util import _GlyphSet
 
 
 def getpath(filename):
@@ -31,6 +35,10 @@ def glyph_has_qcurve(ufo, glyph_name):
     )
 
 
+def glyph_points(glyph):
+    return [[(p.x, p.y, p.segmentType) for p in contour] for contour in glyph]
+
+
 class TTFPreProcessorTest:
     def test_no_inplace(self, FontClass):
         ufo = FontClass(getpath("TestFont.ufo"))
@@ -182,6 +190,87 @@ class TTFInterpolatablePreProcessorTest:
             assert glyph_has_qcurve(ufo1, "c")
             assert glyph_has_qcurve(ufo2, "c")
 
+    def test_workers(self, FontClass):
+        ufos = [FontClass(getpath("TestFont.ufo")) for _ in range(2)]
+        expected = TTFInterpolatablePreProcessor(ufos).process()
+
+        glyphSets = TTFInterpolatablePreProcessor(
+            ufos, inplace=True, workers=2
+        ).process()
+
+        for glyphSet, expectedGlyphSet in zip(glyphSets, expected):
+            assert glyphSet.keys() == expectedGlyphSet.keys()
+            for name in glyphSet.keys():
+                assert glyph_points(glyphSet[name]) == glyph_points(
+                    expectedGlyphSet[name]
+                )
+        for ufo in ufos:
+            assert ufo.layers.defaultLayer.lib[CURVE_TYPE_LIB_KEY] == "quadratic"
+
+    @pytest.mark.parametrize(
+        "reverseDirection, converted",
+        [(True, [".notdef", "a", "c", "d"]), (False, ["c", "d"])],
+    )
+    def test_workers_only_converted_glyphs(
+        self, FontClass, reverseDirection, converted
+    ):
+        ufos = [FontClass(getpath("TestFont.ufo")) for _ in range(2)]
+        del ufos[1]["d"]
+        preProcessor = TTFInterpolatablePreProcessor(
+            ufos, reverseDirection=reverseDirection, workers=2
+        )
+
+        outlines, stats, errorGlyphs = preProcessor._convertChunkToQuadratic(
+            [".notdef", "a", "c", "d", "g", "space"]
+        )
+
+        # the glyphs left unchanged by cu2qu are not sent back to be replayed
+        assert [glyphName for glyphName, _ in outlines] == converted
+        recordings = dict(outlines)
+        assert all(recordings["c"])
+        assert recordings["d"][0] is not None and recordings["d"][1] is None
+        assert stats
+        assert not errorGlyphs
+
+    def test_workers_incompatible(self, FontClass):
+        ufos = [
+            FontClass(getpath("IncompatibleMasters/NewFont-Regular.ufo")),
+            FontClass(getpath("IncompatibleMasters/NewFont-Bold.ufo")),
+        ]
+        with pytest.raises(IncompatibleFontsError) as expected:
+            TTFInterpolatablePreProcessor(ufos).process()
+
+        with pytest.raises(IncompatibleFontsError) as excinfo:
+            TTFInterpolatablePreProcessor(ufos, workers=2).process()
+
+        assert excinfo.value.glyph_errors.keys() == expected.value.glyph_errors.keys()
+
+    @pytest.mark.parametrize("workers", [None, 2])
+    def test_unknown_curve_type(self, FontClass, workers):
+        ufos = [FontClass(getpath("TestFont.ufo")) for _ in range(2)]
+        for ufo in ufos:
+            ufo.layers.defaultLayer.lib[CURVE_TYPE_LIB_KEY] = "hyperbolic"
+
+        with pytest.raises(NotImplementedError, match="hyperbolic"):
+            TTFInterpolatablePreProcessor(ufos, inplace=True, workers=workers).process()
+
+    @pytest.mark.parametrize("workers", [None, 2])
+    def test_mixed_curve_types(self, FontClass, workers, caplog):
+        ufos = [FontClass(getpath("TestFont.ufo")) for _ in range(2)]
+        expected = TTFInterpolatablePreProcessor(ufos).process()
+        ufos[0].layers.defaultLayer.lib[CURVE_TYPE_LIB_KEY] = "quadratic"
+
+        with caplog.at_level(logging.WARNING, logger="cu2qu.ufo"):
+            glyphSets = TTFInterpolatablePreProcessor(
+                ufos, inplace=True, workers=workers
+            ).process()
+
+        assert "fonts may contain different curve types" in caplog.text
+        for glyphSet, expectedGlyphSet in zip(glyphSets, expected):
+            assert glyph_points(glyphSet["c"]) == glyph_points(expectedGlyphSet["c"])
+        for ufo in ufos:
+            assert ufo.layers.defaultLayer.lib[CURVE_TYPE_LIB_KEY] == "quadratic"
+
     def test_custom_filters(self, FontClass):
         ufo1 = FontClass(getpath("TestFont.ufo"))
         ufo1.lib[FILTERS_KEY] = [
@@ -387,6 +476,168 @@ def color_ufo(FontClass):
     return ufo
 
 
+def _makeCopyOnWriteFont(FontClass):
+    ufo = FontClass()
+    a = ufo.newGlyph("a")
+    a.width = 500
+    a.unicodes = [0x61]
+    pen = a.getPen()
+    pen.moveTo((0, 0))
+    pen.lineTo((0, 500))
+    pen.lineTo((500, 500))
+    pen.closePath()
+    a.appendAnchor({"name": "top", "x": 250, "y": 700})
+    a.lib["foo"] = {"bar": 1}
+    b = ufo.newGlyph("b")
+    pen = b.getPen()
+    pen.addComponent("a", (1, 0, 0, 1, 0, 0))
+    pen.addComponent("a", (1, 0, 0, 1, 100, 0))
+    return ufo
+
+
+def _glyphData(glyph):
+    return (
+        glyph.width,
+        list(glyph.unicodes),
+        glyph_points(glyph),
+        [(c.baseGlyph, tuple(c.transformation)) for c in glyph.components],
+        [(a.name, a.x, a.y) for a in glyph.anchors],
+        deepcopy(dict(glyph.lib)),
+    )
+
+
+class CopyOnWriteGlyphSetTest:
+    def test_read(self, FontClass):
+        ufo = _makeCopyOnWriteFont(FontClass)
+        glyphSet = _GlyphSet.from_layer(ufo, copy=True)
+
+        a = glyphSet["a"]
+        assert _glyphData(a) == _glyphData(ufo["a"])
+        assert a.unicodes == [0x61]
+        assert a.lib["foo"] == {"bar": 1}
+        assert hasattr(a, "clearContours")
+        assert [c.baseGlyph for c in glyphSet["b"].components] == ["a", "a"]
+        # reading doesn't copy the glyphs
+        assert a._copy is None
+        assert glyphSet["b"]._copy is None
+
+    @pytest.mark.parametrize(
+        "modify",
+        [
+            lambda glyph: setattr(glyph, "width", 600),
+            lambda glyph: glyph.clearContours(),
+            lambda glyph: glyph.getPointPen(),
+            lambda glyph: glyph.appendAnchor({"name": "bottom", "x": 250, "y": 0}),
+            lambda glyph: glyph.unicodes.append(0x41),
+            lambda glyph: glyph.lib.update(foo=None),
+        ],
+        ids=["width", "clearContours", "getPointPen", "anchors", "unicodes", "lib"],
+    )
+    def test_copy_on_write(self, FontClass, modify):
+        ufo = _makeCopyOnWriteFont(FontClass)
+        expected = _glyphData(ufo["a"])
+        glyphSet = _GlyphSet.from_layer(ufo, copy=True)
+
+        modify(glyphSet["a"])
+
+        assert glyphSet["a"]._copy is not None
+        assert glyphSet["b"]._copy is None
+        assert _glyphData(ufo["a"]) == expected
+
+    def test_source_objects_replaced_with_copies(self, FontClass):
+        ufo = _makeCopyOnWriteFont(FontClass)
+        glyphSet = _GlyphSet.from_layer(ufo, copy=True)
+        glyph = glyphSet["a"]
+
+        contours = list(glyph)
+        glyph.clearContours()
+        if hasattr(glyph, "appendContour"):  # defcon
+            for contour in contours:
+                glyph.appendContour(contour)
+        else:  # ufoLib2
+            glyph.contours.extend(contours)
+
+        assert glyph_points(glyph) == glyph_points(ufo["a"])
+        assert glyph[0] is not ufo["a"][0]
+
+    def test_OTFPreProcessor(self, FontClass):
+        ufo = _makeCopyOnWriteFont(FontClass)
+        expected = {name: _glyphData(ufo[name]) for name in ("a", "b")}
+
+        glyphSet = OTFPreProcessor(ufo).process()
+
+        # only the composite glyph is decomposed, hence copied
+        assert glyphSet["a"]._copy is None
+        assert not glyphSet["b"].components
+        assert len(glyphSet["b"]) == 2
+        assert {name: _glyphData(ufo[name]) for name in ("a", "b")} == expected
+
+    def test_TTFPreProcessor(self, FontClass):
+        ufo = _makeCopyOnWriteFont(FontClass)
+        c = ufo.newGlyph("c")
+        ufo["a"].draw(c.getPen())
+        c.getPen().addComponent("a", (1, 0, 0, 1, 0, 0))
+        expected = {name: _glyphData(ufo[name]) for name in ("a", "b", "c")}
+
+        glyphSet = TTFPreProcessor(ufo).process()
+
+        # the glyphs with contours are converted to quadratic, and their
+        # components decomposed; the composite glyph is left untouched
+        assert glyphSet["a"]._copy is not None
+        assert glyphSet["b"]._copy is None
+        assert len(glyphSet["c"]) == 2
+        assert not glyphSet["c"].components
+        assert {name: _glyphData(ufo[name]) for name in ("a", "b", "c")} == expected
+
+    @pytest.mark.parametrize("pre", [True, False], ids=["pre", "post"])
+    @pytest.mark.parametrize(
+        "makePreProcessor",
+        [
+            lambda ufo, filters: OTFPreProcessor(ufo, filters=filters),
+            lambda ufo, filters: TTFPreProcessor(ufo, filters=filters),
+            lambda ufo, filters: TTFInterpolatablePreProcessor([ufo], filters=filters),
+        ],
+        ids=["OTF", "TTF", "TTFInterpolatable"],
+    )
+    def test_custom_filter_modifies_in_place(self, FontClass, makePreProcessor, pre):
+        class MoveInPlaceFilter(BaseFilter):
+            def filter(self, glyph):
+                # custom filters are given the glyphs' copies, not the
+                # copy-on-write glyphs
+                assert isinstance(glyph, type(ufo["a"]))
+                for contour in glyph:
+                    for point in contour:
+                        point.x += 10
+                for anchor in glyph.anchors:
+                    anchor.x += 10
+                for component in glyph.components:
+                    component.transformation = (1, 0, 0, 1, 10, 0)
+                return True
+
+        ufo = _makeCopyOnWriteFont(FontClass)
+        expected = {name: _glyphData(ufo[name]) for name in ("a", "b")}
+
+        makePreProcessor(ufo, [MoveInPlaceFilter(pre=pre)]).process()
+
+        assert {name: _glyphData(ufo[name]) for name in ("a", "b")} == expected
+
+    def test_compile_custom_filter(self, FontClass):
+        class MoveInPlaceFilter(BaseFilter):
+            def filter(self, glyph):
+                for contour in glyph:
+                    for point in contour:
+                        point.x += 10
+                return True
+
+        ufo = _makeCopyOnWriteFont(FontClass)
+        expected = _glyphData(ufo["a"])
+
+        ufo2ft.compileOTF(ufo, filters=[MoveInPlaceFilter(pre=True)])
+        ufo2ft.compileTTF(ufo, filters=[MoveInPlaceFilter(pre=True)])
+
+        assert _glyphData(ufo["a"]) == expected
+
+
 class InitExplodeColorLayerGlyphsFilterTest:
     def test_no_color_palettes(self, FontClass):
         ufo = FontClass()
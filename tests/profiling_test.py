@@ -0,0 +1,187 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from ufo2ft import (
+    compileInterpolatableTTFs,
+    compileOTF,
+    compileTTF,
+    compileVariableTTF,
+)
+from ufo2ft.profiling import Profiler, getProfiler, stage
+
+
+def getpath(filename):
+    dirname = os.path.dirname(__file__)
+    return os.path.join(dirname, "data", filename)
+
+
+@pytest.fixture
+def testufo(FontClass):
+    return FontClass(getpath("TestFont.ufo"))
+
+
+class ProfilerTest:
+    def test_no_profiler(self):
+        assert getProfiler() is None
+        with stage("foo", "bar"):
+            pass
+        assert getProfiler() is None
+
+    def test_stage(self):
+        profiler = Profiler()
+        with profiler:
+            assert getProfiler() is profiler
+            with stage("outer", "test", foo=1):
+                with stage("inner", "test"):
+                    data = [0] * 100000
+                del data
+        assert getProfiler() is None
+
+        outer, inner = profiler.sortedRecords()
+        assert (outer.name, outer.category, outer.depth) == ("outer", "test", 0)
+        assert (inner.name, inner.category, inner.depth) == ("inner", "test", 1)
+        assert outer.args == {"foo": 1}
+        assert outer.wallTime >= inner.wallTime
+        assert outer.start <= inner.start
+        assert inner.peakMemory > 100000 * 8
+        assert outer.peakMemory >= inner.peakMemory
+
+    def test_no_trace_memory(self):
+        with Profiler(traceMemory=False) as profiler:
+            with stage("foo", "test"):
+                pass
+        assert profiler.records[0].peakMemory is None
+
+    def test_compile_profile_argument(self, testufo):
+        profiler = Profiler()
+        compileTTF(testufo, profile=profiler)
+        assert getProfiler() is None
+
+        stages = {(r.category, r.name) for r in profiler.records}
+        assert {
+            ("compile", "compileTTF"),
+            ("compile", "compileFeatures"),
+            ("preProcessor", "TTFPreProcessor"),
+            ("filter", "CubicToQuadraticFilter"),
+            ("outlineCompiler", "setupTable_head"),
+            ("outlineCompiler", "setupOtherTables"),
+            ("outlineCompiler", "compileGlyphs"),
+            ("featureWriter", "KernFeatureWriter"),
+            ("featureWriter", "MarkFeatureWriter"),
+            ("featureCompiler", "buildTables"),
+            ("feaLib", "addOpenTypeFeaturesFromString"),
+            ("postProcessor", "PostProcessor"),
+        }.issubset(stages)
+
+        records = profiler.sortedRecords()
+        assert records[0].name == "compileTTF"
+        assert records[0].depth == 0
+        assert all(r.depth > 0 for r in records[1:])
+
+    def test_compile_context_manager(self, testufo):
+        with Profiler(traceMemory=False) as profiler:
+            compileOTF(testufo)
+            compileTTF(testufo)
+
+        names = [r.name for r in profiler.sortedRecords() if r.category == "compile"]
+        assert names == [
+            "compileOTF",
+            "compileFeatures",
+            "compileTTF",
+            "compileFeatures",
+        ]
+
+    def test_compile_invalid_profile(self, testufo):
+        with pytest.raises(TypeError, match="Profiler"):
+            compileTTF(testufo, profile=True)
+
+    def test_generator_paused(self, designspace):
+        profiler = Profiler(traceMemory=False)
+        ufos = [source.font for source in designspace.sources]
+
+        ttfs = []
+        for ttf in compileInterpolatableTTFs(ufos, profile=profiler):
+            # the profiler is inactive while the generator is suspended
+            assert getProfiler() is None
+            with stage("consumer", "test"):
+                ttfs.append(ttf)
+        assert len(ttfs) == len(ufos)
+
+        records = profiler.sortedRecords()
+        assert "consumer" not in {r.name for r in records}
+        # one stage per item, and one for the run after the last item
+        steps = [r for r in records if r.name == "compileInterpolatableTTFs"]
+        assert len(steps) == len(ufos) + 1
+        assert all(r.depth == 0 for r in steps)
+
+    def test_generator_close(self, designspace):
+        profiler = Profiler(traceMemory=False)
+        ufos = [source.font for source in designspace.sources]
+
+        ttfs = compileInterpolatableTTFs(ufos, profile=profiler)
+        next(ttfs)
+        ttfs.close()
+        assert getProfiler() is None
+
+    def test_variable_font(self, designspace):
+        profiler = Profiler(traceMemory=False)
+        compileVariableTTF(designspace, profile=profiler)
+        categories = {r.category for r in profiler.records}
+        assert "varLib" in categories
+        assert "postProcessor" in categories
+
+    @pytest.mark.skipif(
+        "fork" not in multiprocessing.get_all_start_methods(),
+        reason="requires the 'fork' start method",
+    )
+    def test_workers(self, designspace):
+        profiler = Profiler(traceMemory=False)
+        compileVariableTTF(designspace, workers=2, profile=profiler)
+
+        pids = {r.pid for r in profiler.records}
+        assert os.getpid() in pids
+        assert len(pids) > 1
+        # the master fonts are compiled in the workers
+        assert all(
+            r.pid != os.getpid()
+            for r in profiler.records
+            if r.category == "outlineCompiler"
+        )
+
+    def test_report(self, testufo, tmp_path):
+        profiler = Profiler()
+        compileOTF(testufo, profile=profiler)
+
+        report = profiler.report()
+        assert len(report["stages"]) == len(profiler.records)
+        summary = {(s["category"], s["name"]): s for s in report["summary"]}
+        assert summary["compile", "compileOTF"]["count"] == 1
+        assert summary["postProcessor", "PostProcessor"]["peakMemory"] > 0
+
+        path = tmp_path / "report.json"
+        profiler.writeJSON(path)
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f) == json.loads(json.dumps(report))
+
+    def test_chrome_trace(self, testufo, tmp_path):
+        profiler = Profiler()
+        compileOTF(testufo, profile=profiler)
+
+        path = tmp_path / "trace.json"
+        profiler.writeChromeTrace(path)
+        with open(path, encoding="utf-8") as f:
+            trace = json.load(f)
+
+        events = trace["traceEvents"]
+        assert len(events) == len(profiler.records)
+        event = events[0]
+        assert event["name"] == "compileOTF"
+        assert event["cat"] == "compile"
+        assert event["ph"] == "X"
+        assert event["pid"] == os.getpid()
+        assert event["dur"] > 0
+        assert event["args"]["peakMemory"] > 0
+        assert all(e["ts"] >= event["ts"] for e in events)
@@ -0,0 +1,110 @@
+from io import StringIO
+
+import pytest
+from fontTools.feaLib.parser import Parser
+
+from ufo2ft.util import (
+    classifyGlyphs,
+    closeGlyphsOverGSUB,
+    compileGSUB,
+    getSubstitutionGraph,
+)
+
+GLYPHS = "a b c d e f g h i j k l m n o p q r s t u v w x y z".split()
+
+FEATURES = {
+    "single": """
+        feature smcp { sub a by b; sub b by c; sub x by y; } smcp;
+    """,
+    "multiple_alternate": """
+        feature ccmp { sub a by d e; } ccmp;
+        feature aalt { sub e from [f g]; sub f from [h]; } aalt;
+    """,
+    "ligature": """
+        feature liga { sub a b by i; sub i c by j; sub f f by k; } liga;
+    """,
+    "unreferenced": """
+        lookup unused { sub a by z; } unused;
+        feature salt { sub m by n; } salt;
+    """,
+    "extension": """
+        lookup ext1 useExtension { sub a by o; } ext1;
+        lookup ext2 useExtension { sub o b by p; } ext2;
+        feature ss01 { lookup ext1; lookup ext2; } ss01;
+    """,
+    "contextual": """
+        lookup toQ { sub a by q; } toQ;
+        lookup toR { sub q by r; } toR;
+        feature calt {
+            sub [a q]' lookup toQ lookup toR b;
+            sub s' t by u;
+        } calt;
+        feature rlig { rsub v' w by x; } rlig;
+        feature salt { sub b by w; sub c by t; } salt;
+    """,
+}
+
+SEEDS = [
+    {"a"},
+    {"b"},
+    {"a", "b"},
+    {"a", "c"},
+    {"b", "c", "s"},
+    {"f"},
+    {"m", "v"},
+]
+
+
+def makeGSUB(features):
+    featureFile = Parser(StringIO(features), glyphNames=GLYPHS).parse()
+    return compileGSUB(featureFile, GLYPHS)
+
+
+@pytest.mark.parametrize("name", sorted(FEATURES))
+def test_SubstitutionGraph_closeGlyphs(name):
+    gsub = makeGSUB(FEATURES[name])
+    graph = getSubstitutionGraph(gsub)
+
+    for seed in SEEDS:
+        expected = set(seed)
+        closeGlyphsOverGSUB(gsub, expected)
+        glyphs = set(seed)
+        graph.closeGlyphs(glyphs)
+        assert glyphs == expected, seed
+
+        for closed in SEEDS:
+            closed = set(closed)
+            closeGlyphsOverGSUB(gsub, closed)
+            expected = seed | closed
+            closeGlyphsOverGSUB(gsub, expected)
+            glyphs = seed | closed
+            graph.closeGlyphs(glyphs, closedGlyphs=closed)
+            assert glyphs == expected, (seed, closed)
+
+
+def test_SubstitutionGraph_contextualLookups():
+    graph = getSubstitutionGraph(makeGSUB(FEATURES["contextual"]))
+
+    assert len(graph.contextualLookups) == 2
+    assert graph.substitutions == {"b": {"w"}, "c": {"t"}}
+    assert not graph.ligatures
+
+
+def test_getSubstitutionGraph_cached():
+    gsub = makeGSUB(FEATURES["single"])
+
+    assert getSubstitutionGraph(gsub) is getSubstitutionGraph(gsub)
+    assert getSubstitutionGraph(makeGSUB(FEATURES["single"])) is not (
+        getSubstitutionGraph(gsub)
+    )
+
+
+def test_classifyGlyphs():
+    gsub = makeGSUB(FEATURES["ligature"] + FEATURES["single"])
+    cmap = {ord(g): g for g in "abcfx"}
+
+    def isVowel(uv):
+        return chr(uv) in "ae" or None
+
+    assert classifyGlyphs(isVowel, cmap, gsub) == {True: {"a", "i", "j"}}
+    assert classifyGlyphs(isVowel, cmap) == {True: {"a"}}